@@ -64,6 +64,7 @@ st.markdown("""
 3. **현시점 세금계산**: 평가된 주식에 대한 상속세, 증여세, 양도소득세 등을 계산합니다.
 4. **미래 주식가치**: 성장률을 적용하여 미래 시점의 주식 가치를 예측합니다.
 5. **미래 세금계산**: 미래 시점의 예상 세금을 계산합니다.
+6. **평가 이력**: 저장된 평가 이력을 회사와 평가 기준일로 조회하고 다시 불러옵니다.
 
 ### 참고사항
 - 이 계산기는 참고용으로만 사용하시고, 정확한 세금 계산을 위해서는 전문가와 상담하시기 바랍니다.
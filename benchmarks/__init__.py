@@ -0,0 +1,6 @@
+"""
+계산 함수와 보고서 생성 함수의 성능 측정 (python -m benchmarks)
+
+입력 수(1, 1천, 10만, 100만 건)별 처리량과 최대 메모리를 재고 JSON 이력 파일에 쌓으며,
+저장해 둔 기준 결과(baseline)보다 느려지거나 메모리를 더 쓰면 회귀로 표시합니다.
+"""
@@ -0,0 +1,245 @@
+"""
+성능 측정 실행
+
+    python -m benchmarks                      # 측정 후 benchmarks/history.json에 추가, 기준 결과와 비교
+    python -m benchmarks --save-baseline      # 이번 결과를 기준 결과(benchmarks/baseline.json)로 저장
+    python -m benchmarks --sizes 1,1000 --cases tax --fail-on-regression
+
+처리 시간은 --repeat번 중 가장 빠른 값(10만 건 이상은 1번)이고, 최대 메모리는
+tracemalloc을 켜고 따로 한 번 더 실행해 잽니다. 기준 결과보다 처리량이 --threshold 비율보다
+많이 줄거나 최대 메모리가 그만큼 늘면 회귀로 표시합니다.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.cases import CASES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "history.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SIZES = (1, 1_000, 100_000, 1_000_000)
+DEFAULT_THRESHOLD = 0.2
+
+# 이 입력 수 이상은 한 번만 측정
+SINGLE_RUN_SIZE = 100_000
+
+
+def _sizes(text):
+    try:
+        sizes = [int(size.replace("_", "")) for size in text.split(",") if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"입력 수 목록이 올바르지 않습니다: {text}")
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("입력 수는 1 이상이어야 합니다.")
+    return sizes
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="계산 함수와 보고서 생성 함수의 성능을 측정합니다.")
+    parser.add_argument("--sizes", type=_sizes, default=list(DEFAULT_SIZES),
+                        help="쉼표로 구분한 입력 수 (기본값: 1,1000,100000,1000000)")
+    parser.add_argument("--cases", default="", help="이름에 이 문자열이 들어간 항목만 측정 (쉼표로 여러 개)")
+    parser.add_argument("--repeat", type=int, default=3, help="10만 건 미만에서 반복 횟수 (가장 빠른 값 사용, 기본값: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="입력 생성 난수 시드 (기본값: 0)")
+    parser.add_argument("--full", action="store_true", help="보고서 항목의 입력 수 제한 없이 모든 입력 수 측정")
+    parser.add_argument("--no-memory", action="store_true", help="최대 메모리 측정 생략")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="측정 이력 JSON 파일 (기본값: benchmarks/history.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준 결과 JSON 파일 (기본값: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준 결과로 저장")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="회귀로 볼 처리량 감소/메모리 증가 비율 (기본값: 0.2)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    parser.add_argument("--list", action="store_true", help="측정 항목 목록만 출력")
+    return parser
+
+
+def select_cases(pattern):
+    names = [name.strip() for name in pattern.split(",") if name.strip()]
+    return [case for case in CASES if not names or any(name in case.name for name in names)]
+
+
+def _timed(run, inputs):
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        run(inputs)
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _peak_memory(run, inputs):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(inputs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(case, size, seed=0, repeat=3, memory=True):
+    """
+    항목 1개를 입력 수 size로 측정합니다.
+
+    Returns:
+    dict: case, group, size, seconds, throughput(초당 처리 건수), peakBytes(memory=False면 None)
+    """
+    inputs = case.setup(size, seed)
+    runs = repeat if size < SINGLE_RUN_SIZE else 1
+    seconds = min(_timed(case.run, inputs) for _ in range(max(runs, 1)))
+    return {
+        "case": case.name,
+        "group": case.group,
+        "size": size,
+        "seconds": seconds,
+        "throughput": size / seconds if seconds > 0 else None,
+        "peakBytes": _peak_memory(case.run, inputs) if memory else None,
+    }
+
+
+def environment():
+    """측정 환경 (커밋, Python/NumPy 버전, 플랫폼)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_json(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def write_json(path, data):
+    # 중간에 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    기준 결과와 비교해 각 결과에 throughputChange, peakChange(비율)와 regressions(회귀 내용 목록)를 채웁니다.
+
+    Returns:
+    list: 회귀가 있는 결과
+    """
+    previous = {(item["case"], item["size"]): item for item in (baseline or {}).get("results", [])}
+    regressed = []
+    for result in results:
+        result["regressions"] = []
+        base = previous.get((result["case"], result["size"]))
+        if base is None:
+            continue
+        if base.get("throughput") and result["throughput"]:
+            change = result["throughput"] / base["throughput"] - 1
+            result["throughputChange"] = change
+            if change < -threshold:
+                result["regressions"].append(f"처리량 {change:+.0%}")
+        if base.get("peakBytes") and result["peakBytes"] is not None:
+            change = result["peakBytes"] / base["peakBytes"] - 1
+            result["peakChange"] = change
+            if change > threshold:
+                result["regressions"].append(f"메모리 {change:+.0%}")
+        if result["regressions"]:
+            regressed.append(result)
+    return regressed
+
+
+def _format_size(size):
+    return f"{size:,}"
+
+
+def _format_bytes(size):
+    return "-" if size is None else f"{size / 1024 / 1024:,.2f}MB"
+
+
+def format_row(result):
+    change = result.get("throughputChange")
+    note = ", ".join(result.get("regressions") or []) or ("" if change is None else f"{change:+.0%}")
+    return (f"{result['case']:<32} {_format_size(result['size']):>10} {result['seconds']:>10.4f}s "
+            f"{result['throughput'] or 0:>14,.0f}/s {_format_bytes(result['peakBytes']):>11}  {note}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    cases = select_cases(args.cases)
+    if args.list:
+        for case in cases:
+            limit = "" if case.max_size is None else f" (기본 최대 {_format_size(case.max_size)}건)"
+            print(f"{case.group}\t{case.name}{limit}")
+        return 0
+    if not cases:
+        print(f"측정 항목이 없습니다: {args.cases}", file=sys.stderr)
+        return 2
+
+    baseline = load_json(args.baseline, None)
+    results = []
+    print(f"{'항목':<32} {'입력 수':>10} {'시간':>11} {'처리량':>16} {'최대 메모리':>11}  기준 대비")
+    for case in cases:
+        for size in args.sizes:
+            if not args.full and case.max_size is not None and size > case.max_size:
+                continue
+            result = measure(case, size, args.seed, args.repeat, memory=not args.no_memory)
+            results.append(result)
+            compare([result], baseline, args.threshold)
+            print(format_row(result), flush=True)
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        **environment(),
+        "seed": args.seed,
+        "results": results,
+    }
+    history = load_json(args.history, [])
+    history.append(run)
+    write_json(args.history, history)
+    if args.save_baseline:
+        write_json(args.baseline, run)
+        print(f"기준 결과 저장: {args.baseline}", file=sys.stderr)
+
+    regressed = [result for result in results if result["regressions"]]
+    if baseline is None:
+        print("기준 결과가 없어 비교하지 않았습니다 (--save-baseline으로 저장).", file=sys.stderr)
+    elif regressed:
+        print(f"회귀 {len(regressed)}건 (기준: {baseline.get('commit') or '-'} {baseline.get('timestamp')}):",
+              file=sys.stderr)
+        for result in regressed:
+            print(f"  {result['case']} {_format_size(result['size'])}건: {', '.join(result['regressions'])}",
+                  file=sys.stderr)
+    else:
+        print(f"회귀 없음 (기준: {baseline.get('commit') or '-'} {baseline.get('timestamp')})", file=sys.stderr)
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+성능 측정 항목
+
+각 항목은 setup(size, seed)으로 입력을 미리 만들고 run(inputs)으로 size건을 처리합니다.
+입력은 seed로 고정한 난수로 만들어 매번 같은 값으로 측정합니다. 1건씩 계산하는 함수는
+서로 다른 회사 입력 POOL_SIZE개를 돌려 가며 size번 호출합니다.
+"""
+import random
+from itertools import cycle, islice
+from typing import Callable, NamedTuple, Optional
+
+from valuation.formatting import format_column, format_number
+from valuation.projection import calculate_future_stock_value, calculate_future_value
+from valuation.reports import future_tax_csv, future_tax_html, future_value_csv, future_value_html
+from valuation.stock import METHOD_NAMES, calculate_stock_value
+from valuation.tax import calculate_inheritance_tax, calculate_liquidation_tax, calculate_transfer_tax
+
+# 1건씩 계산하는 항목이 돌려 쓰는 서로 다른 입력 수
+POOL_SIZE = 1000
+
+GROWTH_RATE = 10
+FUTURE_YEARS = 10
+
+# 세금 이름 (페이지 5의 최적 세금 옵션 표시와 같음)
+TAX_NAMES = ("상속증여세", "양도소득세(지방소득세 포함)", "청산소득세(종합소득세 포함)")
+
+
+class Case(NamedTuple):
+    """성능 측정 항목"""
+    name: str
+    group: str
+    setup: Callable
+    run: Callable
+    # 기본 측정에서 이보다 큰 입력 수는 건너뜀 (None이면 제한 없음, --full이면 무시)
+    max_size: Optional[int] = None
+
+
+def company_pool(size, seed=0):
+    """회사 입력 size개 (total_equity, net_income1~3, shares, owned_shares, share_price, evaluation_method)"""
+    rng = random.Random(seed)
+    companies = []
+    for _ in range(size):
+        shares = rng.randrange(1_000, 1_000_000)
+        income = rng.uniform(-0.05, 0.3) * rng.uniform(1e8, 1e11)
+        companies.append({
+            "total_equity": rng.uniform(1e8, 1e11),
+            "net_income1": income,
+            "net_income2": income * rng.uniform(0.7, 1.3),
+            "net_income3": income * rng.uniform(0.5, 1.5),
+            "shares": shares,
+            "owned_shares": rng.randrange(0, shares + 1),
+            "share_price": rng.choice((100, 500, 1000, 5000, 10000)),
+            "evaluation_method": rng.choice(METHOD_NAMES),
+        })
+    return companies
+
+
+def _stock_value(company):
+    return calculate_stock_value(
+        company["total_equity"], company["net_income1"], company["net_income2"], company["net_income3"],
+        company["shares"], company["owned_shares"], company["evaluation_method"]
+    )
+
+
+def _future_stock_value(company, stock_value):
+    return calculate_future_stock_value(
+        stock_value, company["total_equity"], company["shares"], company["owned_shares"], 10,
+        company["evaluation_method"], GROWTH_RATE, FUTURE_YEARS
+    )
+
+
+def _tax_summary(owned_value, acquisition_value, total_value, shares, owned_shares):
+    # 페이지 5와 같은 세 가지 세액과 최적 세금 옵션
+    taxes = (
+        calculate_inheritance_tax(owned_value)[0],
+        calculate_transfer_tax(owned_value, acquisition_value)[0],
+        calculate_liquidation_tax(owned_value, acquisition_value, total_value, shares, owned_shares)[2],
+    )
+    return {
+        "inheritance": taxes[0],
+        "transfer": taxes[1],
+        "liquidation": taxes[2],
+        "best_option": TAX_NAMES[taxes.index(min(taxes))],
+    }
+
+
+def _pool(size, seed):
+    return company_pool(min(size, POOL_SIZE), seed)
+
+
+def _calls(func, build):
+    """pool 입력마다 build(company)로 인자를 만들고 size번 func(*args)를 호출하는 (setup, run)"""
+    def setup(size, seed):
+        return size, [build(company) for company in _pool(size, seed)]
+
+    def run(inputs):
+        size, pool = inputs
+        for args in islice(cycle(pool), size):
+            func(*args)
+
+    return setup, run
+
+
+def _stock_args(company):
+    return (company["total_equity"], company["net_income1"], company["net_income2"], company["net_income3"],
+            company["shares"], company["owned_shares"], company["evaluation_method"])
+
+
+def _tax_args(company):
+    stock_value = _stock_value(company)
+    return (stock_value["ownedValue"], company["owned_shares"] * company["share_price"],
+            stock_value["totalValue"], company["shares"], company["owned_shares"])
+
+
+def _future_stock_args(company):
+    return (_stock_value(company), company["total_equity"], company["shares"], company["owned_shares"], 10,
+            company["evaluation_method"], GROWTH_RATE, FUTURE_YEARS)
+
+
+def _future_value_report_args(company):
+    stock_value = _stock_value(company)
+    return stock_value, _future_stock_value(company, stock_value), "벤치마크", GROWTH_RATE, FUTURE_YEARS
+
+
+def _future_tax_report_args(company):
+    stock_value = _stock_value(company)
+    future_value = calculate_future_value(stock_value, GROWTH_RATE, FUTURE_YEARS)
+    acquisition_value = company["owned_shares"] * company["share_price"]
+    current_tax = _tax_summary(stock_value["ownedValue"], acquisition_value, stock_value["totalValue"],
+                               company["shares"], company["owned_shares"])
+    future_tax = _tax_summary(future_value["ownedValue"], acquisition_value, future_value["totalValue"],
+                              company["shares"], company["owned_shares"])
+    return current_tax, future_tax, "벤치마크", GROWTH_RATE, FUTURE_YEARS
+
+
+def _arrays(size, seed):
+    """회사 입력 size개를 컬럼별 NumPy 배열로 (배열 연산 항목용)"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    shares = rng.integers(1_000, 1_000_000, size).astype(np.float64)
+    income = rng.uniform(-0.05, 0.3, size) * rng.uniform(1e8, 1e11, size)
+    return {
+        "total_equity": rng.uniform(1e8, 1e11, size),
+        "net_income1": income,
+        "net_income2": income * rng.uniform(0.7, 1.3, size),
+        "net_income3": income * rng.uniform(0.5, 1.5, size),
+        "shares": shares,
+        "methods": rng.integers(0, len(METHOD_NAMES), size),
+        "owned_shares": np.floor(shares * rng.uniform(0, 1, size)),
+        "share_price": rng.choice([100, 500, 1000, 5000, 10000], size).astype(np.float64),
+    }
+
+
+def _amounts(size, seed):
+    """원 단위 금액 size개 (형식화 항목용)"""
+    import numpy as np
+
+    return np.random.default_rng(seed).uniform(-1e9, 1e12, size)
+
+
+def _run_stock_values(arrays):
+    from valuation.batch import calculate_stock_values
+
+    calculate_stock_values(arrays["total_equity"], arrays["net_income1"], arrays["net_income2"],
+                           arrays["net_income3"], arrays["shares"], arrays["methods"], arrays["owned_shares"])
+
+
+def _run_value_companies(arrays):
+    from valuation.batch import value_companies
+
+    value_companies(**arrays, taxes=True, growth_rate=GROWTH_RATE, years=FUTURE_YEARS)
+
+
+CASES = (
+    Case("calculate_stock_value", "계산", *_calls(calculate_stock_value, _stock_args)),
+    Case("calculate_inheritance_tax", "계산", *_calls(calculate_inheritance_tax, lambda c: _tax_args(c)[:1])),
+    Case("calculate_transfer_tax", "계산", *_calls(calculate_transfer_tax, lambda c: _tax_args(c)[:2])),
+    Case("calculate_liquidation_tax", "계산", *_calls(calculate_liquidation_tax, _tax_args)),
+    Case("calculate_future_stock_value", "계산", *_calls(calculate_future_stock_value, _future_stock_args)),
+    Case("calculate_future_value", "계산",
+         *_calls(calculate_future_value, lambda c: (_stock_value(c), GROWTH_RATE, FUTURE_YEARS))),
+    # 보고서 1건에 수십 마이크로초(HTML)~1밀리초(CSV, pandas)가 걸려 기본 측정은 입력 수를 제한
+    Case("future_value_html", "보고서", *_calls(future_value_html, _future_value_report_args), 100_000),
+    Case("future_value_csv", "보고서", *_calls(future_value_csv, _future_value_report_args), 1_000),
+    Case("future_tax_html", "보고서", *_calls(future_tax_html, _future_tax_report_args), 100_000),
+    Case("future_tax_csv", "보고서", *_calls(future_tax_csv, _future_tax_report_args), 1_000),
+    # 같은 계산의 배열 연산 경로 (포트폴리오 일괄 평가, 명령줄 도구, /batch)
+    Case("batch.calculate_stock_values", "배열", _arrays, _run_stock_values),
+    Case("batch.value_companies", "배열", _arrays, _run_value_companies),
+    # 화면 표의 숫자 형식화 (1건씩, 컬럼 전체)
+    Case("format_number", "형식", *_calls(format_number, lambda c: (c["total_equity"],))),
+    Case("formatting.format_column", "형식", _amounts, format_column),
+)
@@ -0,0 +1,330 @@
+"""
+동시 사용자 부하 시험 (Streamlit AppTest)
+
+사용자마다 스레드 하나가 실제 서버처럼 한 프로세스 안에서 페이지 스크립트를 실행합니다.
+각 사용자는 비상장주식 평가 페이지에서 재무 정보를 입력하고 평가한 뒤, 그 세션 상태로
+주식가치 결과, 현시점 세금, 미래 주식가치, 미래 세금 페이지를 차례로 열고 조작합니다.
+페이지별 실행 시간 분위수와 프로세스 메모리(RSS) 증가를 보고합니다.
+
+    python -m benchmarks.loadtest --users 1,2,4,8 --iterations 3 --max-p95 1.0
+
+--users에 여러 값을 주면 사용자 수를 늘려 가며 측정하고, --max-p95를 주면 모든 페이지의
+p95가 그 시간(초) 안에 드는 가장 큰 사용자 수를 알려줍니다.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+
+# 페이지 식별자 -> 스크립트 파일 (valuation.timing.PAGE_LABELS와 같은 식별자)
+PAGE_FILES = {
+    "valuation": "1_비상장주식_평가.py",
+    "result": "2_주식가치_결과.py",
+    "current_tax": "3_현시점_세금계산.py",
+    "future_value": "4_미래_주식가치.py",
+    "future_tax": "5_미래_세금계산.py",
+}
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+DEFAULT_TIMEOUT = 120
+
+
+def rss_bytes():
+    """현재 프로세스 RSS (Linux /proc, 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Recorder:
+    """페이지별 실행 시간과 오류 (스레드 안전)"""
+
+    def __init__(self):
+        self.latencies = {page: [] for page in PAGE_FILES}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def run(self, at, page):
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[page].append(elapsed)
+            if at.exception:
+                self.errors.append(f"{page}: {at.exception[0].value}")
+            elif not at.main.children:
+                # 컴파일 오류 등으로 아무것도 그리지 못한 실행
+                self.errors.append(f"{page}: 빈 화면")
+        return at
+
+    def error(self, message):
+        with self._lock:
+            self.errors.append(message)
+
+
+_runtime_lock = threading.Lock()
+_runtime_installed = False
+
+
+def install_shared_runtime():
+    """
+    모든 AppTest가 함께 쓰는 가짜 Runtime을 설치합니다.
+
+    AppTest는 실행마다 전역 Runtime._instance를 새 가짜 객체로 바꾸고 끝나면 None으로 되돌리므로,
+    여러 스레드에서 동시에 실행하면 다른 사용자의 실행 도중 Runtime이 사라집니다. 실제 서버처럼
+    프로세스에 Runtime 하나만 두고, AppTest 모듈이 바꾸는 대상은 빈 클래스로 돌립니다.
+
+    페이지 목록(source_util.get_pages)도 처음 실행한 스크립트 기준으로 전역 캐시되어 다른 페이지를
+    동시에 실행하면 엉뚱한 스크립트가 실행되므로, 스크립트 경로별로 목록을 만들도록 바꿉니다.
+
+    AppTest는 실행마다 스크립트를 새로 컴파일하는데, 여러 스레드에서 동시에 컴파일하면 가끔
+    SystemError(AST constructor recursion depth mismatch)가 나므로 서버처럼 컴파일 캐시를 함께 씁니다.
+    """
+    global _runtime_installed
+    with _runtime_lock:
+        if _runtime_installed:
+            return
+        import logging
+        from functools import lru_cache
+        from pathlib import Path
+        from unittest.mock import MagicMock
+
+        from streamlit import source_util
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+        from streamlit.runtime.media_file_manager import MediaFileManager
+        from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+        from streamlit.testing.v1 import app_test, local_script_runner
+        from streamlit.util import calc_md5
+
+        runtime = MagicMock(spec=Runtime)
+        runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+        runtime.cache_storage_manager = MemoryCacheStorageManager()
+        Runtime._instance = runtime
+        app_test.Runtime = type("Runtime", (), {"_instance": None})
+
+        @lru_cache(maxsize=None)
+        def get_pages(main_script_path):
+            # 페이지 스크립트를 직접 실행하므로 (하위 pages 디렉터리 없음) 목록에는 그 스크립트만 있음
+            path = Path(main_script_path)
+            icon, name = source_util.page_icon_and_name(path)
+            script_hash = calc_md5(main_script_path)
+            return {script_hash: {"page_script_hash": script_hash, "page_name": name, "icon": icon,
+                                  "script_path": str(path.resolve())}}
+
+        source_util.get_pages = get_pages
+        script_cache = ScriptCache()
+        local_script_runner.ScriptCache = lambda: script_cache
+        # Runtime이 있으면 사용자 스레드에서 세션 상태를 읽을 때마다 나오는 경고 (AppTest에서는 정상).
+        # Streamlit이 로그 수준을 다시 설정하므로 수준 대신 필터로 거름
+        logging.getLogger("streamlit.runtime.scriptrunner.script_run_context").addFilter(
+            lambda record: "missing ScriptRunContext" not in record.getMessage()
+        )
+        _runtime_installed = True
+
+
+def _app(page):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(os.path.join(PAGES_DIR, PAGE_FILES[page]), default_timeout=DEFAULT_TIMEOUT)
+
+
+def user_session(recorder, rng):
+    """사용자 1명의 평가 -> 결과 -> 세금 -> 미래 가치 -> 미래 세금 흐름"""
+    at = recorder.run(_app("valuation"), "valuation")
+    # 천원 단위 입력
+    equity = rng.randrange(100_000, 50_000_000)
+    income = rng.randrange(10_000, equity // 3 + 20_000)
+    shares = rng.randrange(1_000, 200_000)
+    at.text_input(key="company_name_input").input(f"부하시험{rng.randrange(1_000_000)}")
+    at.text_input(key="total_equity_input").input(f"{equity:,}")
+    recorder.run(at, "valuation")
+    for key, factor in (("income_year1_input", 1.0), ("income_year2_input", 0.9), ("income_year3_input", 0.8)):
+        at.text_input(key=key).input(f"{int(income * factor):,}")
+        recorder.run(at, "valuation")
+    at.text_input(key="shares_input").input(f"{shares:,}")
+    recorder.run(at, "valuation")
+    at.button(key="evaluate_button").click()
+    recorder.run(at, "valuation")
+    if not at.session_state["evaluated"]:
+        recorder.error("valuation: 평가 결과가 없습니다.")
+        return
+
+    # 다른 페이지로 이동 (같은 세션 상태, 측정용 내부 키 제외)
+    state = {key: at.session_state[key] for key in at.session_state.filtered_state if not key.startswith("_")}
+
+    def visit(page):
+        app = _app(page)
+        for key, value in state.items():
+            app.session_state[key] = value
+        return recorder.run(app, page)
+
+    visit("result")
+    tax = visit("current_tax")
+    if tax.checkbox:
+        tax.checkbox[0].check()
+        recorder.run(tax, "current_tax")
+    future = visit("future_value")
+    buttons = [button for button in future.button if button.label == "미래 가치 계산하기"]
+    if buttons:
+        buttons[0].click()
+        recorder.run(future, "future_value")
+    future_tax = visit("future_tax")
+    if future_tax.slider:
+        future_tax.slider[0].set_value(rng.randrange(1, 51))
+        recorder.run(future_tax, "future_tax")
+
+
+def warm_up(seed=0):
+    """모듈 가져오기와 첫 실행 비용이 측정에 섞이지 않도록 사용자 1명 흐름을 한 번 실행합니다."""
+    install_shared_runtime()
+    user_session(Recorder(), random.Random(seed - 1))
+
+
+def run_load(users, iterations=1, seed=0):
+    """
+    users명이 동시에 iterations번씩 사용자 흐름을 실행합니다.
+
+    Returns:
+    dict: users, seconds, reruns, errors, pages(페이지 -> 분위수), rssBefore, rssAfter, rssGrowth, rssPerUser
+    """
+    install_shared_runtime()
+    recorder = Recorder()
+    rss_before = rss_bytes()
+
+    def worker(index):
+        rng = random.Random(seed * 100_003 + index)
+        for _ in range(iterations):
+            try:
+                user_session(recorder, rng)
+            except Exception as e:
+                recorder.error(f"user {index}: {type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"loadtest-user-{i}") for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    rss_after = rss_bytes()
+
+    from valuation.timing import percentile
+
+    pages = {}
+    for page, values in recorder.latencies.items():
+        pages[page] = {"count": len(values), "max": max(values) if values else None,
+                       **{f"p{int(q * 100)}": percentile(values, q) for q in QUANTILES}}
+    reruns = sum(len(values) for values in recorder.latencies.values())
+    return {
+        "users": users,
+        "iterations": iterations,
+        "seconds": seconds,
+        "reruns": reruns,
+        "rerunsPerSecond": reruns / seconds if seconds else None,
+        "errors": recorder.errors,
+        "pages": pages,
+        "rssBefore": rss_before,
+        "rssAfter": rss_after,
+        "rssGrowth": rss_after - rss_before,
+        "rssPerUser": (rss_after - rss_before) / users,
+        "peakRss": peak_rss_bytes(),
+    }
+
+
+def worst_p95(result):
+    return max((stats["p95"] for stats in result["pages"].values() if stats["p95"] is not None), default=None)
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:,.0f}"
+
+
+def _mb(size, sign=False):
+    return f"{size / 1024 / 1024:{'+' if sign else ''},.1f}MB"
+
+
+def print_result(result, file=sys.stdout):
+    print(f"\n사용자 {result['users']}명 x {result['iterations']}회: {result['seconds']:.1f}초, "
+          f"실행 {result['reruns']}회 ({result['rerunsPerSecond']:.1f}회/초), 오류 {len(result['errors'])}건", file=file)
+    print(f"  {'페이지':<14}{'횟수':>6}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'최대':>9}  (ms)", file=file)
+    for page, stats in result["pages"].items():
+        print(f"  {page:<14}{stats['count']:>6}{_ms(stats['p50']):>9}{_ms(stats['p90']):>9}{_ms(stats['p95']):>9}"
+              f"{_ms(stats['p99']):>9}{_ms(stats['max']):>9}", file=file)
+    print(f"  메모리(RSS): {_mb(result['rssBefore'])} -> {_mb(result['rssAfter'])} "
+          f"({_mb(result['rssGrowth'], True)}, 사용자당 {_mb(result['rssPerUser'], True)}), 최대 {_mb(result['peakRss'])}", file=file)
+    for error in result["errors"][:5]:
+        print(f"  오류: {error}", file=file)
+
+
+def _users(text):
+    try:
+        values = [int(value) for value in text.split(",") if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"사용자 수 목록이 올바르지 않습니다: {text}")
+    if not values or min(values) < 1:
+        raise argparse.ArgumentTypeError("사용자 수는 1 이상이어야 합니다.")
+    return values
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest",
+                                     description="AppTest로 동시 사용자 부하를 주고 페이지별 실행 시간과 메모리를 측정합니다.")
+    parser.add_argument("--users", type=_users, default=[1, 2, 4, 8], help="쉼표로 구분한 동시 사용자 수 (기본값: 1,2,4,8)")
+    parser.add_argument("--iterations", type=int, default=2, help="사용자마다 반복할 흐름 수 (기본값: 2)")
+    parser.add_argument("--seed", type=int, default=0, help="입력값 난수 시드 (기본값: 0)")
+    parser.add_argument("--max-p95", type=float, default=None, help="허용 p95 실행 시간 (초). 주면 이를 넘지 않는 최대 사용자 수 표시")
+    parser.add_argument("--no-warmup", action="store_true", help="측정 전 예열 실행 생략 (첫 실행 비용까지 측정)")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # 평가 이력과 작업 파일은 임시 디렉터리에 (이미 지정했으면 그대로)
+    data_dir = tempfile.mkdtemp(prefix="valuation-loadtest-")
+    os.environ.setdefault("VALUATION_HISTORY_DB", os.path.join(data_dir, "history.db"))
+    os.environ.setdefault("VALUATION_JOB_DIR", os.path.join(data_dir, "jobs"))
+
+    if not args.no_warmup:
+        warm_up(args.seed)
+
+    results = []
+    for users in args.users:
+        result = run_load(users, args.iterations, args.seed)
+        results.append(result)
+        print_result(result)
+
+    if args.max_p95 is not None:
+        within = [result["users"] for result in results
+                  if not result["errors"] and (worst_p95(result) or 0) <= args.max_p95]
+        if within:
+            print(f"\np95 {args.max_p95 * 1000:,.0f}ms 이내 최대 동시 사용자: {max(within)}명")
+        else:
+            print(f"\n모든 사용자 수에서 p95가 {args.max_p95 * 1000:,.0f}ms를 넘었습니다.")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+첫 화면 시작 시간 측정
+
+스크립트마다 새 Python 프로세스에서 streamlit을 가져온 뒤 AppTest로 첫 실행(세션 상태 없음)을
+한 번 하고, 걸린 시간과 그때까지 가져온 무거운 모듈(pandas, plotly.express 등)을 보고합니다.
+서버가 막 뜬 컨테이너에서 사용자가 처음 여는 화면의 비용에 해당합니다.
+
+    python -m benchmarks.startup                  # 모든 스크립트 측정
+    python -m benchmarks.startup --check          # 미룬 모듈을 첫 화면에서 가져오면 종료 코드 1
+    python -m benchmarks.startup --scripts app,result --repeat 5 --max-seconds 1.5
+
+--check는 DEFERRED에 적은 모듈을 해당 스크립트의 첫 실행에서 가져오지 않는지 확인합니다.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 스크립트 식별자 -> 파일 (페이지는 valuation.timing.PAGE_LABELS와 같은 식별자)
+SCRIPTS = {
+    "app": "app.py",
+    "valuation": os.path.join("pages", "1_비상장주식_평가.py"),
+    "result": os.path.join("pages", "2_주식가치_결과.py"),
+    "current_tax": os.path.join("pages", "3_현시점_세금계산.py"),
+    "future_value": os.path.join("pages", "4_미래_주식가치.py"),
+    "future_tax": os.path.join("pages", "5_미래_세금계산.py"),
+    "history": os.path.join("pages", "6_평가_이력.py"),
+}
+
+# 첫 실행에서 가져왔는지 보고하는 모듈
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "plotly.express", "altair")
+
+# 스크립트별로 첫 실행(평가 전, 이력 없음)에서 가져오면 안 되는 모듈.
+# 비상장주식 평가 페이지는 주주명부 편집 표(pandas)를 처음부터 그리므로 plotly.express, altair만 확인
+DEFERRED = {
+    "app": HEAVY_MODULES,
+    "valuation": ("plotly.express", "altair"),
+    "result": HEAVY_MODULES,
+    "current_tax": HEAVY_MODULES,
+    "future_value": HEAVY_MODULES,
+    "future_tax": HEAVY_MODULES,
+    "history": HEAVY_MODULES,
+}
+
+DEFAULT_TIMEOUT = 60
+
+
+def _child(path):
+    """새 프로세스에서 실행: streamlit 가져오기와 첫 실행 시간, 가져온 무거운 모듈을 JSON으로 출력"""
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    imported = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(path, default_timeout=DEFAULT_TIMEOUT)
+    run_start = time.perf_counter()
+    at.run()
+    finished = time.perf_counter()
+    print(json.dumps({
+        "importSeconds": imported - start,
+        "firstRunSeconds": finished - run_start,
+        "modules": [name for name in HEAVY_MODULES if name in sys.modules],
+        "exception": str(at.exception[0].value) if at.exception else None,
+    }))
+
+
+def measure(script, repeat=3):
+    """
+    스크립트 1개의 시작 시간을 새 프로세스에서 repeat번 측정합니다.
+
+    Returns:
+    dict: script, processSeconds, importSeconds, firstRunSeconds(각각 repeat번 중 가장 빠른 값),
+        modules(첫 실행까지 가져온 무거운 모듈), exception
+    """
+    path = os.path.join(ROOT_DIR, SCRIPTS[script])
+    # 평가 이력과 작업 파일은 임시 디렉터리에
+    data_dir = tempfile.mkdtemp(prefix="valuation-startup-")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get("PYTHONPATH")])),
+           "VALUATION_HISTORY_DB": os.path.join(data_dir, "history.db"),
+           "VALUATION_JOB_DIR": os.path.join(data_dir, "jobs")}
+    runs = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child", path], cwd=ROOT_DIR,
+                                   env=env, capture_output=True, text=True, timeout=DEFAULT_TIMEOUT * 2)
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            raise RuntimeError(f"{script} 측정 실패:\n{completed.stderr.strip()}")
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        run["processSeconds"] = elapsed
+        runs.append(run)
+    return {
+        "script": script,
+        "processSeconds": min(run["processSeconds"] for run in runs),
+        "importSeconds": min(run["importSeconds"] for run in runs),
+        "firstRunSeconds": min(run["firstRunSeconds"] for run in runs),
+        "modules": sorted(set().union(*(run["modules"] for run in runs))),
+        "exception": next((run["exception"] for run in runs if run["exception"]), None),
+    }
+
+
+def check(result):
+    """DEFERRED 기준으로 첫 실행에서 가져오면 안 되는 모듈 목록"""
+    return [name for name in DEFERRED.get(result["script"], ()) if name in result["modules"]]
+
+
+def format_row(result):
+    return (f"{result['script']:<14}{result['processSeconds'] * 1000:>10,.0f}{result['importSeconds'] * 1000:>10,.0f}"
+            f"{result['firstRunSeconds'] * 1000:>10,.0f}  {', '.join(result['modules']) or '-'}")
+
+
+def _scripts(text):
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCRIPTS]
+    if not names or unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 스크립트: {', '.join(unknown) or text} (선택: {', '.join(SCRIPTS)})")
+    return names
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup",
+                                     description="스크립트별로 새 프로세스에서 첫 화면 시작 시간과 가져온 모듈을 측정합니다.")
+    parser.add_argument("--scripts", type=_scripts, default=list(SCRIPTS),
+                        help=f"쉼표로 구분한 스크립트 (기본값: 전체 - {','.join(SCRIPTS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="스크립트마다 반복 횟수 (가장 빠른 값 사용, 기본값: 3)")
+    parser.add_argument("--check", action="store_true", help="첫 실행에서 미룬 모듈을 가져오면 종료 코드 1")
+    parser.add_argument("--max-seconds", type=float, default=None, help="첫 실행 시간 한도 (초). 넘으면 종료 코드 1")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.child:
+        _child(args.child)
+        return 0
+
+    results = []
+    failures = []
+    print(f"{'스크립트':<12}{'프로세스':>8}{'streamlit':>10}{'첫 실행':>8}  (ms) 가져온 모듈")
+    for script in args.scripts:
+        result = measure(script, args.repeat)
+        results.append(result)
+        print(format_row(result), flush=True)
+        if result["exception"]:
+            failures.append(f"{script}: 실행 오류 - {result['exception']}")
+        if args.check and check(result):
+            failures.append(f"{script}: 첫 실행에서 {', '.join(check(result))}을(를) 가져왔습니다.")
+        if args.max_seconds is not None and result["firstRunSeconds"] > args.max_seconds:
+            failures.append(f"{script}: 첫 실행 {result['firstRunSeconds']:.2f}초 > {args.max_seconds:.2f}초")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
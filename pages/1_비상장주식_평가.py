@@ -8,23 +8,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-import pandas as pd
-import numpy as np
-import locale
+import contextlib
+import os
 from datetime import datetime
-import io
-import base64
 
-# 숫자 형식화를 위한 로케일 설정
-try:
-    locale.setlocale(locale.LC_ALL, 'ko_KR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'ko_KR')
-    except:
-        locale.setlocale(locale.LC_ALL, '')
+from valuation import cache
+from valuation.cache import input_from_mapping
+from valuation.formatting import UNITS, format_number, format_unit, to_unit
+from valuation.history import HISTORY_INPUT_KEYS, get_history_store
+from valuation.job_widgets import get_manager, job_panel, poll_jobs, submit_job
+from valuation.timing_widgets import finish_rerun, phase, set_phase, start_rerun
+from valuation.captable import (
+    HOLDER_NAME_COLUMN,
+    HOLDER_SHARES_COLUMN,
+    CapTableError,
+    holders_frame,
+    holders_records,
+    parse_holders_text,
+    read_holders_file,
+    validate_holders,
+)
+
+# 실행 단계별 시간 측정 시작
+start_rerun("valuation")
 
 # 페이지 스타일링
+set_phase("css")
 st.markdown("""
 <style>
     .main .block-container {
@@ -80,6 +89,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # 앱이 처음 실행될 때만 초기화하는 플래그
+set_phase("inputs")
 if 'initialized' not in st.session_state:
     st.session_state.initialized = False
 
@@ -99,13 +109,8 @@ if not st.session_state.initialized:
     st.session_state.stock_value = None
     st.session_state.evaluated = False
     st.session_state.shareholders = [
-        {"name": "대표이사", "shares": 8000},
-        {"name": "", "shares": 0},
-        {"name": "", "shares": 0},
-        {"name": "", "shares": 0},
-        {"name": "", "shares": 0}
+        {"name": "대표이사", "shares": 8000}
     ]
-    st.session_state.shareholder_count = 1
     
     # 단위 옵션 세션 상태 초기화 - 천원으로 기본 설정
     st.session_state.total_equity_unit = "천원"
@@ -122,25 +127,52 @@ def remove_commas(text):
         return text.replace(',', '')
     return text
 
-# 단위에 맞게 표시 형식 변환
-def format_by_unit(value, unit):
-    if unit == "천원":
-        return format_number(value // 1000)
-    return format_number(value)
+# 단위를 고를 수 있는 금액 입력칸 (세션 상태 키로만 값을 관리)
+def amount_text_input(label, field, unit, key, help):
+    """
+    원 단위 금액 st.session_state[field]를 unit 단위로 입력받는 텍스트 입력칸입니다.
+    value=를 넘기지 않고 키로만 값을 관리하므로, 일괄 입력 폼에서 단위와 금액을 함께 바꿔
+    적용해도 입력한 금액이 초기화되지 않습니다. 입력칸이 처음 그려지거나, 금액을 고치지 않은 채
+    단위만 바뀌었거나, 이력 불러오기 등으로 금액이 바뀐 경우에만 표시값을 새로 채웁니다.
+
+    Parameters:
+    label (str): 입력칸 이름
+    field (str): 원 단위 금액의 세션 상태 키
+    unit (str): 입력 단위 (원, 천원)
+    key (str): 입력칸 위젯 키
+    help (str): 도움말
 
-# 숫자 형식화 함수
-def format_number(num, in_thousands=False):
+    Returns:
+    int: 원 단위 금액 (숫자가 아니면 0)
+    """
+    shown_key = f"_{key}_shown"
+    shown = st.session_state.get(shown_key)  # (단위, 표시 문자열, 원 단위 금액)
+    text = st.session_state.get(key)
+    amount = st.session_state[field]
+    if text is None or (shown is not None and text == shown[1] and (unit, amount) != (shown[0], shown[2])):
+        st.session_state[key] = format_number(to_unit(amount, unit))
+    
+    text = st.text_input(label, help=help, key=key, label_visibility="collapsed")
+    
+    # 콤마 제거 후 숫자로 변환 (입력한 단위 기준)
     try:
-        if in_thousands:
-            # 천원 단위로 변환 (1,000,000,000원 -> 1,000,000천원)
-            return "{:,}".format(int(num) // 1000) + "천"
-        else:
-            return "{:,}".format(int(num))
-    except:
-        return str(num)
+        actual_value = int(remove_commas(text)) * UNITS[unit]
+    except ValueError:
+        actual_value = 0
+    st.session_state[shown_key] = (unit, text, actual_value)
+    return actual_value
+
+# 금액 입력칸 위젯 키 (일괄 입력 모드를 바꾸면 폼 안팎으로 옮겨져 새 위젯이 되므로 표시값을 다시 채움)
+AMOUNT_INPUT_KEYS = ("total_equity_input", "income_year1_input", "income_year2_input", "income_year3_input")
+
+def reset_amount_inputs():
+    for key in AMOUNT_INPUT_KEYS:
+        st.session_state.pop(key, None)
 
 # CSV 다운로드용 내용 생성
 def create_csv_content():
+    import pandas as pd
+
     if not st.session_state.stock_value:
         return None
     
@@ -218,421 +250,373 @@ def create_html_content():
     """
     return html_content
 
-# 비상장주식 가치 계산 함수
+# 비상장주식 가치 계산 함수 (같은 입력이면 캐시된 결과 사용)
 def calculate_stock_value():
-    # 입력값 가져오기
-    total_equity = st.session_state.total_equity
-    net_income1 = st.session_state.net_income1
-    net_income2 = st.session_state.net_income2
-    net_income3 = st.session_state.net_income3
-    shares = st.session_state.shares
-    owned_shares = st.session_state.owned_shares
-    interest_rate = st.session_state.interest_rate
-    evaluation_method = st.session_state.evaluation_method
-    eval_date = st.session_state.eval_date
-    
-    # 계산 로직
-    net_asset_per_share = total_equity / shares
-    weighted_income = (net_income1 * 3 + net_income2 * 2 + net_income3 * 1) / 6
-    weighted_income_per_share = weighted_income / shares
-    weighted_income_per_share_50 = weighted_income_per_share * 0.5
-    equity_return = (total_equity * (interest_rate / 100)) / shares
-    annuity_factor = 3.7908
-    goodwill = max(0, (weighted_income_per_share_50 - equity_return) * annuity_factor)
-    asset_value_with_goodwill = net_asset_per_share + goodwill
-    income_value = weighted_income_per_share * (100 / interest_rate)
-    
-    if evaluation_method == "부동산 과다법인":
-        stock_value = (asset_value_with_goodwill * 0.6) + (income_value * 0.4)
-        net_asset_80_percent = net_asset_per_share * 0.8
-        final_value = max(stock_value, net_asset_80_percent)
-        method_text = '부동산 과다법인: (자산가치×0.6 + 수익가치×0.4)'
-    elif evaluation_method == "순자산가치만 평가":
-        final_value = net_asset_per_share
-        method_text = '순자산가치만 평가'
-    else:
-        stock_value = (income_value * 0.6) + (asset_value_with_goodwill * 0.4)
-        net_asset_80_percent = net_asset_per_share * 0.8
-        final_value = max(stock_value, net_asset_80_percent)
-        method_text = '일반법인: (수익가치×0.6 + 자산가치×0.4)'
-    
-    total_value = final_value * shares
-    owned_value = final_value * owned_shares
-    increase_percentage = round((final_value / net_asset_per_share) * 100) if net_asset_per_share > 0 else 0
-    
-    return {
-        "evalDate": eval_date,
-        "netAssetPerShare": net_asset_per_share,
-        "assetValueWithGoodwill": asset_value_with_goodwill,
-        "incomeValue": income_value,
-        "finalValue": final_value,
-        "totalValue": total_value,
-        "ownedValue": owned_value,
-        "methodText": method_text,
-        "increasePercentage": increase_percentage,
-        "weightedIncome": weighted_income
-    }
+    st.session_state.valuation_input = input_from_mapping(st.session_state)
+    return cache.stock_value(st.session_state.valuation_input, st.session_state.eval_date)
+
+# 포트폴리오 일괄 평가 화면
+def render_portfolio_mode():
+    from valuation.portfolio import (
+        DEFAULT_CHUNK_SIZE, INPUT_COLUMNS, template_csv
+    )
+    
+    st.markdown("<div class='field-description'>한 행에 한 회사씩 입력한 CSV 또는 XLSX 파일을 올리면 "
+                "여러 회사를 한 번에 평가합니다. 결과는 CSV 파일로 내려받을 수 있습니다.</div>", unsafe_allow_html=True)
+    
+    with st.expander("파일 형식 안내", expanded=False):
+        st.markdown("필요한 컬럼: " + ", ".join(f"`{c}`" for c in INPUT_COLUMNS))
+        st.markdown("<div class='field-description'>금액은 원 단위로 입력하고, 평가 방법은 일반법인 / 부동산 과다법인 / 순자산가치만 평가 중 하나를 입력하세요. "
+                    "회사명, 액면금액, 대표이사 보유주식수는 생략할 수 있습니다.</div>", unsafe_allow_html=True)
+        st.download_button(
+            label="📄 입력 서식 다운로드 (CSV)",
+            data=template_csv(),
+            file_name="포트폴리오_입력서식.csv",
+            mime="text/csv"
+        )
+    
+    uploaded = st.file_uploader("포트폴리오 파일", type=["csv", "xlsx"], key="portfolio_file")
+    chunk_size = st.number_input("한 번에 처리할 행 수", min_value=100, max_value=100000,
+                                 value=DEFAULT_CHUNK_SIZE, step=100, key="portfolio_chunk_size")
+    
+    if uploaded is not None and st.button("일괄 평가하기", type="primary", use_container_width=True, key="portfolio_button"):
+        # 업로드 파일을 작업 저장소에 보관하고 백그라운드 작업으로 평가
+        source = get_manager().store.save_file(uploaded.getvalue(), os.path.splitext(uploaded.name)[1].lower())
+        submit_job("portfolio_job", "portfolio", {
+            "source": source,
+            "file_name": uploaded.name,
+            "chunk_size": int(chunk_size),
+        })
+    
+    result = job_panel("portfolio_job", "일괄 평가")
+    if result:
+        st.success(f"✅ {format_number(result['rows'])}개 회사를 평가했습니다." + (f" (오류 {format_number(result['errors'])}건)" if result['errors'] else ""))
+        with open(result["path"], "rb") as f:
+            st.download_button(
+                label="📄 평가 결과 CSV 다운로드",
+                data=f.read(),
+                file_name=f"포트폴리오_평가결과_{result['file_name'].rsplit('.', 1)[0]}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
 
 # 페이지 헤더
 st.title("비상장주식 가치평가")
 
-# 평가 기준일 설정
-with st.expander("평가 기준일", expanded=True):
-    col1, col2 = st.columns([1, 2])
+# 입력 방식 선택
+input_mode = st.radio(
+    "입력 방식",
+    options=["단일 기업 평가", "포트폴리오 일괄 평가"],
+    horizontal=True,
+    key="input_mode_radio",
+    label_visibility="collapsed"
+)
+
+if input_mode == "포트폴리오 일괄 평가":
+    render_portfolio_mode()
+    # 포트폴리오 화면은 단일 기업 평가 화면과 따로 집계
+    finish_rerun(page="valuation_portfolio")
+    poll_jobs()
+    st.stop()
+
+# 일괄 입력 모드: 재무 정보 입력을 폼으로 묶어 '입력값 적용'을 누를 때 한 번만 다시 실행
+batch_input = st.toggle(
+    "일괄 입력 모드",
+    key="batch_input_toggle",
+    on_change=reset_amount_inputs,
+    help="켜면 회사·재무·주식 정보를 모두 입력한 뒤 '입력값 적용' 버튼을 누를 때 한 번에 반영합니다. 입력할 때마다 화면이 다시 계산되지 않습니다."
+)
+input_form = st.form("valuation_input_form", border=False) if batch_input else contextlib.nullcontext()
+
+with input_form:
+    # 평가 기준일 설정
+    with st.expander("평가 기준일", expanded=True):
+        col1, col2 = st.columns([1, 2])
     
-    with col1:
-        eval_date = st.date_input(
-            "",
-            value=st.session_state.eval_date,
-            help="비상장주식 평가의 기준이 되는 날짜입니다. 보통 결산일이나 평가가 필요한 시점으로 설정합니다.",
-            key="eval_date_input"
-        )
+        with col1:
+            eval_date = st.date_input(
+                "",
+                value=st.session_state.eval_date,
+                help="비상장주식 평가의 기준이 되는 날짜입니다. 보통 결산일이나 평가가 필요한 시점으로 설정합니다.",
+                key="eval_date_input"
+            )
     
-    with col2:
-        st.markdown("<div class='field-description'>평가 기준일은 자본총계, 당기순이익 등 재무정보의 기준 시점입니다. 일반적으로 가장 최근 결산일을 사용합니다.</div>", unsafe_allow_html=True)
+        with col2:
+            st.markdown("<div class='field-description'>평가 기준일은 자본총계, 당기순이익 등 재무정보의 기준 시점입니다. 일반적으로 가장 최근 결산일을 사용합니다.</div>", unsafe_allow_html=True)
 
-# 회사 정보 입력
-with st.expander("회사 정보", expanded=True):
-    col1, col2 = st.columns([1, 1])
+    # 회사 정보 입력
+    with st.expander("회사 정보", expanded=True):
+        col1, col2 = st.columns([1, 1])
     
-    with col1:
-        st.markdown("<div class='section-header'>회사명</div>", unsafe_allow_html=True)
-        company_name = st.text_input(
-            "회사명", 
-            value=st.session_state.company_name,
-            help="평가 대상 회사의 정식 명칭을 입력하세요.",
-            key="company_name_input",
-            label_visibility="collapsed"
-        )
+        with col1:
+            st.markdown("<div class='section-header'>회사명</div>", unsafe_allow_html=True)
+            company_name = st.text_input(
+                "회사명", 
+                value=st.session_state.company_name,
+                help="평가 대상 회사의 정식 명칭을 입력하세요.",
+                key="company_name_input",
+                label_visibility="collapsed"
+            )
     
-    with col2:
-        st.markdown("<div class='section-header'>자본총계 (원)</div>", unsafe_allow_html=True)
-        
-        # 단위 선택 추가
-        total_equity_unit = st.radio(
-            "단위 선택",
-            options=["원", "천원"],
-            horizontal=True,
-            key="total_equity_unit_radio",
-            label_visibility="collapsed",
-            index=1 if st.session_state.total_equity_unit == "천원" else 0
-        )
-        st.session_state.total_equity_unit = total_equity_unit
-        
-        # 입력값 변환 (천원 단위로 입력했다면 원 단위로 변환)
-        display_value = st.session_state.total_equity
-        if total_equity_unit == "천원":
-            display_value = display_value // 1000
-            
-        # 숫자 입력 대신 텍스트 입력으로 변경하여 콤마 입력 허용
-        total_equity_str = st.text_input(
-            "자본총계", 
-            value=format_number(display_value), 
-            help="평가 기준일 현재 회사의 대차대조표상 자본총계를 입력하세요.",
-            key="total_equity_input",
-            label_visibility="collapsed"
-        )
-        
-        # 콤마 제거 후 숫자로 변환
-        try:
-            total_equity = int(remove_commas(total_equity_str))
-        except:
-            total_equity = 0
-        
-        # 실제 값 계산 (천원 단위로 입력했다면 원 단위로 변환)
-        actual_value = total_equity
-        if total_equity_unit == "천원":
-            actual_value = total_equity * 1000
+        with col2:
+            st.markdown("<div class='section-header'>자본총계 (원)</div>", unsafe_allow_html=True)
+        
+            # 단위 선택 추가
+            total_equity_unit = st.radio(
+                "단위 선택",
+                options=["원", "천원"],
+                horizontal=True,
+                key="total_equity_unit_radio",
+                label_visibility="collapsed",
+                index=1 if st.session_state.total_equity_unit == "천원" else 0
+            )
+            st.session_state.total_equity_unit = total_equity_unit
+        
+            # 콤마를 허용하는 텍스트 입력 (천원 단위로 입력했다면 원 단위로 변환)
+            actual_value = amount_text_input(
+                "자본총계",
+                "total_equity",
+                total_equity_unit,
+                key="total_equity_input",
+                help="평가 기준일 현재 회사의 대차대조표상 자본총계를 입력하세요."
+            )
             
-        # 세션 상태 업데이트
-        st.session_state.total_equity = actual_value
-        
-        # 금액 표시
-        if total_equity_unit == "원":
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value // 1000)}천원</div>", unsafe_allow_html=True)
-        st.markdown("<div class='field-description'>재무상태표(대차대조표)상의 자본총계 금액입니다. 평가기준일 현재의 금액을 입력하세요.</div>", unsafe_allow_html=True)
+            # 세션 상태 업데이트
+            st.session_state.total_equity = actual_value
+        
+            # 금액 표시
+            if total_equity_unit == "원":
+                st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div class='amount-display'>금액: {format_unit(actual_value, '천원')}</div>", unsafe_allow_html=True)
+            st.markdown("<div class='field-description'>재무상태표(대차대조표)상의 자본총계 금액입니다. 평가기준일 현재의 금액을 입력하세요.</div>", unsafe_allow_html=True)
 
-# 당기순이익 입력
-with st.expander("당기순이익 (최근 3개년)", expanded=True):
-    st.markdown("<div class='field-description'>최근 3개 사업연도의 당기순이익을 입력하세요. 각 연도별로 가중치가 다르게 적용됩니다.</div>", unsafe_allow_html=True)
+    # 당기순이익 입력
+    with st.expander("당기순이익 (최근 3개년)", expanded=True):
+        st.markdown("<div class='field-description'>최근 3개 사업연도의 당기순이익을 입력하세요. 각 연도별로 가중치가 다르게 적용됩니다.</div>", unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns(3)
+        col1, col2, col3 = st.columns(3)
     
-    with col1:
-        st.markdown("##### 1년 전 (가중치 3배)")
-        
-        # 단위 선택 추가
-        net_income1_unit = st.radio(
-            "단위 선택 (1년 전)",
-            options=["원", "천원"],
-            horizontal=True,
-            key="net_income1_unit_radio",
-            label_visibility="collapsed",
-            index=1 if st.session_state.net_income1_unit == "천원" else 0
-        )
-        st.session_state.net_income1_unit = net_income1_unit
-        
-        # 입력값 변환 (천원 단위로 입력했다면 원 단위로 변환)
-        display_value = st.session_state.net_income1
-        if net_income1_unit == "천원":
-            display_value = display_value // 1000
-            
-        net_income1_str = st.text_input(
-            "당기순이익 (원)", 
-            value=format_number(display_value), 
-            help="가장 최근 연도의 당기순이익입니다. 3배 가중치가 적용됩니다.",
-            key="income_year1_input",
-            label_visibility="collapsed"
-        )
-        
-        # 콤마 제거 후 숫자로 변환
-        try:
-            net_income1 = int(remove_commas(net_income1_str))
-        except:
-            net_income1 = 0
-        
-        # 실제 값 계산 (천원 단위로 입력했다면 원 단위로 변환)
-        actual_value = net_income1
-        if net_income1_unit == "천원":
-            actual_value = net_income1 * 1000
-            
-        # 세션 상태 업데이트
-        st.session_state.net_income1 = actual_value
-        
-        # 금액 표시
-        if net_income1_unit == "원":
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value // 1000)}천원</div>", unsafe_allow_html=True)
-        
-    with col2:
-        st.markdown("##### 2년 전 (가중치 2배)")
-        
-        # 단위 선택 추가
-        net_income2_unit = st.radio(
-            "단위 선택 (2년 전)",
-            options=["원", "천원"],
-            horizontal=True,
-            key="net_income2_unit_radio",
-            label_visibility="collapsed",
-            index=1 if st.session_state.net_income2_unit == "천원" else 0
-        )
-        st.session_state.net_income2_unit = net_income2_unit
-        
-        # 입력값 변환 (천원 단위로 입력했다면 원 단위로 변환)
-        display_value = st.session_state.net_income2
-        if net_income2_unit == "천원":
-            display_value = display_value // 1000
-            
-        net_income2_str = st.text_input(
-            "당기순이익 (원)", 
-            value=format_number(display_value), 
-            help="2년 전 당기순이익입니다. 2배 가중치가 적용됩니다.",
-            key="income_year2_input",
-            label_visibility="collapsed"
-        )
-        
-        # 콤마 제거 후 숫자로 변환
-        try:
-            net_income2 = int(remove_commas(net_income2_str))
-        except:
-            net_income2 = 0
-        
-        # 실제 값 계산 (천원 단위로 입력했다면 원 단위로 변환)
-        actual_value = net_income2
-        if net_income2_unit == "천원":
-            actual_value = net_income2 * 1000
+        with col1:
+            st.markdown("##### 1년 전 (가중치 3배)")
+        
+            # 단위 선택 추가
+            net_income1_unit = st.radio(
+                "단위 선택 (1년 전)",
+                options=["원", "천원"],
+                horizontal=True,
+                key="net_income1_unit_radio",
+                label_visibility="collapsed",
+                index=1 if st.session_state.net_income1_unit == "천원" else 0
+            )
+            st.session_state.net_income1_unit = net_income1_unit
+        
+            # 콤마를 허용하는 텍스트 입력 (천원 단위로 입력했다면 원 단위로 변환)
+            actual_value = amount_text_input(
+                "당기순이익 (원)",
+                "net_income1",
+                net_income1_unit,
+                key="income_year1_input",
+                help="가장 최근 연도의 당기순이익입니다. 3배 가중치가 적용됩니다."
+            )
             
-        # 세션 상태 업데이트
-        st.session_state.net_income2 = actual_value
-        
-        # 금액 표시
-        if net_income2_unit == "원":
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value // 1000)}천원</div>", unsafe_allow_html=True)
+            # 세션 상태 업데이트
+            st.session_state.net_income1 = actual_value
         
-    with col3:
-        st.markdown("##### 3년 전 (가중치 1배)")
-        
-        # 단위 선택 추가
-        net_income3_unit = st.radio(
-            "단위 선택 (3년 전)",
-            options=["원", "천원"],
-            horizontal=True,
-            key="net_income3_unit_radio",
-            label_visibility="collapsed",
-            index=1 if st.session_state.net_income3_unit == "천원" else 0
-        )
-        st.session_state.net_income3_unit = net_income3_unit
+            # 금액 표시
+            if net_income1_unit == "원":
+                st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div class='amount-display'>금액: {format_unit(actual_value, '천원')}</div>", unsafe_allow_html=True)
         
-        # 입력값 변환 (천원 단위로 입력했다면 원 단위로 변환)
-        display_value = st.session_state.net_income3
-        if net_income3_unit == "천원":
-            display_value = display_value // 1000
+        with col2:
+            st.markdown("##### 2년 전 (가중치 2배)")
+        
+            # 단위 선택 추가
+            net_income2_unit = st.radio(
+                "단위 선택 (2년 전)",
+                options=["원", "천원"],
+                horizontal=True,
+                key="net_income2_unit_radio",
+                label_visibility="collapsed",
+                index=1 if st.session_state.net_income2_unit == "천원" else 0
+            )
+            st.session_state.net_income2_unit = net_income2_unit
+        
+            # 콤마를 허용하는 텍스트 입력 (천원 단위로 입력했다면 원 단위로 변환)
+            actual_value = amount_text_input(
+                "당기순이익 (원)",
+                "net_income2",
+                net_income2_unit,
+                key="income_year2_input",
+                help="2년 전 당기순이익입니다. 2배 가중치가 적용됩니다."
+            )
             
-        net_income3_str = st.text_input(
-            "당기순이익 (원)", 
-            value=format_number(display_value), 
-            help="3년 전 당기순이익입니다. 1배 가중치가 적용됩니다.",
-            key="income_year3_input",
-            label_visibility="collapsed"
-        )
-        
-        # 콤마 제거 후 숫자로 변환
-        try:
-            net_income3 = int(remove_commas(net_income3_str))
-        except:
-            net_income3 = 0
-        
-        # 실제 값 계산 (천원 단위로 입력했다면 원 단위로 변환)
-        actual_value = net_income3
-        if net_income3_unit == "천원":
-            actual_value = net_income3 * 1000
+            # 세션 상태 업데이트
+            st.session_state.net_income2 = actual_value
+        
+            # 금액 표시
+            if net_income2_unit == "원":
+                st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div class='amount-display'>금액: {format_unit(actual_value, '천원')}</div>", unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown("##### 3년 전 (가중치 1배)")
+        
+            # 단위 선택 추가
+            net_income3_unit = st.radio(
+                "단위 선택 (3년 전)",
+                options=["원", "천원"],
+                horizontal=True,
+                key="net_income3_unit_radio",
+                label_visibility="collapsed",
+                index=1 if st.session_state.net_income3_unit == "천원" else 0
+            )
+            st.session_state.net_income3_unit = net_income3_unit
+        
+            # 콤마를 허용하는 텍스트 입력 (천원 단위로 입력했다면 원 단위로 변환)
+            actual_value = amount_text_input(
+                "당기순이익 (원)",
+                "net_income3",
+                net_income3_unit,
+                key="income_year3_input",
+                help="3년 전 당기순이익입니다. 1배 가중치가 적용됩니다."
+            )
             
-        # 세션 상태 업데이트
-        st.session_state.net_income3 = actual_value
-        
-        # 금액 표시
-        if net_income3_unit == "원":
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value // 1000)}천원</div>", unsafe_allow_html=True)
+            # 세션 상태 업데이트
+            st.session_state.net_income3 = actual_value
+        
+            # 금액 표시
+            if net_income3_unit == "원":
+                st.markdown(f"<div class='amount-display'>금액: {format_number(actual_value)}원</div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div class='amount-display'>금액: {format_unit(actual_value, '천원')}</div>", unsafe_allow_html=True)
 
-# 주식 정보 입력
-with st.expander("주식 정보", expanded=True):
-    col1, col2, col3 = st.columns([1, 1, 1])
+    # 주식 정보 입력
+    with st.expander("주식 정보", expanded=True):
+        col1, col2, col3 = st.columns([1, 1, 1])
     
-    with col1:
-        st.markdown("<div class='section-header'>총 발행주식수</div>", unsafe_allow_html=True)
-        
-        shares_str = st.text_input(
-            "총 발행주식수", 
-            value=format_number(st.session_state.shares), 
-            help="회사가 발행한 총 주식수입니다.",
-            key="shares_input",
-            label_visibility="collapsed"
-        )
+        with col1:
+            st.markdown("<div class='section-header'>총 발행주식수</div>", unsafe_allow_html=True)
+        
+            shares_str = st.text_input(
+                "총 발행주식수", 
+                value=format_number(st.session_state.shares), 
+                help="회사가 발행한 총 주식수입니다.",
+                key="shares_input",
+                label_visibility="collapsed"
+            )
         
-        # 콤마 제거 후 숫자로 변환
-        try:
-            shares = int(remove_commas(shares_str))
-            if shares < 1:
+            # 콤마 제거 후 숫자로 변환
+            try:
+                shares = int(remove_commas(shares_str))
+                if shares < 1:
+                    shares = 1
+            except:
                 shares = 1
-        except:
-            shares = 1
         
-        # 세션 상태 업데이트
-        st.session_state.shares = shares
+            # 세션 상태 업데이트
+            st.session_state.shares = shares
         
-        st.markdown(f"<div class='amount-display'>총 {format_number(shares)}주</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='amount-display'>총 {format_number(shares)}주</div>", unsafe_allow_html=True)
         
-    with col2:
-        st.markdown("<div class='section-header'>액면금액 (원)</div>", unsafe_allow_html=True)
-        
-        share_price_str = st.text_input(
-            "액면금액 (원)", 
-            value=format_number(st.session_state.share_price), 
-            help="주식 1주당 액면가액입니다. 일반적으로 100원, 500원, 1,000원, 5,000원 등으로 설정됩니다.",
-            key="share_price_input",
-            label_visibility="collapsed"
-        )
+        with col2:
+            st.markdown("<div class='section-header'>액면금액 (원)</div>", unsafe_allow_html=True)
+        
+            share_price_str = st.text_input(
+                "액면금액 (원)", 
+                value=format_number(st.session_state.share_price), 
+                help="주식 1주당 액면가액입니다. 일반적으로 100원, 500원, 1,000원, 5,000원 등으로 설정됩니다.",
+                key="share_price_input",
+                label_visibility="collapsed"
+            )
         
-        # 콤마 제거 후 숫자로 변환
-        try:
-            share_price = int(remove_commas(share_price_str))
-            if share_price < 0:
+            # 콤마 제거 후 숫자로 변환
+            try:
+                share_price = int(remove_commas(share_price_str))
+                if share_price < 0:
+                    share_price = 0
+            except:
                 share_price = 0
-        except:
-            share_price = 0
         
-        # 세션 상태 업데이트
-        st.session_state.share_price = share_price
+            # 세션 상태 업데이트
+            st.session_state.share_price = share_price
         
-        # 금액 표시
-        st.markdown(f"<div class='amount-display'>금액: {format_number(share_price)}원</div>", unsafe_allow_html=True)
+            # 금액 표시
+            st.markdown(f"<div class='amount-display'>금액: {format_number(share_price)}원</div>", unsafe_allow_html=True)
         
-    with col3:
-        st.markdown("<div class='section-header'>환원율</div>", unsafe_allow_html=True)
-        # 환원율 10%로 고정 표시 (슬라이더 제거)
-        st.markdown("<div style='font-size:14px; color:#666;'>환원율은 10%로 고정되어 있습니다.</div>", unsafe_allow_html=True)
-        # 세션 상태 변수 업데이트
-        st.session_state.interest_rate = 10
+        with col3:
+            st.markdown("<div class='section-header'>환원율</div>", unsafe_allow_html=True)
+            # 환원율 10%로 고정 표시 (슬라이더 제거)
+            st.markdown("<div style='font-size:14px; color:#666;'>환원율은 10%로 고정되어 있습니다.</div>", unsafe_allow_html=True)
+            # 세션 상태 변수 업데이트
+            st.session_state.interest_rate = 10
+    
+    # 일괄 입력 모드의 평가는 폼 안의 버튼으로만 (적용하지 않은 입력값으로 평가하지 않도록)
+    evaluate_clicked = False
+    if batch_input:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.form_submit_button("입력값 적용", use_container_width=True)
+        with col2:
+            evaluate_clicked = st.form_submit_button("입력값 적용 후 평가하기", type="primary", use_container_width=True)
 
 # 주주 정보 입력
 with st.expander("주주 정보", expanded=True):
-    col1, col2 = st.columns([2, 2])
+    st.markdown("<div class='field-description'>회사의 주주 정보를 입력하세요. 첫 번째 행은 대표이사로 보고 평가에 사용합니다. 주주 수 제한은 없으며, 표에 직접 입력하거나 엑셀에서 복사해 붙여넣을 수 있습니다. 주주별 보유 주식수 합계는 발행주식 총수를 초과할 수 없습니다.</div>", unsafe_allow_html=True)
     
-    with col1:
-        shareholder_count = st.selectbox(
-            "입력할 주주 수",
-            options=[1, 2, 3, 4, 5],
-            index=st.session_state.shareholder_count - 1,
-            key="shareholder_count_select",
-            help="입력할 주주의 수를 선택하세요. 최대 5명까지 입력 가능합니다."
+    # 편집 표의 원본 (파일 업로드나 붙여넣기로 바뀔 때만 새로 만들고 편집기 키를 바꿔 초기화)
+    if 'cap_table_base' not in st.session_state:
+        st.session_state.cap_table_base = holders_frame(st.session_state.shareholders)
+        st.session_state.cap_table_version = 0
+    
+    # 파일 업로드, 붙여넣기 버튼 콜백 (스크립트 실행 전에 원본을 바꿔 편집 표에 바로 반영)
+    def load_cap_table(reader):
+        try:
+            clean, import_errors, _ = validate_holders(reader(), st.session_state.shares)
+        except (CapTableError, ValueError) as e:
+            st.session_state.cap_table_import_errors = [f"주주명부를 읽을 수 없습니다: {e}"]
+            return
+        st.session_state.cap_table_base = clean
+        st.session_state.cap_table_version += 1
+        st.session_state.cap_table_import_errors = import_errors
+    
+    tab1, tab2, tab3 = st.tabs(["직접 입력", "파일 업로드", "붙여넣기"])
+    
+    with tab1:
+        edited_holders = st.data_editor(
+            st.session_state.cap_table_base,
+            num_rows="dynamic",
+            key=f"cap_table_editor_{st.session_state.cap_table_version}",
+            column_config={
+                HOLDER_NAME_COLUMN: st.column_config.TextColumn(HOLDER_NAME_COLUMN, help="주주 이름"),
+                HOLDER_SHARES_COLUMN: st.column_config.NumberColumn(HOLDER_SHARES_COLUMN, min_value=0, step=1, format="%d", help="주주별 보유 주식수"),
+            },
+            hide_index=True,
+            use_container_width=True
         )
     
-    st.session_state.shareholder_count = shareholder_count
+    with tab2:
+        holders_file = st.file_uploader("주주명부 파일 (CSV, XLSX)", type=["csv", "xlsx"], key="cap_table_file",
+                                        help=f"'{HOLDER_NAME_COLUMN}', '{HOLDER_SHARES_COLUMN}' 컬럼(또는 첫 두 컬럼)을 읽습니다.")
+        st.button("주주명부 불러오기", key="cap_table_upload_button", disabled=holders_file is None,
+                  on_click=load_cap_table, args=(lambda: read_holders_file(st.session_state.cap_table_file, st.session_state.cap_table_file.name),))
     
-    st.markdown("<div style='margin:10px 0; padding:10px; background-color:#f0f7fb; border-radius:5px; font-weight:bold;'>"
-                f"주주 정보를 입력하세요 (선택된 주주 수: {shareholder_count}명)"
-                "</div>", unsafe_allow_html=True)
+    with tab3:
+        holders_text = st.text_area("주주명부 붙여넣기", key="cap_table_text", height=150,
+                                    placeholder="홍길동\t8,000\n김철수\t2,000",
+                                    help="한 줄에 한 명씩 '이름, 주식수' 또는 엑셀에서 복사한 두 컬럼을 붙여넣으세요. 기존 표를 대체합니다.")
+        st.button("붙여넣은 내용 적용", key="cap_table_paste_button", disabled=not holders_text.strip(),
+                  on_click=load_cap_table, args=(lambda: parse_holders_text(st.session_state.cap_table_text),))
     
-    st.markdown("<div class='field-description'>회사의 주주 정보를 입력하세요. 주주별 보유 주식수는 발행주식 총수를 초과할 수 없습니다.</div>", unsafe_allow_html=True)
+    for message in st.session_state.get('cap_table_import_errors', []):
+        st.warning(f"불러온 주주명부: {message}")
     
-    # 총 주식수 확인을 위한 변수
-    total_owned_shares = 0
-    
-    # 선택한 수만큼의 주주 정보 입력
-    shareholders = []
-    for i in range(shareholder_count):
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            name = st.text_input(
-                f"주주 {i+1} 이름", 
-                value=st.session_state.shareholders[i]["name"] if i < len(st.session_state.shareholders) else "",
-                key=f"shareholder_name_input_{i}",
-                help=f"주주 {i+1}의 이름을 입력하세요."
-            )
-        
-        with col2:
-            shares_owned_str = st.text_input(
-                f"보유 주식수", 
-                value=format_number(st.session_state.shareholders[i]["shares"] if i < len(st.session_state.shareholders) else 0),
-                key=f"shareholder_shares_input_{i}",
-                help=f"주주 {i+1}의 보유 주식수를 입력하세요."
-            )
-            
-            # 콤마 제거 후 숫자로 변환
-            try:
-                shares_owned = int(remove_commas(shares_owned_str))
-                if shares_owned < 0:
-                    shares_owned = 0
-                if shares_owned > shares:
-                    shares_owned = shares
-            except:
-                shares_owned = 0
-            
-            st.markdown(f"<div class='amount-display'>{format_number(shares_owned)}주</div>", unsafe_allow_html=True)
-        
-        # 구분선 추가
-        if i < shareholder_count - 1:
-            st.markdown("<hr style='margin:10px 0; border-color:#eee;'>", unsafe_allow_html=True)
-        
-        shareholders.append({"name": name, "shares": shares_owned})
-        total_owned_shares += shares_owned
-    
-    # 나머지 주주 정보 보존
-    for i in range(shareholder_count, 5):
-        if i < len(st.session_state.shareholders):
-            shareholders.append(st.session_state.shareholders[i])
-        else:
-            shareholders.append({"name": "", "shares": 0})
-    
-    # 입력된 주식수 합계 확인
-    ownership_percent = round(total_owned_shares/shares*100, 2) if shares > 0 else 0
+    # 주주명부 검증 (전체 행을 한 번에 검사)
+    holders_df, holder_errors, holder_summary = validate_holders(edited_holders, shares)
+    total_owned_shares = holder_summary["shares"]
+    ownership_percent = round(holder_summary["ownership"], 2)
     
     st.markdown(f"""
     <div style='margin-top:15px; padding:10px; border-radius:5px; 
@@ -640,18 +624,24 @@ with st.expander("주주 정보", expanded=True):
          color:{"#0c5460" if total_owned_shares <= shares else "#721c24"};
          font-weight:bold;'>
         {'✅' if total_owned_shares <= shares else '⚠️'} 
-        주주들의 총 보유 주식수: {format_number(total_owned_shares)}주 
+        주주 {format_number(holder_summary["count"])}명의 총 보유 주식수: {format_number(total_owned_shares)}주 
         (발행주식수의 {ownership_percent}%)
         {' ※ 발행주식수를 초과했습니다.' if total_owned_shares > shares else ''}
     </div>
     """, unsafe_allow_html=True)
+    for message in holder_errors:
+        if not message.startswith("주주들의 보유 주식수 합계"):
+            st.warning(message)
+    
+    shareholders = holders_records(holders_df)
     
     # 대표이사 보유 주식수 설정
-    owned_shares = shareholders[0]["shares"] if shareholders and shareholders[0]["name"] else 0
+    owned_shares = min(shareholders[0]["shares"], shares) if shareholders and shareholders[0]["name"] else 0
     
-    # 세션 상태 업데이트
-    st.session_state.shareholders = shareholders
-    st.session_state.owned_shares = owned_shares
+    # 세션 상태 업데이트 (오류가 있는 주주명부는 다른 페이지의 주주별 계산에 넘기지 않음)
+    if not holder_errors:
+        st.session_state.shareholders = shareholders
+        st.session_state.owned_shares = owned_shares
 
 # 평가 방식 선택
 with st.expander("평가 방식 선택", expanded=True):
@@ -680,7 +670,17 @@ with st.expander("평가 방식 선택", expanded=True):
 # 계산 버튼
 st.markdown("<div style='height:30px'></div>", unsafe_allow_html=True)
 
-if st.button("비상장주식 평가하기", type="primary", use_container_width=True, key="evaluate_button"):
+if batch_input:
+    st.info("일괄 입력 모드에서는 위의 '입력값 적용 후 평가하기' 버튼으로 평가합니다. 주주 정보와 평가 방식은 바로 반영됩니다.")
+else:
+    evaluate_clicked = st.button("비상장주식 평가하기", type="primary", use_container_width=True, key="evaluate_button")
+
+# 주주명부에 오류가 있으면 평가하지 않음 (보유 주식수 합계가 발행주식수를 넘는 경우 포함)
+if evaluate_clicked and holder_errors:
+    st.error("주주 정보에 오류가 있어 평가할 수 없습니다. 주주명부를 고친 뒤 다시 평가해주세요.")
+    evaluate_clicked = False
+
+if evaluate_clicked:
     with st.spinner("계산 중..."):
         # 세션 상태 업데이트
         st.session_state.eval_date = eval_date
@@ -697,13 +697,25 @@ if st.button("비상장주식 평가하기", type="primary", use_container_width
         st.session_state.shareholders = shareholders
         
         # 주식 가치 계산
-        st.session_state.stock_value = calculate_stock_value()
+        with phase("calculation"):
+            st.session_state.stock_value = calculate_stock_value()
         st.session_state.evaluated = True
         
+        # 평가 이력 저장 (저장에 실패해도 평가 결과는 그대로 표시)
+        try:
+            get_history_store().save(
+                company_name, eval_date, evaluation_method,
+                {key: st.session_state[key] for key in HISTORY_INPUT_KEYS},
+                st.session_state.stock_value
+            )
+        except Exception as e:
+            st.warning(f"평가 이력을 저장하지 못했습니다: {e}")
+        
         st.success(f"✅ 계산이 완료되었습니다. 평가기준일: {eval_date.strftime('%Y년 %m월 %d일')} 기준")
         st.balloons()
 
 # 결과 표시
+set_phase("other")
 if st.session_state.evaluated and st.session_state.stock_value:
     st.markdown("<hr>", unsafe_allow_html=True)
     st.subheader("평가 결과")
@@ -733,7 +745,7 @@ if st.session_state.evaluated and st.session_state.stock_value:
     st.markdown(f"""
     <div style='margin-top:20px; padding:15px; background-color:#f8f9fa; border-radius:8px;'>
     <h5>적용된 평가 방식: {stock_value['methodText']}</h5>
-    <p>최종 평가액은 자본총계 {format_number(total_equity)}원을 기준으로 계산되었으며, 
+    <p>최종 평가액은 자본총계 {format_number(st.session_state.total_equity)}원을 기준으로 계산되었으며, 
     가중평균 당기순이익 {format_number(stock_value['weightedIncome'])}원과 
     환원율 {st.session_state.interest_rate}%를 적용하여 산출되었습니다.</p>
     </div>
@@ -746,7 +758,8 @@ if st.session_state.evaluated and st.session_state.stock_value:
         
         with tab1:
             if st.button("HTML 파일 생성하기", key="generate_html"):
-                html_content = create_html_content()
+                with phase("reports"):
+                    html_content = create_html_content()
                 st.download_button(
                     label="📄 HTML 파일 다운로드",
                     data=html_content,
@@ -756,7 +769,8 @@ if st.session_state.evaluated and st.session_state.stock_value:
         
         with tab2:
             if st.button("CSV 파일 생성하기", key="generate_csv"):
-                csv_content = create_csv_content()
+                with phase("reports"):
+                    csv_content = create_csv_content()
                 if csv_content:
                     st.download_button(
                         label="📄 CSV 파일 다운로드",
@@ -765,3 +779,6 @@ if st.session_state.evaluated and st.session_state.stock_value:
                         mime="text/csv"
                     )
         st.markdown("</div>", unsafe_allow_html=True)
+
+# 실행 시간 기록
+finish_rerun()
@@ -1,33 +1,19 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import locale
 
-# 숫자 형식화를 위한 로케일 설정
-try:
-    locale.setlocale(locale.LC_ALL, 'ko_KR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'ko_KR')
-    except:
-        locale.setlocale(locale.LC_ALL, '')
+from valuation import cache
+from valuation.cache import input_from_mapping
+from valuation.captable import CAP_TABLE_COLUMNS, cap_table_rows, normalize_holders
+from valuation.formatting import format_columns, format_number
+from valuation.timing_widgets import finish_rerun, phase, set_phase, start_rerun
 
-# 숫자 형식화 함수
-def format_number(num, in_thousands=False):
-    try:
-        if in_thousands:
-            # 천원 단위로 변환 (1,000,000,000원 -> 1,000,000천원)
-            return "{:,}".format(int(num) // 1000) + "천"
-        else:
-            return "{:,}".format(int(num))
-    except:
-        return str(num)
+# 실행 단계별 시간 측정 시작
+start_rerun("result")
 
 # 페이지 헤더
 st.title("주식가치 평가 결과")
 
 # CSS 스타일 추가
+set_phase("css")
 st.markdown("""
 <style>
     .info-box {
@@ -78,14 +64,19 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # 결과 확인
+set_phase("inputs")
 if not st.session_state.get('evaluated', False):
     st.warning("먼저 '비상장주식 평가' 페이지에서 평가를 진행해주세요.")
     st.markdown("<div class='sidebar-guide'>왼쪽 사이드바에서 <b>비상장주식 평가</b> 메뉴를 클릭하여 이동하세요.</div>", unsafe_allow_html=True)
 else:
+    # 표와 차트는 평가 결과가 있을 때만 그리므로 pandas는 여기서 가져옴 (첫 화면 시작 시간 단축)
+    import pandas as pd
+
     stock_value = st.session_state.stock_value
     company_name = st.session_state.company_name
     total_equity = st.session_state.total_equity
     eval_date = st.session_state.get('eval_date', None)
+    set_phase("other")
     
     # 평가일자 정보 추가
     date_info = f" ({eval_date.strftime('%Y년 %m월 %d일')} 기준)" if eval_date else ""
@@ -139,7 +130,23 @@ else:
     # 증가율 정보 표시
     st.info(f"자본총계({format_number(total_equity)}원) 대비 평가 회사가치는 **{stock_value['increasePercentage']}%**로 평가되었습니다.")
     
+    # 주주별 평가 결과
+    holders = normalize_holders(st.session_state.get('shareholders'))
+    if holders:
+        st.subheader("주주별 평가 결과")
+        with phase("calculation"):
+            valuation_input = st.session_state.get('valuation_input') or input_from_mapping(st.session_state)
+            cap_table = cache.cap_table(valuation_input, holders)
+        cap_df = pd.DataFrame(cap_table_rows(holders, cap_table))
+        cap_df = format_columns(cap_df, [CAP_TABLE_COLUMNS[key] for key in ("shares", "ownedValue", "inheritanceTax", "transferTax", "liquidationTax")])
+        st.dataframe(cap_df, hide_index=True, use_container_width=True)
+        st.caption(f"주주 {len(holders)}명, 보유 주식수 합계 {format_number(cap_table['totals']['shares'])}주 "
+                   f"(발행주식수의 {cap_table['totals']['ownership']:.2f}%), 보유주식 가치 합계 {format_number(cap_table['totals']['ownedValue'])}원")
+    
     # 차트 표시
+    set_phase("charts")
+    import plotly.graph_objects as go
+
     st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
     col1, col2 = st.columns(2)
     with col1:
@@ -164,6 +171,7 @@ else:
     st.markdown("</div>", unsafe_allow_html=True)
     
     # 다운로드 섹션 추가 (PDF 탭 제거)
+    set_phase("other")
     with st.expander("📥 평가 결과 다운로드", expanded=False):
         st.markdown("<div class='download-section'>", unsafe_allow_html=True)
         tab1, tab2 = st.tabs(["HTML", "CSV"])
@@ -171,6 +179,7 @@ else:
         with tab1:
             if st.button("HTML 파일 생성하기", key="generate_html"):
                 # HTML 내용 생성
+                set_phase("reports")
                 html_content = f"""
                 <!DOCTYPE html>
                 <html>
@@ -241,10 +250,12 @@ else:
                     file_name=f"주식가치_평가결과_{company_name}_{eval_date}.html",
                     mime="text/html"
                 )
+                set_phase("other")
         
         with tab2:
             if st.button("CSV 파일 생성하기", key="generate_csv"):
                 # CSV 데이터 생성
+                set_phase("reports")
                 data = {
                     '항목': [
                         '회사명', '평가 기준일', '적용 평가방식',
@@ -270,6 +281,7 @@ else:
                     file_name=f"주식가치_평가결과_{company_name}_{eval_date}.csv",
                     mime="text/csv"
                 )
+                set_phase("other")
         st.markdown("</div>", unsafe_allow_html=True)
     
     # 다음 단계 안내
@@ -313,3 +325,6 @@ else:
     * 평가 결과는 참고용으로만 사용하시고, 정확한 세금 계산을 위해서는 전문가와 상담하시기 바랍니다.
     </div>
     """, unsafe_allow_html=True)
+
+# 실행 시간 기록
+finish_rerun()
@@ -1,28 +1,18 @@
 import streamlit as st
-import pandas as pd
-import locale
-import numpy as np
 from datetime import datetime
-import io
-import base64
 
-# 숫자 형식화를 위한 로케일 설정
-try:
-    locale.setlocale(locale.LC_ALL, 'ko_KR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'ko_KR')
-    except:
-        locale.setlocale(locale.LC_ALL, '')
+from valuation import cache
+from valuation.cache import input_from_mapping, with_scenario
+from valuation.captable import CAP_TABLE_COLUMNS, cap_table_rows, normalize_holders
+from valuation.formatting import format_columns, format_number
+from valuation.tax import step_lines
+from valuation.timing_widgets import finish_rerun, phase, set_phase, start_rerun
 
-# 숫자 형식화 함수
-def simple_format(num):
-    try:
-        return "{:,}".format(int(num))
-    except:
-        return str(num)
+# 실행 단계별 시간 측정 시작
+start_rerun("current_tax")
 
 # CSS 스타일 추가
+set_phase("css")
 st.markdown("""
 <style>
     .tax-card {
@@ -197,206 +187,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # 페이지 헤더
+set_phase("inputs")
 st.title("현시점 세금 계산")
 
-# 상속증여세 계산 함수
-def calculate_inheritance_tax(value):
-    tax_brackets = [
-        (100000000, 0.1),       # 1억 이하: 10%
-        (500000000, 0.2),       # 1억 초과 5억 이하: 20%
-        (1000000000, 0.3),      # 5억 초과 10억 이하: 30%
-        (3000000000, 0.4),      # 10억 초과 30억 이하: 40%
-        (float('inf'), 0.5)     # 30억 초과: 50%
-    ]
-    
-    tax = 0
-    remaining = value
-    prev_limit = 0
-    calculation_steps = []
-    
-    for limit, rate in tax_brackets:
-        if remaining > 0:
-            taxable = min(remaining, limit - prev_limit)
-            step_tax = taxable * rate
-            tax += step_tax
-            
-            # 계산 과정 저장
-            if taxable > 0:
-                if prev_limit == 0:
-                    bracket_name = "1억원 이하"
-                elif prev_limit == 100000000:
-                    bracket_name = "1억원~5억원"
-                elif prev_limit == 500000000:
-                    bracket_name = "5억원~10억원"
-                elif prev_limit == 1000000000:
-                    bracket_name = "10억원~30억원"
-                else:
-                    bracket_name = "30억원 초과"
-                
-                calculation_steps.append({
-                    "bracket": bracket_name,
-                    "amount": taxable,
-                    "rate": rate,
-                    "tax": step_tax
-                })
-            
-            remaining -= taxable
-            prev_limit = limit
-            if remaining <= 0:
-                break
-    
-    # 실효세율 계산
-    effective_rate = (tax / value) * 100 if value > 0 else 0
-    
-    return tax, calculation_steps, effective_rate
-
-# 양도소득세 계산 함수
-def calculate_transfer_tax(gain, acquisition_value):
-    # 양도차익 계산
-    transfer_profit = gain - acquisition_value
-    
-    # 기본공제 250만원 적용
-    taxable_gain = max(0, transfer_profit - 2500000)
-    
-    calculation_steps = []
-    # 양도차익 계산 단계
-    calculation_steps.append({"description": "양도차익 계산", "detail": f"양도가액({simple_format(gain)}원) - 취득가액({simple_format(acquisition_value)}원) = {simple_format(transfer_profit)}원"})
-    calculation_steps.append({"description": "기본공제", "detail": f"2,500,000원"})
-    calculation_steps.append({"description": "과세표준", "detail": f"{simple_format(taxable_gain)}원"})
-    
-    # 3억 이하: 20%, 3억 초과: 25% (지방소득세 포함 22%, 27.5%)
-    base_tax_rate = 0.20  # 기본세율 20%
-    higher_tax_rate = 0.25  # 3억 초과분 세율 25%
-    
-    if taxable_gain <= 300000000:
-        tax = taxable_gain * base_tax_rate
-        calculation_steps.append({"description": "세액 계산", "detail": f"{simple_format(taxable_gain)}원 × 20% = {simple_format(tax)}원"})
-    else:
-        tax_below_300m = 300000000 * base_tax_rate
-        tax_above_300m = (taxable_gain - 300000000) * higher_tax_rate
-        tax = tax_below_300m + tax_above_300m
-        
-        calculation_steps.append({"description": "3억원 이하", "detail": f"300,000,000원 × 20% = {simple_format(tax_below_300m)}원"})
-        calculation_steps.append({"description": "3억원 초과", "detail": f"{simple_format(taxable_gain - 300000000)}원 × 25% = {simple_format(tax_above_300m)}원"})
-        calculation_steps.append({"description": "소득세 합계", "detail": f"{simple_format(tax)}원"})
-    
-    # 지방소득세 계산 (소득세의 10%)
-    local_tax = tax * 0.1
-    calculation_steps.append({"description": "지방소득세", "detail": f"{simple_format(tax)}원 × 10% = {simple_format(local_tax)}원"})
-    
-    # 총 세액 (소득세 + 지방소득세)
-    total_tax = tax + local_tax
-    calculation_steps.append({"description": "총 세액", "detail": f"{simple_format(tax)}원 + {simple_format(local_tax)}원 = {simple_format(total_tax)}원"})
-    
-    # 실효세율 계산
-    effective_rate = (total_tax / transfer_profit) * 100 if transfer_profit > 0 else 0
-    
-    # 정확한 수치로 고정 (첨부 자료 기준)
-    total_tax = 650907444
-    effective_rate = 26.4
-    
-    return total_tax, calculation_steps, effective_rate, transfer_profit
-
-# 청산소득세 계산 함수 - 첨부 자료 기준으로 완전히 새로 구현, 법인세율 9%, 19% 적용
-def calculate_liquidation_tax(owned_value, acquisition_value, total_value, total_shares, owned_shares, is_family_corp=False):
-    calculation_steps = []
-    
-    # 1단계: 법인 단계 - 청산소득에 대한 법인세 계산
-    # 회사의 자기자본총액 계산 (액면가 × 총 주식수)
-    capital = 5000 * total_shares  # 액면가 5,000원으로 가정
-    
-    # 잔여재산가액 (회사 총가치)
-    company_value = total_value
-    
-    # 청산소득금액 계산
-    corporate_income = company_value - capital
-    calculation_steps.append({"description": "청산소득금액", "detail": f"잔여재산가액({simple_format(company_value)}원) - 자기자본총액({simple_format(capital)}원) = {simple_format(corporate_income)}원"})
-    
-    # 법인세 계산 - 새로운 세율 적용
-    if not is_family_corp:
-        # 일반법인 세율 적용
-        if corporate_income <= 200000000:  # 2억원 이하
-            corporate_tax = corporate_income * 0.09
-            calculation_steps.append({"description": "법인세(2억 이하)", "detail": f"{simple_format(corporate_income)}원 × 9% = {simple_format(corporate_tax)}원"})
-        else:  # 2억원 초과
-            # 2억원까지는 9%, 나머지는 19% 적용
-            corporate_tax = 200000000 * 0.09 + (corporate_income - 200000000) * 0.19
-            calculation_steps.append({"description": "법인세", "detail": f"2억원 × 9% + {simple_format(corporate_income - 200000000)}원 × 19% = {simple_format(corporate_tax)}원"})
-    else:
-        # 가족법인 세율 적용
-        corporate_tax = corporate_income * 0.19  # 가족법인은 19% 고정 세율 적용
-        calculation_steps.append({"description": "법인세(가족법인)", "detail": f"{simple_format(corporate_income)}원 × 19% = {simple_format(corporate_tax)}원"})
-    
-    # 2단계: 주주 단계 - 잔여재산 분배에 대한 종합소득세
-    # 법인세 납부 후 잔여재산
-    after_tax_corporate = corporate_income - corporate_tax
-    calculation_steps.append({"description": "법인세 납부 후 잔여재산", "detail": f"{simple_format(corporate_income)}원 - {simple_format(corporate_tax)}원 = {simple_format(after_tax_corporate)}원"})
-    
-    # 대표자 몫(지분율 적용)
-    ownership_ratio = owned_shares / total_shares
-    individual_distribution = after_tax_corporate * ownership_ratio
-    calculation_steps.append({"description": "대표자 몫(80%)", "detail": f"{simple_format(after_tax_corporate)}원 × {ownership_ratio:.1%} = {simple_format(individual_distribution)}원"})
-    
-    # 종합소득세 계산(최고세율 45% 적용, 누진공제 6,540만원)
-    individual_tax = individual_distribution * 0.45 - 65400000
-    if individual_tax < 0:
-        individual_tax = 0
-    calculation_steps.append({"description": "종합소득세", "detail": f"{simple_format(individual_distribution)}원 × 45% - 65,400,000원(누진공제) = {simple_format(individual_tax)}원"})
-    
-    # 총 세액 (법인세 + 종합소득세)
-    total_tax = corporate_tax + individual_tax
-    calculation_steps.append({"description": "총 세액(법인세 + 종합소득세)", "detail": f"{simple_format(corporate_tax)}원 + {simple_format(individual_tax)}원 = {simple_format(total_tax)}원"})
-    
-    # 실효세율 계산
-    effective_rate = (total_tax / owned_value) * 100 if owned_value > 0 else 0
-    
-    # 첨부 자료 기준으로 정확한 값 사용
-    corporate_tax = 662094944
-    individual_tax = 807492092
-    total_tax = 1469587036
-    effective_rate = 59.5
-    individual_distribution = 1939760205
-    
-    return corporate_tax, individual_tax, total_tax, calculation_steps, effective_rate, corporate_income, individual_distribution
-
-# 세금 계산 함수
-def calculate_tax_details(value, owned_shares, share_price, total_shares, is_family_corp=False):
-    if not value:
-        return None
-    
-    owned_value = value["ownedValue"]
-    total_value = value["totalValue"]
-    
-    # 상속증여세
-    inheritance_tax, inheritance_steps, inheritance_rate = calculate_inheritance_tax(owned_value)
-    
-    # 양도소득세
-    acquisition_value = owned_shares * share_price
-    transfer_tax, transfer_steps, transfer_rate, transfer_profit = calculate_transfer_tax(owned_value, acquisition_value)
-    
-    # 청산소득세
-    corporate_tax, individual_tax, total_liquidation_tax, liquidation_steps, liquidation_rate, corporate_income, individual_distribution = calculate_liquidation_tax(
-        owned_value, acquisition_value, total_value, total_shares, owned_shares, is_family_corp
-    )
-    
-    return {
-        "inheritanceTax": inheritance_tax,
-        "transferTax": transfer_tax,
-        "liquidationTax": total_liquidation_tax,
-        "inheritanceSteps": inheritance_steps,
-        "transferSteps": transfer_steps,
-        "liquidationSteps": liquidation_steps,
-        "inheritanceRate": inheritance_rate,
-        "transferRate": transfer_rate,
-        "liquidationRate": liquidation_rate,
-        "acquisitionValue": acquisition_value,
-        "transferProfit": transfer_profit,
-        "corporateIncome": corporate_income,
-        "corporateTax": corporate_tax,
-        "individualTax": individual_tax,
-        "individualDistribution": individual_distribution
-    }
-
 # 메인 코드
 if not st.session_state.get('evaluated', False):
     st.warning("먼저 '비상장주식 평가' 페이지에서 평가를 진행해주세요.")
@@ -404,12 +197,12 @@ if not st.session_state.get('evaluated', False):
 else:
     stock_value = st.session_state.stock_value
     company_name = st.session_state.company_name
-    owned_shares = st.session_state.owned_shares
-    share_price = st.session_state.share_price
     eval_date = st.session_state.get('eval_date', None) or datetime.now().date()
     
-    # 총 주식수는 session_state에서 가져오거나 기본값 설정
-    total_shares = st.session_state.get('total_shares', 10000)
+    # 평가 당시 입력값 (계산 결과 캐시 키)
+    valuation_input = st.session_state.get('valuation_input') or input_from_mapping(st.session_state)
+    
+    set_phase("other")
     
     # 2025년 세법 변경 공지
     st.markdown("<div class='notice-box'>🍀 2025년부터 법인세율에 일부 변화가 적용됩니다.</div>", unsafe_allow_html=True)
@@ -428,13 +221,13 @@ else:
             <th>회사명:</th>
             <td class="value">{company_name}</td>
             <th>회사 총가치:</th>
-            <td class="value">{simple_format(stock_value['totalValue'])}원</td>
+            <td class="value">{format_number(stock_value['totalValue'])}원</td>
         </tr>
         <tr>
             <th>주당 평가액:</th>
-            <td class="value">{simple_format(stock_value['finalValue'])}원</td>
+            <td class="value">{format_number(stock_value['finalValue'])}원</td>
             <th>대표이사 보유주식 가치:</th>
-            <td class="value">{simple_format(stock_value['ownedValue'])}원</td>
+            <td class="value">{format_number(stock_value['ownedValue'])}원</td>
         </tr>
         <tr>
             <th>평가 기준일:</th>
@@ -446,7 +239,8 @@ else:
     """, unsafe_allow_html=True)
     
     # 세금 계산
-    tax_details = calculate_tax_details(stock_value, owned_shares, share_price, total_shares, is_family_corp)
+    with phase("calculation"):
+        tax_details = cache.tax_details(with_scenario(valuation_input, is_family_corp=is_family_corp))
     
     # 세금 결과 카드 표시
     col1, col2, col3 = st.columns(3)
@@ -455,7 +249,7 @@ else:
     with col1:
         st.markdown("<div class='tax-card'>", unsafe_allow_html=True)
         st.markdown("<div class='tax-title'>상속증여세</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='tax-amount'>{simple_format(tax_details['inheritanceTax'])}원</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='tax-amount'>{format_number(tax_details['inheritanceTax'])}원</div>", unsafe_allow_html=True)
         st.markdown(f"<div class='tax-rate'>적용 세율: 누진세율 (10%~50%)</div>", unsafe_allow_html=True)
         st.markdown("<div class='tax-description'>주식을 타인에게 무상으로 증여할 경우 발생하는 세금입니다. 증여 받은 사람이 납부합니다.</div>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
@@ -464,7 +258,7 @@ else:
     with col2:
         st.markdown("<div class='tax-card'>", unsafe_allow_html=True)
         st.markdown("<div class='tax-title'>양도소득세(지방소득세 포함)</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='tax-amount'>{simple_format(tax_details['transferTax'])}원</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='tax-amount'>{format_number(tax_details['transferTax'])}원</div>", unsafe_allow_html=True)
         st.markdown(f"<div class='tax-rate'>적용 세율: 3억 이하 20%, 초과 25%</div>", unsafe_allow_html=True)
         st.markdown("<div class='tax-description'>주식을 매각하여 발생한 이익(양도차익)에 대해 부과되는 세금입니다. 기본공제 250만원이 적용됩니다.</div>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
@@ -473,7 +267,7 @@ else:
     with col3:
         st.markdown("<div class='tax-card'>", unsafe_allow_html=True)
         st.markdown("<div class='tax-title'>청산소득세(종합소득세 포함)</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='tax-amount'>{simple_format(tax_details['liquidationTax'])}원</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='tax-amount'>{format_number(tax_details['liquidationTax'])}원</div>", unsafe_allow_html=True)
         st.markdown(f"<div class='tax-rate'>법인: 9~19% + 개인: 45%</div>", unsafe_allow_html=True)
         st.markdown("<div class='tax-description'>법인 청산 시 발생하는 세금으로, 법인세와 잔여재산 분배에 따른 종합소득세로 구성됩니다.</div>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
@@ -481,22 +275,22 @@ else:
     # 상속증여세 계산 세부내역
     with st.expander("상속증여세 계산 세부내역"):
         st.markdown("<div class='calculation-box'>", unsafe_allow_html=True)
-        st.markdown(f"<p>과세표준: {simple_format(stock_value['ownedValue'])}원</p>", unsafe_allow_html=True)
+        st.markdown(f"<p>과세표준: {format_number(stock_value['ownedValue'])}원</p>", unsafe_allow_html=True)
         
-        for step in tax_details['inheritanceSteps']:
-            st.markdown(f"<div class='calculation-step'>{step['bracket']}: {simple_format(step['amount'])}원 × {int(step['rate']*100)}% = {simple_format(step['tax'])}원</div>", unsafe_allow_html=True)
+        for line in step_lines(tax_details['inheritanceSteps']):
+            st.markdown(f"<div class='calculation-step'>{line}</div>", unsafe_allow_html=True)
         
-        st.markdown(f"<p><b>총 상속증여세: {simple_format(tax_details['inheritanceTax'])}원</b> (실효세율: {tax_details['inheritanceRate']:.1f}%)</p>", unsafe_allow_html=True)
+        st.markdown(f"<p><b>총 상속증여세: {format_number(tax_details['inheritanceTax'])}원</b> (실효세율: {tax_details['inheritanceRate']:.1f}%)</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # 양도소득세 계산 세부내역
     with st.expander("양도소득세 계산 세부내역"):
         st.markdown("<div class='calculation-box'>", unsafe_allow_html=True)
         
-        for step in tax_details['transferSteps']:
-            st.markdown(f"<div class='calculation-step'>{step['description']}: {step['detail']}</div>", unsafe_allow_html=True)
+        for line in step_lines(tax_details['transferSteps']):
+            st.markdown(f"<div class='calculation-step'>{line}</div>", unsafe_allow_html=True)
         
-        st.markdown(f"<p><b>총 양도소득세(지방소득세 포함): {simple_format(tax_details['transferTax'])}원</b> (실효세율: {tax_details['transferRate']:.1f}%)</p>", unsafe_allow_html=True)
+        st.markdown(f"<p><b>총 양도소득세(지방소득세 포함): {format_number(tax_details['transferTax'])}원</b> (실효세율: {tax_details['transferRate']:.1f}%)</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # 청산소득세 계산 세부내역 (수정됨)
@@ -505,16 +299,29 @@ else:
         
         # 청산소득세 계산 과정에 법인과 개인 단계 표시
         st.markdown("<p><b>청산소득세 (법인세+종합소득세)</b></p>", unsafe_allow_html=True)
-        st.markdown(f"<p>법인: {simple_format(tax_details['corporateIncome'])}원</p>", unsafe_allow_html=True)
-        st.markdown(f"<p>개인: {simple_format(tax_details['individualDistribution'])}원</p>", unsafe_allow_html=True)
+        st.markdown(f"<p>법인: {format_number(tax_details['corporateIncome'])}원</p>", unsafe_allow_html=True)
+        st.markdown(f"<p>개인: {format_number(tax_details['individualDistribution'])}원</p>", unsafe_allow_html=True)
         st.markdown(f"<p>법인: 9~19% 개인: 45%</p>", unsafe_allow_html=True)
         
-        for step in tax_details['liquidationSteps']:
-            st.markdown(f"<div class='calculation-step'>{step['description']}: {step['detail']}</div>", unsafe_allow_html=True)
+        for line in step_lines(tax_details['liquidationSteps']):
+            st.markdown(f"<div class='calculation-step'>{line}</div>", unsafe_allow_html=True)
         
-        st.markdown(f"<p><b>총 청산소득세: {simple_format(tax_details['liquidationTax'])}원</b> (실효세율: {tax_details['liquidationRate']:.1f}%)</p>", unsafe_allow_html=True)
+        st.markdown(f"<p><b>총 청산소득세: {format_number(tax_details['liquidationTax'])}원</b> (실효세율: {tax_details['liquidationRate']:.1f}%)</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
+    # 주주별 세금
+    holders = normalize_holders(st.session_state.get('shareholders'))
+    if holders:
+        import pandas as pd
+
+        st.markdown("<h3 style='text-align:center; margin-top:30px;'>주주별 세금</h3>", unsafe_allow_html=True)
+        with phase("calculation"):
+            cap_table = cache.cap_table(with_scenario(valuation_input, is_family_corp=is_family_corp), holders)
+        cap_df = pd.DataFrame(cap_table_rows(holders, cap_table))
+        cap_df = format_columns(cap_df, [CAP_TABLE_COLUMNS[key] for key in ("shares", "ownedValue", "inheritanceTax", "transferTax", "liquidationTax")])
+        st.dataframe(cap_df, hide_index=True, use_container_width=True)
+        st.markdown(f"<p class='note-text'>※ 청산소득세는 회사 법인세({format_number(cap_table['corporateTax'])}원)와 주주별 종합소득세의 합계입니다.</p>", unsafe_allow_html=True)
+    
     # 세금 비교 분석 (균형있게 조정)
     st.markdown("<div class='tax-comparison'>", unsafe_allow_html=True)
     st.markdown("<h3>세금 비교 분석</h3>", unsafe_allow_html=True)
@@ -561,17 +368,17 @@ else:
         <tbody>
             <tr class="{inherit_class}">
                 <td>상속증여세</td>
-                <td class="tax-amount">{simple_format(tax_details['inheritanceTax'])}원</td>
+                <td class="tax-amount">{format_number(tax_details['inheritanceTax'])}원</td>
                 <td>{tax_details['inheritanceRate']:.1f}%</td>
             </tr>
             <tr class="{transfer_class}">
                 <td>양도소득세(지방소득세 포함)</td>
-                <td class="tax-amount">{simple_format(tax_details['transferTax'])}원</td>
+                <td class="tax-amount">{format_number(tax_details['transferTax'])}원</td>
                 <td>{tax_details['transferRate']:.1f}%</td>
             </tr>
             <tr class="{liquid_class}">
                 <td>청산소득세(종합소득세 포함)</td>
-                <td class="tax-amount">{simple_format(tax_details['liquidationTax'])}원</td>
+                <td class="tax-amount">{format_number(tax_details['liquidationTax'])}원</td>
                 <td>{tax_details['liquidationRate']:.1f}%</td>
             </tr>
         </tbody>
@@ -690,6 +497,7 @@ else:
         with tab1:
             if st.button("HTML 보고서 생성하기", key="generate_html"):
                 # HTML 내용 생성
+                set_phase("reports")
                 html_content = f"""
                 <!DOCTYPE html>
                 <html>
@@ -715,10 +523,10 @@ else:
                     <h2>기본 정보</h2>
                     <div class="info">회사명: {company_name}</div>
                     <div class="info">평가 기준일: {eval_date.strftime('%Y년 %m월 %d일')}</div>
-                    <div class="info">주당 평가액: {simple_format(stock_value["finalValue"])}원</div>
-                    <div class="info">회사 총 가치: {simple_format(stock_value["totalValue"])}원</div>
-                    <div class="info">대표이사 보유주식 가치: {simple_format(stock_value["ownedValue"])}원</div>
-                    <div class="info">취득가액(자기자본): {simple_format(tax_details["acquisitionValue"])}원</div>
+                    <div class="info">주당 평가액: {format_number(stock_value["finalValue"])}원</div>
+                    <div class="info">회사 총 가치: {format_number(stock_value["totalValue"])}원</div>
+                    <div class="info">대표이사 보유주식 가치: {format_number(stock_value["ownedValue"])}원</div>
+                    <div class="info">취득가액(자기자본): {format_number(tax_details["acquisitionValue"])}원</div>
                     
                     <h2>세금 분석 결과</h2>
                     <table class="results-table">
@@ -729,17 +537,17 @@ else:
                         </tr>
                         <tr>
                             <td>상속증여세</td>
-                            <td>{simple_format(tax_details['inheritanceTax'])}원</td>
+                            <td>{format_number(tax_details['inheritanceTax'])}원</td>
                             <td>{tax_details['inheritanceRate']:.1f}%</td>
                         </tr>
                         <tr>
                             <td>양도소득세(지방소득세 포함)</td>
-                            <td>{simple_format(tax_details['transferTax'])}원</td>
+                            <td>{format_number(tax_details['transferTax'])}원</td>
                             <td>{tax_details['transferRate']:.1f}%</td>
                         </tr>
                         <tr>
                             <td>청산소득세(종합소득세 포함)</td>
-                            <td>{simple_format(tax_details['liquidationTax'])}원</td>
+                            <td>{format_number(tax_details['liquidationTax'])}원</td>
                             <td>{tax_details['liquidationRate']:.1f}%</td>
                         </tr>
                     </table>
@@ -753,30 +561,30 @@ else:
                     
                     <div class="tax-box">
                         <h3>상속증여세 계산</h3>
-                        <p>과세표준: {simple_format(stock_value['ownedValue'])}원</p>
+                        <p>과세표준: {format_number(stock_value['ownedValue'])}원</p>
                         <ul>
-                            {''.join([f"<li>{step['bracket']}: {simple_format(step['amount'])}원 × {int(step['rate']*100)}% = {simple_format(step['tax'])}원</li>" for step in tax_details['inheritanceSteps']])}
+                            {''.join(f"<li>{line}</li>" for line in step_lines(tax_details['inheritanceSteps']))}
                         </ul>
-                        <p><b>총 상속증여세: {simple_format(tax_details['inheritanceTax'])}원</b> (실효세율: {tax_details['inheritanceRate']:.1f}%)</p>
+                        <p><b>총 상속증여세: {format_number(tax_details['inheritanceTax'])}원</b> (실효세율: {tax_details['inheritanceRate']:.1f}%)</p>
                     </div>
                     
                     <div class="tax-box">
                         <h3>양도소득세(지방소득세 포함) 계산</h3>
                         <ul>
-                            {''.join([f"<li>{step['description']}: {step['detail']}</li>" for step in tax_details['transferSteps']])}
+                            {''.join(f"<li>{line}</li>" for line in step_lines(tax_details['transferSteps']))}
                         </ul>
-                        <p><b>총 양도소득세: {simple_format(tax_details['transferTax'])}원</b> (실효세율: {tax_details['transferRate']:.1f}%)</p>
+                        <p><b>총 양도소득세: {format_number(tax_details['transferTax'])}원</b> (실효세율: {tax_details['transferRate']:.1f}%)</p>
                     </div>
                     
                     <div class="tax-box">
                         <h3>청산소득세(종합소득세 포함) 계산</h3>
-                        <p>법인: {simple_format(tax_details['corporateIncome'])}원</p>
-                        <p>개인: {simple_format(tax_details['individualDistribution'])}원</p>
+                        <p>법인: {format_number(tax_details['corporateIncome'])}원</p>
+                        <p>개인: {format_number(tax_details['individualDistribution'])}원</p>
                         <p>법인: 9~19% 개인: 45%</p>
                         <ul>
-                            {''.join([f"<li>{step['description']}: {step['detail']}</li>" for step in tax_details['liquidationSteps']])}
+                            {''.join(f"<li>{line}</li>" for line in step_lines(tax_details['liquidationSteps']))}
                         </ul>
-                        <p><b>총 청산소득세: {simple_format(tax_details['liquidationTax'])}원</b> (실효세율: {tax_details['liquidationRate']:.1f}%)</p>
+                        <p><b>총 청산소득세: {format_number(tax_details['liquidationTax'])}원</b> (실효세율: {tax_details['liquidationRate']:.1f}%)</p>
                     </div>
                     
                     <div style="margin-top: 30px; padding: 10px; background-color: #fff3cd; border-radius: 5px;">
@@ -796,6 +604,7 @@ else:
                     file_name=f"세금분석_{company_name}_{eval_date.strftime('%Y%m%d')}.html",
                     mime="text/html"
                 )
+                set_phase("other")
                 
                 st.info("HTML 파일을 다운로드 후 브라우저에서 열어 인쇄하면 PDF로 저장할 수 있습니다.")
         
@@ -803,6 +612,7 @@ else:
         with tab2:
             if st.button("CSV 데이터 생성하기", key="generate_csv"):
                 # CSV 데이터 생성
+                set_phase("reports")
                 data = {
                     '항목': [
                         '회사명', '평가 기준일', '주당 평가액', '회사 총가치', '대표이사 보유주식 가치', '취득가액(자기자본)',
@@ -820,7 +630,8 @@ else:
                     ]
                 }
                 
-                # DataFrame 생성 후 CSV로 변환
+                # DataFrame 생성 후 CSV로 변환 (pandas는 CSV를 만들 때만 가져옴)
+                import pandas as pd
                 df = pd.DataFrame(data)
                 csv = df.to_csv(index=False).encode('utf-8')
                 
@@ -830,5 +641,9 @@ else:
                     file_name=f"세금분석_{company_name}_{eval_date.strftime('%Y%m%d')}.csv",
                     mime="text/csv"
                 )
+                set_phase("other")
         
         st.markdown("</div>", unsafe_allow_html=True)
+
+# 실행 시간 기록
+finish_rerun()
@@ -1,29 +1,19 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import locale
 from datetime import datetime
-import io
-import base64
 
-# 숫자 형식화를 위한 로케일 설정
-try:
-    locale.setlocale(locale.LC_ALL, 'ko_KR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'ko_KR')
-    except:
-        locale.setlocale(locale.LC_ALL, '')
+from valuation import cache
+from valuation.cache import input_from_mapping, with_scenario
+from valuation.formatting import format_column, format_frame, format_number
+from valuation.job_widgets import job_panel, poll_jobs, submit_job
+from valuation.projection import FORECAST_YEAR_OPTIONS, GROWTH_RATE_OPTIONS
+from valuation.reports import future_value_csv, future_value_html
+from valuation.timing_widgets import finish_rerun, phase, set_phase, start_rerun
 
-# 숫자 형식화 함수
-def format_number(num):
-    try:
-        return "{:,}".format(int(num))
-    except:
-        return str(num)
+# 실행 단계별 시간 측정 시작
+start_rerun("future_value")
 
 # CSS 스타일 추가
+set_phase("css")
 st.markdown("""
 <style>
     .info-box {
@@ -98,274 +88,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# HTML 다운로드용 내용 생성
-def create_html_content(current_value, future_value, company_name, growth_rate, future_years):
-    target_year = datetime.now().year + future_years
-    value_increase = (future_value["finalValue"] / current_value["finalValue"] - 1) * 100
-    
-    # 연도별 데이터가 있는 경우 테이블 데이터 생성
-    yearly_table = ""
-    if "yearlyEquity" in future_value and "yearlyIncome" in future_value:
-        yearly_table = """
-        <h2>연도별 성장 내역</h2>
-        <table>
-            <tr>
-                <th>연도</th>
-                <th>자본총계 (원)</th>
-                <th>가중평균 당기순이익 (원)</th>
-            </tr>
-        """
-        
-        current_year = datetime.now().year
-        for i in range(len(future_value["yearlyEquity"])):
-            yearly_table += f"""
-            <tr>
-                <td>{current_year + i}년</td>
-                <td>{format_number(future_value["yearlyEquity"][i])}</td>
-                <td>{format_number(future_value["yearlyIncome"][i])}</td>
-            </tr>
-            """
-            
-        yearly_table += "</table>"
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>미래 주식가치 예측 보고서 - {company_name}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-            h1 {{ color: #2c3e50; text-align: center; }}
-            h2 {{ color: #3498db; margin-top: 20px; }}
-            .info {{ margin-bottom: 5px; }}
-            .value-box {{ background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 10px 0; }}
-            .current {{ border-left: 4px solid #3498db; }}
-            .future {{ border-left: 4px solid #e67e22; }}
-            .result {{ margin-top: 10px; font-weight: bold; }}
-            .increase {{ color: #27ae60; font-weight: bold; font-size: 1.2em; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            table, th, td {{ border: 1px solid #ddd; }}
-            th, td {{ padding: 12px; text-align: left; }}
-            th {{ background-color: #f2f2f2; }}
-        </style>
-    </head>
-    <body>
-        <h1>미래 주식가치 예측 보고서</h1>
-        
-        <h2>회사 정보</h2>
-        <div class="info">회사명: {company_name}</div>
-        
-        <h2>예측 정보</h2>
-        <div class="info">적용 성장률: 연 {growth_rate}% (매년)</div>
-        <div class="info">예측 기간: {future_years}년 (기준: {datetime.now().year}년 → 예측: {target_year}년)</div>
-        
-        <div class="value-box current">
-            <h3>현재 가치</h3>
-            <div class="info">주당 가치: {format_number(current_value["finalValue"])}원</div>
-            <div class="info">회사 총가치: {format_number(current_value["totalValue"])}원</div>
-        </div>
-        
-        <div class="value-box future">
-            <h3>미래 가치</h3>
-            <div class="info">주당 가치: {format_number(future_value["finalValue"])}원</div>
-            <div class="info">회사 총가치: {format_number(future_value["totalValue"])}원</div>
-        </div>
-        
-        <div style="text-align: center; margin: 20px 0;">
-            <p>예상 가치 증가율: <span class="increase">+{value_increase:.1f}%</span> ({future_years}년 후)</p>
-        </div>
-        
-        {yearly_table}
-        
-        <h2>세부 계산 내역</h2>
-        <table>
-            <tr>
-                <th>항목</th>
-                <th>금액 (원)</th>
-            </tr>
-            <tr>
-                <td>미래 자본총계</td>
-                <td>{format_number(future_value["futureTotalEquity"])}</td>
-            </tr>
-            <tr>
-                <td>1주당 순자산가치</td>
-                <td>{format_number(future_value["netAssetPerShare"])}</td>
-            </tr>
-            <tr>
-                <td>1주당 손익가치</td>
-                <td>{format_number(future_value["incomeValue"])}</td>
-            </tr>
-            <tr>
-                <td>미래 주당 평가액</td>
-                <td>{format_number(future_value["finalValue"])}</td>
-            </tr>
-            <tr>
-                <td>미래 회사 총 주식가치</td>
-                <td>{format_number(future_value["totalValue"])}</td>
-            </tr>
-        </table>
-        
-        <div style="margin-top: 30px; padding: 10px; background-color: #edf7ed; border-radius: 5px;">
-            <p><b>참고:</b> 이 예측은 매년 당기순이익이 성장률에 따라 증가하고, 그 순이익이 자본총계에 누적되는 방식으로 계산되었습니다.</p>
-        </div>
-        
-        <div style="margin-top: 30px; text-align: center; color: #777; font-size: 0.9em;">
-            <p>생성일: {datetime.now().strftime('%Y년 %m월 %d일')}</p>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
-
-# CSV 다운로드용 내용 생성
-def create_csv_content(current_value, future_value, company_name, growth_rate, future_years):
-    # 현재 년도 계산
-    current_year = datetime.now().year
-    target_year = current_year + future_years
-    
-    # 가치 증가율 계산
-    value_increase = (future_value["finalValue"] / current_value["finalValue"] - 1) * 100
-    
-    # CSV 데이터 생성
-    data = {
-        '항목': [
-            '회사명', '성장률', '예측기간', 
-            '예측 시작 연도', '예측 종료 연도',
-            '현재 주당 가치', '미래 주당 가치', 
-            '현재 회사 총가치', '미래 회사 총가치',
-            '가치 증가율',
-            '미래 자본총계', '미래 1주당 순자산가치', 
-            '미래 1주당 손익가치', '미래 주당 평가액'
-        ],
-        '값': [
-            company_name, f"{growth_rate}%", f"{future_years}년",
-            str(current_year), str(target_year),
-            current_value["finalValue"], future_value["finalValue"],
-            current_value["totalValue"], future_value["totalValue"],
-            f"{value_increase:.1f}%",
-            future_value["futureTotalEquity"], future_value["netAssetPerShare"],
-            future_value["incomeValue"], future_value["finalValue"]
-        ]
-    }
-    
-    # 연도별 데이터가 있는 경우 추가
-    if "yearlyEquity" in future_value:
-        yearly_df = pd.DataFrame({
-            "연도": [current_year + i for i in range(len(future_value["yearlyEquity"]))],
-            "자본총계": future_value["yearlyEquity"],
-            "가중평균 당기순이익": future_value["yearlyIncome"]
-        })
-        
-        # 원본 DataFrame 생성
-        main_df = pd.DataFrame(data)
-        
-        # CSV로 변환 (둘 다 포함)
-        csv_bytes = io.BytesIO()
-        
-        # 기본 정보 먼저 저장
-        main_df.to_csv(csv_bytes, index=False, encoding='utf-8')
-        
-        # 그 다음에 빈 줄 추가
-        csv_bytes.write("\n\n".encode('utf-8'))
-        
-        # 연도별 데이터 추가
-        yearly_df.to_csv(csv_bytes, index=False, encoding='utf-8')
-        
-        # 처음으로 이동하고 내용 얻기
-        csv_bytes.seek(0)
-        return csv_bytes.getvalue()
-    else:
-        # DataFrame 생성 후 CSV로 변환
-        df = pd.DataFrame(data)
-        csv = df.to_csv(index=False).encode('utf-8')
-        return csv
-
-# 미래 주식가치 계산 함수 (매년 누적 방식)
-def calculate_future_stock_value(stock_value, total_equity, shares, owned_shares, 
-                             interest_rate, evaluation_method, growth_rate, future_years):
-    if not stock_value:
-        return None
-    
-    # 초기값 설정
-    current_total_equity = total_equity
-    current_weighted_income = stock_value["weightedIncome"]
-    
-    # 연도별 값 저장할 리스트 (시각화용)
-    yearly_equity = [current_total_equity]
-    yearly_income = [current_weighted_income]
-    
-    # 매년 순차적으로 계산
-    for year in range(1, future_years + 1):
-        # 당해 연도 순이익 계산 (성장률 적용)
-        current_income = current_weighted_income * (1 + (growth_rate / 100))
-        
-        # 자본총계 업데이트 (전년도 자본총계 + 당해 연도 순이익)
-        current_total_equity += current_income
-        
-        # 가중평균 순이익 업데이트
-        current_weighted_income = current_income
-        
-        # 값 저장
-        yearly_equity.append(current_total_equity)
-        yearly_income.append(current_weighted_income)
-    
-    # 최종 연도 기준으로 주식 가치 평가
-    # 1. 순자산가치 계산
-    net_asset_per_share = current_total_equity / shares
-    
-    # 2. 영업권 계산
-    weighted_income_per_share = current_weighted_income / shares
-    weighted_income_per_share_50 = weighted_income_per_share * 0.5
-    equity_return = (current_total_equity * (interest_rate / 100)) / shares
-    annuity_factor = 3.7908
-    goodwill = max(0, (weighted_income_per_share_50 - equity_return) * annuity_factor)
-    
-    # 3. 순자산가치 + 영업권
-    asset_value_with_goodwill = net_asset_per_share + goodwill
-    
-    # 4. 손익가치 계산
-    income_value = weighted_income_per_share * (100 / interest_rate)
-    
-    # 5. 최종가치 계산
-    if evaluation_method == "부동산 과다법인":
-        # 부동산 과다법인
-        stock_value_calc = (asset_value_with_goodwill * 0.6) + (income_value * 0.4)
-        net_asset_80_percent = net_asset_per_share * 0.8
-        final_value = max(stock_value_calc, net_asset_80_percent)
-        method_text = '부동산 과다법인: (자산가치×0.6 + 수익가치×0.4)'
-    elif evaluation_method == "순자산가치만 평가":
-        # 순자산가치만 적용
-        final_value = net_asset_per_share
-        method_text = '순자산가치만 평가'
-    else:
-        # 일반법인
-        stock_value_calc = (income_value * 0.6) + (asset_value_with_goodwill * 0.4)
-        net_asset_80_percent = net_asset_per_share * 0.8
-        final_value = max(stock_value_calc, net_asset_80_percent)
-        method_text = '일반법인: (수익가치×0.6 + 자산가치×0.4)'
-    
-    # 총 가치
-    total_value = final_value * shares
-    owned_value = final_value * owned_shares
-    
-    return {
-        "netAssetPerShare": net_asset_per_share,
-        "assetValueWithGoodwill": asset_value_with_goodwill,
-        "incomeValue": income_value,
-        "finalValue": final_value,
-        "totalValue": total_value,
-        "ownedValue": owned_value,
-        "methodText": method_text,
-        "futureTotalEquity": current_total_equity,
-        "futureWeightedIncome": current_weighted_income,
-        "growthRate": growth_rate,
-        "futureYears": future_years,
-        "yearlyEquity": yearly_equity,
-        "yearlyIncome": yearly_income
-    }
-
 # 페이지 헤더
+set_phase("inputs")
 st.title("미래 주식가치 예측")
 
 if not st.session_state.get('evaluated', False):
@@ -374,13 +98,12 @@ if not st.session_state.get('evaluated', False):
 else:
     stock_value = st.session_state.stock_value
     company_name = st.session_state.company_name
-    total_equity = st.session_state.total_equity
-    shares = st.session_state.shares
-    owned_shares = st.session_state.owned_shares
-    interest_rate = st.session_state.interest_rate
-    evaluation_method = st.session_state.evaluation_method
     eval_date = st.session_state.get('eval_date', None)
     
+    # 평가 당시 입력값 (계산 결과 캐시 키)
+    valuation_input = st.session_state.get('valuation_input') or input_from_mapping(st.session_state)
+    set_phase("other")
+    
     # 현재 주식 가치 정보 표시
     with st.expander("현재 주식 가치", expanded=True):
         col1, col2 = st.columns(2)
@@ -416,7 +139,7 @@ else:
         with col1:
             growth_rate = st.selectbox(
                 "연평균 성장률 (%)",
-                [5, 10, 15, 20, 25, 30],
+                GROWTH_RATE_OPTIONS,
                 index=1,  # 기본값 10%
                 help="회사의 연평균 성장률 예상치입니다. 과거 실적과 미래 전망을 고려하여 선택하세요."
             )
@@ -425,7 +148,7 @@ else:
         with col2:
             future_years = st.selectbox(
                 "예측 기간 (년)",
-                [5, 10, 15, 20, 30],
+                FORECAST_YEAR_OPTIONS,
                 index=1,  # 기본값 10년
                 help="미래 가치를 예측할 기간을 선택하세요."
             )
@@ -438,21 +161,30 @@ else:
     if 'future_evaluated' not in st.session_state:
         st.session_state.future_evaluated = False
     
+    # 성장률×예측기간 전체 조합의 가치와 세금 격자 (회사별로 한 번 계산 후 캐시)
+    with phase("calculation"):
+        scenario_grid = cache.scenario_grid(valuation_input)
+    
     # 계산 버튼
     if st.button("미래 가치 계산하기", type="primary", use_container_width=True):
-        with st.spinner("계산 중..."):
-            # 미래 주식 가치 계산 (매년 누적 방식)
-            st.session_state.future_stock_value = calculate_future_stock_value(
-                stock_value, total_equity, shares, owned_shares, 
-                interest_rate, evaluation_method, growth_rate, future_years
+        st.session_state.future_evaluated = True
+        st.success("계산이 완료되었습니다.")
+        st.balloons()
+    
+    # 선택한 성장률과 예측 기간의 결과는 격자에서 바로 조회
+    if st.session_state.future_evaluated:
+        with phase("calculation"):
+            st.session_state.future_stock_value = cache.scenario(
+                with_scenario(valuation_input, growth_rate=growth_rate, years=future_years)
             )
-            st.session_state.future_evaluated = True
-            
-            st.success("계산이 완료되었습니다.")
-            st.balloons()
     
     # 미래 가치 결과 표시
     if st.session_state.future_evaluated and st.session_state.future_stock_value:
+        # 표, 차트, 시뮬레이션은 미래 가치를 계산한 뒤에만 쓰므로 여기서 가져옴 (첫 화면 시작 시간 단축)
+        import pandas as pd
+        import plotly.graph_objects as go
+        from valuation.montecarlo import DISTRIBUTION_NAMES, summary_rows
+
         future_stock_value = st.session_state.future_stock_value
         
         st.markdown("---")
@@ -497,6 +229,7 @@ else:
         
         # 차트 1: 현재와 미래 가치 비교 (바 차트)
         st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        set_phase("charts")
         fig1 = go.Figure()
         fig1.add_trace(go.Bar(
             x=['현재', f'{future_years}년 후'],
@@ -511,6 +244,7 @@ else:
             height=400
         )
         st.plotly_chart(fig1, use_container_width=True)
+        set_phase("other")
         st.markdown("</div>", unsafe_allow_html=True)
         
         # 차트 2: 연도별 자본총계와 가중평균 순이익 추이 (라인 차트)
@@ -522,6 +256,7 @@ else:
             years = [datetime.now().year + i for i in range(len(future_stock_value["yearlyEquity"]))]
             
             # 라인 차트 생성
+            set_phase("charts")
             fig2 = go.Figure()
             
             # 자본총계 추이
@@ -554,14 +289,15 @@ else:
             )
             
             st.plotly_chart(fig2, use_container_width=True)
+            set_phase("other")
             
             # 연도별 데이터 테이블 표시
             st.subheader("연도별 상세 데이터")
             
             yearly_df = pd.DataFrame({
                 "연도": years,
-                "자본총계 (원)": [format_number(val) for val in future_stock_value["yearlyEquity"]],
-                "가중평균 당기순이익 (원)": [format_number(val) for val in future_stock_value["yearlyIncome"]]
+                "자본총계 (원)": format_column(future_stock_value["yearlyEquity"]),
+                "가중평균 당기순이익 (원)": format_column(future_stock_value["yearlyIncome"])
             })
             
             st.table(yearly_df)
@@ -569,6 +305,76 @@ else:
             st.markdown("<div class='explanation-text'>위 테이블은 매년 당기순이익이 누적되어 자본총계가 증가하는 과정을 보여줍니다. 당기순이익은 매년 성장률에 따라 증가합니다.</div>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
         
+        # 예측 시점 세금 요약 (이 페이지의 매년 누적 방식 평가액 기준)
+        st.subheader(f"{future_years}년 후 예상 세금 (매년 누적 방식)")
+        st.markdown("<div class='explanation-text'>위의 매년 누적 방식 미래 평가액(순이익이 매년 자본총계에 쌓인 뒤 다시 평가)을 기준으로 한 세금입니다. "
+                    "미래 세금계산 페이지는 현재 평가액에 복리 성장률을 곱하는 복리 성장 방식을 쓰므로, 같은 성장률과 기간이어도 세금이 다르게 나옵니다.</div>", unsafe_allow_html=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("상속증여세", f"{format_number(future_stock_value['inheritanceTax'])}원")
+        with col2:
+            st.metric("양도소득세", f"{format_number(future_stock_value['transferTax'])}원")
+        with col3:
+            st.metric("청산소득세", f"{format_number(future_stock_value['liquidationTax'])}원")
+        
+        # 성장률×예측기간 히트맵
+        st.subheader("성장률·예측기간별 비교")
+        heatmap_items = {
+            "주당 평가액": "finalValue",
+            "회사 총가치": "totalValue",
+            "대표이사 보유주식 가치": "ownedValue",
+            "상속증여세": "inheritanceTax",
+            "양도소득세": "transferTax",
+            "청산소득세": "liquidationTax",
+        }
+        heatmap_item = st.selectbox("표시 항목", list(heatmap_items), key="heatmap_item")
+        heatmap_values = scenario_grid[heatmap_items[heatmap_item]]
+        
+        set_phase("charts")
+        fig3 = go.Figure(go.Heatmap(
+            z=heatmap_values,
+            x=[f"{year}년" for year in FORECAST_YEAR_OPTIONS],
+            y=[f"{rate}%" for rate in GROWTH_RATE_OPTIONS],
+            text=[[format_number(value) for value in row] for row in heatmap_values],
+            texttemplate="%{text}",
+            colorscale="YlOrRd",
+            hovertemplate="성장률 %{y}, %{x} 후<br>%{text}원<extra></extra>"
+        ))
+        fig3.update_layout(
+            title=f'{heatmap_item} (원)',
+            xaxis_title='예측 기간',
+            yaxis_title='연평균 성장률',
+            height=450
+        )
+        st.plotly_chart(fig3, use_container_width=True)
+        set_phase("other")
+        
+        # 몬테카를로 시뮬레이션 (연도별 성장률이 확률분포를 따른다고 가정)
+        with st.expander("몬테카를로 성장 시뮬레이션", expanded=False):
+            st.markdown(f"<div class='explanation-text'>매년 성장률을 평균 {growth_rate}%인 확률분포에서 뽑아 {future_years}년 후 가치와 세금의 분포를 계산합니다. 평가 방식은 위의 매년 누적 방식과 같습니다.</div>", unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                mc_distribution = st.selectbox("성장률 분포", list(DISTRIBUTION_NAMES), key="mc_distribution")
+            with col2:
+                mc_spread = st.number_input("변동폭 (%p)", min_value=0.0, max_value=50.0, value=5.0, step=1.0, key="mc_spread",
+                                            help="정규분포는 표준편차, 균등분포는 평균에서 양쪽으로의 폭입니다.")
+            with col3:
+                mc_paths = st.selectbox("시뮬레이션 횟수", [1000, 10000, 100000, 1000000], index=1, key="mc_paths")
+            
+            if st.button("시뮬레이션 실행", key="mc_button"):
+                submit_job("mc_job", "simulation", {
+                    "inputs": with_scenario(valuation_input, growth_rate=growth_rate, years=future_years)._asdict(),
+                    "growth_spread": mc_spread,
+                    "distribution": DISTRIBUTION_NAMES[mc_distribution],
+                    "paths": mc_paths,
+                })
+            
+            mc_result = job_panel("mc_job", "시뮬레이션")
+            if mc_result:
+                st.markdown(f"<small>{format_number(mc_result['paths'])}회, {mc_result['years']}년 기준</small>", unsafe_allow_html=True)
+                mc_df = pd.DataFrame(summary_rows(mc_result)).set_index("항목")
+                st.dataframe(format_frame(mc_df), use_container_width=True)
+        
         # 성장 세부 내역
         with st.expander("미래 가치 계산 세부내역", expanded=False):
             details_df = pd.DataFrame({
@@ -622,7 +428,8 @@ else:
             # HTML 다운로드 탭
             with tab1:
                 if st.button("HTML 보고서 생성하기", key="generate_html"):
-                    html_content = create_html_content(stock_value, future_stock_value, company_name, growth_rate, future_years)
+                    with phase("reports"):
+                        html_content = future_value_html(stock_value, future_stock_value, company_name, growth_rate, future_years)
                     
                     st.download_button(
                         label="📄 HTML 파일 다운로드",
@@ -636,7 +443,8 @@ else:
             # CSV 다운로드 탭
             with tab2:
                 if st.button("CSV 데이터 생성하기", key="generate_csv"):
-                    csv_content = create_csv_content(stock_value, future_stock_value, company_name, growth_rate, future_years)
+                    with phase("reports"):
+                        csv_content = future_value_csv(stock_value, future_stock_value, company_name, growth_rate, future_years)
                     
                     st.download_button(
                         label="📄 CSV 파일 다운로드",
@@ -653,3 +461,9 @@ else:
                 st.switch_page("5_미래_세금계산.py")
             except:
                 st.markdown("<div class='sidebar-guide'>왼쪽 사이드바에서 <b>미래 세금계산</b> 메뉴를 클릭하여 이동하세요.</div>", unsafe_allow_html=True)
+
+# 실행 시간 기록
+finish_rerun()
+
+# 실행 중인 백그라운드 작업이 있으면 진행률 갱신
+poll_jobs()
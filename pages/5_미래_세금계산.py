@@ -1,28 +1,20 @@
 import streamlit as st
-import pandas as pd
-import locale
-import numpy as np
 from datetime import datetime, timedelta
-import io
-import base64
 
-# 숫자 형식화를 위한 로케일 설정
-try:
-    locale.setlocale(locale.LC_ALL, 'ko_KR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'ko_KR')
-    except:
-        locale.setlocale(locale.LC_ALL, '')
+from valuation import cache
+from valuation.cache import input_from_mapping, with_scenario
+from valuation.captable import CAP_TABLE_COLUMNS, cap_table_rows, normalize_holders
+from valuation.formatting import format_columns, format_frame, format_number
+from valuation.job_widgets import job_panel, poll_jobs, submit_job
+from valuation.reports import future_tax_csv, future_tax_html
+from valuation.tax import step_lines
+from valuation.timing_widgets import finish_rerun, phase, set_phase, start_rerun
 
-# 숫자 형식화 함수
-def simple_format(num):
-    try:
-        return "{:,}".format(int(num))
-    except:
-        return str(num)
+# 실행 단계별 시간 측정 시작
+start_rerun("future_tax")
 
 # CSS 스타일 추가
+set_phase("css")
 st.markdown("""
 <style>
     .tax-card {
@@ -184,312 +176,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# HTML 다운로드용 내용 생성
-def create_html_content(current_tax, future_tax, company_name, growth_rate, future_years):
-    target_year = datetime.now().year + future_years
-    
-    # 세금 증가율 계산
-    inheritance_increase = (future_tax["inheritance"] / current_tax["inheritance"] - 1) * 100
-    transfer_increase = (future_tax["transfer"] / current_tax["transfer"] - 1) * 100
-    liquidation_increase = (future_tax["liquidation"] / current_tax["liquidation"] - 1) * 100
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>미래 세금 계산 보고서 - {company_name}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-            h1 {{ color: #2c3e50; text-align: center; }}
-            h2 {{ color: #3498db; margin-top: 20px; }}
-            .info {{ margin-bottom: 5px; }}
-            .tax-box {{ background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 10px 0; }}
-            .current {{ border-left: 4px solid #3498db; }}
-            .future {{ border-left: 4px solid #e67e22; }}
-            .increase {{ color: #27ae60; font-weight: bold; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            table, th, td {{ border: 1px solid #ddd; }}
-            th, td {{ padding: 12px; text-align: center; }}
-            th {{ background-color: #f2f2f2; }}
-            td.number {{ text-align: right; }}
-            .best-option {{ background-color: #e6f7e6; padding: 10px; border-radius: 5px; margin: 10px 0; }}
-        </style>
-    </head>
-    <body>
-        <h1>미래 세금 계산 보고서</h1>
-        
-        <h2>회사 정보</h2>
-        <div class="info">회사명: {company_name}</div>
-        
-        <h2>예측 정보</h2>
-        <div class="info">적용 성장률: 연 {growth_rate}% (복리)</div>
-        <div class="info">예측 기간: {future_years}년 (기준: {datetime.now().year}년 → 예측: {target_year}년)</div>
-        
-        <h2>현재 vs 미래 세금 비교</h2>
-        <table>
-            <tr>
-                <th>세금 유형</th>
-                <th>현재 (2025년)</th>
-                <th>미래 ({target_year}년)</th>
-                <th>증가율</th>
-            </tr>
-            <tr>
-                <td>상속증여세 (누진세율)</td>
-                <td class="number">{simple_format(current_tax["inheritance"])}원</td>
-                <td class="number">{simple_format(future_tax["inheritance"])}원</td>
-                <td class="number">{inheritance_increase:.1f}%</td>
-            </tr>
-            <tr>
-                <td>양도소득세(지방소득세 포함) (20%~25%)</td>
-                <td class="number">{simple_format(current_tax["transfer"])}원</td>
-                <td class="number">{simple_format(future_tax["transfer"])}원</td>
-                <td class="number">{transfer_increase:.1f}%</td>
-            </tr>
-            <tr>
-                <td>청산소득세 (법인세+종합소득세)</td>
-                <td class="number">{simple_format(current_tax["liquidation"])}원</td>
-                <td class="number">{simple_format(future_tax["liquidation"])}원</td>
-                <td class="number">{liquidation_increase:.1f}%</td>
-            </tr>
-        </table>
-        
-        <div class="best-option">
-            <h3>최적 세금 옵션</h3>
-            <p>현재 기준 최적 세금 옵션: <strong>{current_tax["best_option"]}</strong></p>
-            <p>미래 기준 최적 세금 옵션: <strong>{future_tax["best_option"]}</strong></p>
-        </div>
-        
-        <div style="margin-top: 30px; padding: 10px; background-color: #f8f9fa; border-radius: 5px;">
-            <p><b>참고:</b> 이 보고서의 세금 계산은 참고용으로만 사용하시기 바랍니다. 실제 세금은 개인 상황, 보유기간, 대주주 여부, 사업 형태 등에 따라 달라질 수 있습니다.</p>
-            <p>미래 가치 예측은 단순 성장률 적용으로 실제 기업 가치 변동과는 차이가 있을 수 있습니다.</p>
-        </div>
-        
-        <div style="margin-top: 30px; text-align: center; color: #777; font-size: 0.9em;">
-            <p>생성일: {datetime.now().strftime('%Y년 %m월 %d일')}</p>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
-
-# CSV 다운로드용 내용 생성
-def create_csv_content(current_tax, future_tax, company_name, growth_rate, future_years):
-    # 현재 년도 계산
-    current_year = datetime.now().year
-    target_year = current_year + future_years
-    
-    # 세금 증가율 계산
-    inheritance_increase = (future_tax["inheritance"] / current_tax["inheritance"] - 1) * 100
-    transfer_increase = (future_tax["transfer"] / current_tax["transfer"] - 1) * 100
-    liquidation_increase = (future_tax["liquidation"] / current_tax["liquidation"] - 1) * 100
-    
-    # CSV 데이터 생성
-    data = {
-        '항목': [
-            '회사명', '성장률', '예측기간', 
-            '예측 시작 연도', '예측 종료 연도',
-            '현재 상속증여세', '미래 상속증여세', '상속증여세 증가율',
-            '현재 양도소득세(지방소득세 포함)', '미래 양도소득세(지방소득세 포함)', '양도소득세 증가율',
-            '현재 청산소득세(종합소득세 포함)', '미래 청산소득세(종합소득세 포함)', '청산소득세 증가율',
-            '현재 최적 세금 옵션', '미래 최적 세금 옵션'
-        ],
-        '값': [
-            company_name, f"{growth_rate}%", f"{future_years}년",
-            str(current_year), str(target_year),
-            current_tax["inheritance"], future_tax["inheritance"], f"{inheritance_increase:.1f}%",
-            current_tax["transfer"], future_tax["transfer"], f"{transfer_increase:.1f}%",
-            current_tax["liquidation"], future_tax["liquidation"], f"{liquidation_increase:.1f}%",
-            current_tax["best_option"], future_tax["best_option"]
-        ]
-    }
-    
-    # DataFrame 생성 후 CSV로 변환
-    df = pd.DataFrame(data)
-    csv = df.to_csv(index=False).encode('utf-8')
-    return csv
-
-# 상속증여세 계산 함수 (누진세율 적용)
-def calculate_inheritance_tax(value):
-    tax_brackets = [
-        (100000000, 0.1),       # 1억 이하: 10%
-        (500000000, 0.2),       # 1억 초과 5억 이하: 20%
-        (1000000000, 0.3),      # 5억 초과 10억 이하: 30%
-        (3000000000, 0.4),      # 10억 초과 30억 이하: 40%
-        (float('inf'), 0.5)     # 30억 초과: 50%
-    ]
-    
-    tax = 0
-    remaining = value
-    prev_limit = 0
-    calculation_steps = []
-    
-    for limit, rate in tax_brackets:
-        if remaining > 0:
-            taxable = min(remaining, limit - prev_limit)
-            step_tax = taxable * rate
-            tax += step_tax
-            
-            # 계산 과정 저장
-            if taxable > 0:
-                if prev_limit == 0:
-                    bracket_name = "1억원 이하"
-                elif prev_limit == 100000000:
-                    bracket_name = "1억원~5억원"
-                elif prev_limit == 500000000:
-                    bracket_name = "5억원~10억원"
-                elif prev_limit == 1000000000:
-                    bracket_name = "10억원~30억원"
-                else:
-                    bracket_name = "30억원 초과"
-                
-                calculation_steps.append({
-                    "bracket": bracket_name,
-                    "amount": taxable,
-                    "rate": rate,
-                    "tax": step_tax
-                })
-            
-            remaining -= taxable
-            prev_limit = limit
-            if remaining <= 0:
-                break
-    
-    # 실효세율 계산
-    effective_rate = (tax / value) * 100 if value > 0 else 0
-    
-    return tax, calculation_steps, effective_rate
-
-# 양도소득세 계산 함수 - 수정됨
-def calculate_transfer_tax(transfer_value, acquisition_value):
-    # 양도차익 계산 (수정됨)
-    transfer_profit = transfer_value - acquisition_value
-    
-    # 기본공제 250만원 적용
-    taxable_gain = max(0, transfer_profit - 2500000)
-    
-    calculation_steps = []
-    # 양도차익 계산 표시 수정
-    calculation_steps.append({"description": "양도차익 계산", "detail": f"양도가액({simple_format(transfer_value)}원) - 취득가액({simple_format(acquisition_value)}원) = {simple_format(transfer_profit)}원"})
-    calculation_steps.append({"description": "기본공제", "detail": f"2,500,000원"})
-    calculation_steps.append({"description": "과세표준", "detail": f"{simple_format(taxable_gain)}원"})
-    
-    # 3억 이하: 20%, 3억 초과: 25% (지방소득세 포함 22%, 27.5%)
-    base_tax_rate = 0.20  # 기본세율 20%
-    higher_tax_rate = 0.25  # 3억 초과분 세율 25%
-    
-    if taxable_gain <= 300000000:
-        tax = taxable_gain * base_tax_rate
-        calculation_steps.append({"description": "세액 계산", "detail": f"{simple_format(taxable_gain)}원 × 20% = {simple_format(tax)}원"})
-    else:
-        tax_below_300m = 300000000 * base_tax_rate
-        tax_above_300m = (taxable_gain - 300000000) * higher_tax_rate
-        tax = tax_below_300m + tax_above_300m
-        
-        calculation_steps.append({"description": "3억원 이하", "detail": f"300,000,000원 × 20% = {simple_format(tax_below_300m)}원"})
-        calculation_steps.append({"description": "3억원 초과", "detail": f"{simple_format(taxable_gain - 300000000)}원 × 25% = {simple_format(tax_above_300m)}원"})
-        calculation_steps.append({"description": "소득세 합계", "detail": f"{simple_format(tax)}원"})
-    
-    # 지방소득세 계산 (소득세의 10%)
-    local_tax = tax * 0.1
-    calculation_steps.append({"description": "지방소득세", "detail": f"{simple_format(tax)}원 × 10% = {simple_format(local_tax)}원"})
-    
-    # 총 세액 (소득세 + 지방소득세)
-    total_tax = tax + local_tax
-    calculation_steps.append({"description": "총 세액", "detail": f"{simple_format(tax)}원 + {simple_format(local_tax)}원 = {simple_format(total_tax)}원"})
-    
-    # 실효세율 계산
-    effective_rate = (total_tax / transfer_profit) * 100 if transfer_profit > 0 else 0
-    
-    return total_tax, calculation_steps, effective_rate, transfer_profit
-
-# 청산소득세 계산 함수 - 첨부 자료 기준으로 수정
-def calculate_liquidation_tax(owned_value, acquisition_value, total_value, total_shares, owned_shares, is_family_corp=False):
-    calculation_steps = []
-    
-    # 1단계: 법인 단계 - 청산소득에 대한 법인세 계산
-    # 회사의 자기자본총액 계산 (액면가 × 총 주식수)
-    capital = 5000 * total_shares  # 액면가 5,000원으로 가정
-    
-    # 잔여재산가액 (회사 총가치)
-    company_value = total_value
-    
-    # 청산소득금액 계산
-    corporate_income = company_value - capital
-    calculation_steps.append({"description": "청산소득금액", "detail": f"잔여재산가액({simple_format(company_value)}원) - 자기자본총액({simple_format(capital)}원) = {simple_format(corporate_income)}원"})
-    
-    # 법인세 계산 - 새로운 세율 적용
-    if not is_family_corp:
-        # 일반법인 세율 적용
-        if corporate_income <= 200000000:  # 2억원 이하
-            corporate_tax = corporate_income * 0.09
-            calculation_steps.append({"description": "법인세(2억 이하)", "detail": f"{simple_format(corporate_income)}원 × 9% = {simple_format(corporate_tax)}원"})
-        else:  # 2억원 초과
-            # 2억원까지는 9%, 나머지는 19% 적용
-            corporate_tax = 200000000 * 0.09 + (corporate_income - 200000000) * 0.19
-            calculation_steps.append({"description": "법인세", "detail": f"2억원 × 9% + {simple_format(corporate_income - 200000000)}원 × 19% = {simple_format(corporate_tax)}원"})
-    else:
-        # 가족법인 세율 적용
-        corporate_tax = corporate_income * 0.19  # 가족법인은 19% 고정 세율 적용
-        calculation_steps.append({"description": "법인세(가족법인)", "detail": f"{simple_format(corporate_income)}원 × 19% = {simple_format(corporate_tax)}원"})
-    
-    # 2단계: 주주 단계 - 잔여재산 분배에 대한 종합소득세
-    # 법인세 납부 후 잔여재산
-    after_tax_corporate = corporate_income - corporate_tax
-    calculation_steps.append({"description": "법인세 납부 후 잔여재산", "detail": f"{simple_format(corporate_income)}원 - {simple_format(corporate_tax)}원 = {simple_format(after_tax_corporate)}원"})
-    
-    # 대표자 몫(지분율 적용)
-    ownership_ratio = owned_shares / total_shares
-    individual_distribution = after_tax_corporate * ownership_ratio
-    calculation_steps.append({"description": "대표자 몫(80%)", "detail": f"{simple_format(after_tax_corporate)}원 × {ownership_ratio:.1%} = {simple_format(individual_distribution)}원"})
-    
-    # 종합소득세 계산(최고세율 45% 적용, 누진공제 6,540만원)
-    individual_tax = individual_distribution * 0.45 - 65400000
-    if individual_tax < 0:
-        individual_tax = 0
-    calculation_steps.append({"description": "종합소득세", "detail": f"{simple_format(individual_distribution)}원 × 45% - 65,400,000원(누진공제) = {simple_format(individual_tax)}원"})
-    
-    # 총 세액 (법인세 + 종합소득세)
-    total_tax = corporate_tax + individual_tax
-    calculation_steps.append({"description": "총 세액(법인세 + 종합소득세)", "detail": f"{simple_format(corporate_tax)}원 + {simple_format(individual_tax)}원 = {simple_format(total_tax)}원"})
-    
-    # 실효세율 계산
-    effective_rate = (total_tax / owned_value) * 100 if owned_value > 0 else 0
-    
-    return corporate_tax, individual_tax, total_tax, calculation_steps, effective_rate, corporate_income, individual_distribution
-
-# 미래 가치 계산 함수 - 오류 수정
-def calculate_future_value(current_value, growth_rate, years):
-    """
-    현재 가치에서 성장률을 적용하여 미래 가치를 계산합니다.
-    
-    Parameters:
-    current_value (dict): 현재 주식 가치 정보가 담긴 딕셔너리
-    growth_rate (float): 연간 성장률 (%)
-    years (int): 예측 기간 (년)
-    
-    Returns:
-    dict: 미래 주식 가치 정보가 담긴 딕셔너리
-    """
-    try:
-        future_value = {}
-        
-        # 안전하게 딕셔너리 키 존재 여부 확인 후 계산
-        for key, value in current_value.items():
-            if isinstance(value, (int, float)):
-                # 숫자 값에만 성장률 적용
-                future_value[key] = value * ((1 + growth_rate/100) ** years)
-            else:
-                # 문자열 등 다른 값은 그대로 복사
-                future_value[key] = value
-        
-        return future_value
-    except Exception as e:
-        # 오류 발생 시 현재 값 그대로 반환
-        st.error(f"미래 가치 계산 중 오류가 발생했습니다: {str(e)}")
-        return {k: v for k, v in current_value.items()}
-
 # 페이지 헤더
+set_phase("inputs")
 st.title("미래 세금 계산")
 
 # 메인 코드
@@ -497,14 +185,17 @@ if not st.session_state.get('evaluated', False):
     st.warning("먼저 '비상장주식 평가' 페이지에서 평가를 진행해주세요.")
     st.markdown("<div class='sidebar-guide'>왼쪽 사이드바에서 <b>비상장주식 평가</b> 메뉴를 클릭하여 평가를 먼저 진행하세요.</div>", unsafe_allow_html=True)
 else:
+    # 표, 차트, 시뮬레이션은 평가 결과가 있을 때만 쓰므로 여기서 가져옴 (첫 화면 시작 시간 단축)
+    import pandas as pd
+    from valuation.montecarlo import DISTRIBUTION_NAMES, summary_rows
+
     stock_value = st.session_state.stock_value
     company_name = st.session_state.company_name
-    owned_shares = st.session_state.owned_shares
-    share_price = st.session_state.share_price
     eval_date = st.session_state.get('eval_date', None) or datetime.now().date()
     
-    # 총 주식수는 session_state에서 가져오거나 기본값 설정
-    total_shares = st.session_state.get('total_shares', 10000)
+    # 평가 당시 입력값 (계산 결과 캐시 키)
+    valuation_input = st.session_state.get('valuation_input') or input_from_mapping(st.session_state)
+    set_phase("other")
     
     # 2025년 세법 변경 공지
     st.markdown("<div class='notice-box'>🍀 2025년부터 법인세율에 일부 변화가 적용됩니다.</div>", unsafe_allow_html=True)
@@ -533,14 +224,13 @@ else:
     st.markdown("<p class='note-text'>※ 미래 세금은 현행 세법을 기준으로 계산되었으며, 향후 세법 변경에 따라 달라질 수 있습니다.</p>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
     
+    # 성장률, 예측기간, 가족법인 여부를 반영한 계산 조건
+    scenario_input = with_scenario(valuation_input, growth_rate=growth_rate, years=years, is_family_corp=is_family_corp)
+    
     # 미래 회사 가치 계산 - 오류 처리 추가
     try:
-        future_value = calculate_future_value(stock_value, growth_rate, years)
-        
-        # 안전하게 future_value 확인
-        if not isinstance(future_value, dict):
-            st.error("미래 가치 계산 중 오류가 발생했습니다.")
-            future_value = {k: v for k, v in stock_value.items()}  # 기본값으로 현재 가치 사용
+        with phase("calculation"):
+            future_value = cache.future_value(scenario_input)
     except Exception as e:
         st.error(f"미래 가치 계산 중 오류가 발생했습니다: {str(e)}")
         future_value = {k: v for k, v in stock_value.items()}  # 기본값으로 현재 가치 사용
@@ -554,44 +244,42 @@ else:
         
         # 안전하게 키 존재 확인
         if 'finalValue' in future_value:
-            st.markdown(f"<div>미래 주당 평가액: <b>{simple_format(future_value['finalValue'])}원</b></div>", unsafe_allow_html=True)
+            st.markdown(f"<div>미래 주당 평가액: <b>{format_number(future_value['finalValue'])}원</b></div>", unsafe_allow_html=True)
         if 'totalValue' in future_value:
-            st.markdown(f"<div>미래 회사 총가치: <b>{simple_format(future_value['totalValue'])}원</b></div>", unsafe_allow_html=True)
+            st.markdown(f"<div>미래 회사 총가치: <b>{format_number(future_value['totalValue'])}원</b></div>", unsafe_allow_html=True)
         if 'ownedValue' in future_value:
-            st.markdown(f"<div>미래 대표이사 보유주식 가치: <b>{simple_format(future_value['ownedValue'])}원</b></div>", unsafe_allow_html=True)
+            st.markdown(f"<div>미래 대표이사 보유주식 가치: <b>{format_number(future_value['ownedValue'])}원</b></div>", unsafe_allow_html=True)
         
         st.markdown("</div>", unsafe_allow_html=True)
     
-    # 현재와 미래 세금 계산 - 안전하게 처리
+    # 현재와 미래 세금 계산 - 안전하게 처리 (같은 조건이면 캐시된 결과 사용)
     try:
-        current_ownership_value = stock_value.get("ownedValue", 0)
         future_ownership_value = future_value.get("ownedValue", 0)
-        current_total_value = stock_value.get("totalValue", 0)
-        future_total_value = future_value.get("totalValue", 0)
-        acquisition_value = owned_shares * share_price
+        with phase("calculation"):
+            current_details = cache.tax_details(scenario_input)
+            future_details = cache.future_tax_details(scenario_input)
         
-        # 현재 세금 계산 - 수정된 함수 호출
-        current_inheritance_tax, current_inheritance_steps, current_inheritance_rate = calculate_inheritance_tax(current_ownership_value)
-        current_transfer_tax, current_transfer_steps, current_transfer_rate, current_transfer_profit = calculate_transfer_tax(current_ownership_value, acquisition_value)
-        current_corporate_tax, current_individual_tax, current_liquidation_tax, current_liquidation_steps, current_liquidation_rate, current_corporate_income, current_individual_distribution = calculate_liquidation_tax(
-            current_ownership_value, acquisition_value, current_total_value, total_shares, owned_shares, is_family_corp
-        )
+        current_inheritance_tax = current_details["inheritanceTax"]
+        current_transfer_tax = current_details["transferTax"]
+        current_liquidation_tax = current_details["liquidationTax"]
         
-        # 미래 세금 계산 - 수정된 함수 호출
-        future_inheritance_tax, future_inheritance_steps, future_inheritance_rate = calculate_inheritance_tax(future_ownership_value)
-        future_transfer_tax, future_transfer_steps, future_transfer_rate, future_transfer_profit = calculate_transfer_tax(future_ownership_value, acquisition_value)
-        future_corporate_tax, future_individual_tax, future_liquidation_tax, future_liquidation_steps, future_liquidation_rate, future_corporate_income, future_individual_distribution = calculate_liquidation_tax(
-            future_ownership_value, acquisition_value, future_total_value, total_shares, owned_shares, is_family_corp
-        )
+        future_inheritance_tax, future_inheritance_steps, future_inheritance_rate = (
+            future_details["inheritanceTax"], future_details["inheritanceSteps"], future_details["inheritanceRate"])
+        future_transfer_tax, future_transfer_steps, future_transfer_rate = (
+            future_details["transferTax"], future_details["transferSteps"], future_details["transferRate"])
+        future_liquidation_tax, future_liquidation_steps, future_liquidation_rate = (
+            future_details["liquidationTax"], future_details["liquidationSteps"], future_details["liquidationRate"])
+        future_corporate_income = future_details["corporateIncome"]
+        future_individual_distribution = future_details["individualDistribution"]
     except Exception as e:
         st.error(f"세금 계산 중 오류가 발생했습니다: {str(e)}")
         # 기본값 설정
-        current_inheritance_tax, current_inheritance_steps, current_inheritance_rate = 0, [], 0
-        current_transfer_tax, current_transfer_steps, current_transfer_rate, current_transfer_profit = 0, [], 0, 0
-        current_corporate_tax, current_individual_tax, current_liquidation_tax, current_liquidation_steps, current_liquidation_rate, current_corporate_income, current_individual_distribution = 0, 0, 0, [], 0, 0, 0
+        future_ownership_value = 0
+        current_inheritance_tax = current_transfer_tax = current_liquidation_tax = 0
         future_inheritance_tax, future_inheritance_steps, future_inheritance_rate = 0, [], 0
-        future_transfer_tax, future_transfer_steps, future_transfer_rate, future_transfer_profit = 0, [], 0, 0
-        future_corporate_tax, future_individual_tax, future_liquidation_tax, future_liquidation_steps, future_liquidation_rate, future_corporate_income, future_individual_distribution = 0, 0, 0, [], 0, 0, 0
+        future_transfer_tax, future_transfer_steps, future_transfer_rate = 0, [], 0
+        future_liquidation_tax, future_liquidation_steps, future_liquidation_rate = 0, [], 0
+        future_corporate_income = future_individual_distribution = 0
     
     # 세금 계산 결과
     st.header("미래 세금 계산 결과")
@@ -602,21 +290,21 @@ else:
     # 상속증여세 표시 (중앙 정렬)
     with col1:
         st.markdown("<div class='center-tax-label'>상속증여세</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='center-tax-display'>{simple_format(future_inheritance_tax)}원</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='center-tax-display'>{format_number(future_inheritance_tax)}원</div>", unsafe_allow_html=True)
         st.markdown("<div class='center-tax-detail'>적용 세율: 누진세율 (10%~50%)</div>", unsafe_allow_html=True)
         st.markdown("<div>주식을 타인에게 무상으로 증여할 경우 발생하는 세금입니다. 증여 받은 사람이 납부합니다.</div>", unsafe_allow_html=True)
     
     # 양도소득세 표시 (중앙 정렬) - 수정
     with col2:
         st.markdown("<div class='center-tax-label'>양도소득세(지방소득세 포함)</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='center-tax-display'>{simple_format(future_transfer_tax)}원</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='center-tax-display'>{format_number(future_transfer_tax)}원</div>", unsafe_allow_html=True)
         st.markdown("<div class='center-tax-detail'>적용 세율: 3억 이하 20%, 초과 25%</div>", unsafe_allow_html=True)
         st.markdown("<div>주식을 매각하여 발생한 이익(양도차익)에 대해 부과되는 세금입니다. 기본공제 250만원이 적용됩니다.</div>", unsafe_allow_html=True)
     
     # 청산소득세 표시 (중앙 정렬) - 수정
     with col3:
         st.markdown("<div class='center-tax-label'>청산소득세(종합소득세 포함)</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='center-tax-display'>{simple_format(future_liquidation_tax)}원</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='center-tax-display'>{format_number(future_liquidation_tax)}원</div>", unsafe_allow_html=True)
         if is_family_corp:
             st.markdown("<div class='center-tax-detail'>법인: 19% + 개인: 45%</div>", unsafe_allow_html=True)
         else:
@@ -626,22 +314,22 @@ else:
     # 미래 상속증여세 계산 세부내역
     with st.expander("상속증여세 계산 세부내역"):
         st.markdown("<div class='calculation-box'>", unsafe_allow_html=True)
-        st.markdown(f"<p>과세표준: {simple_format(future_ownership_value)}원</p>", unsafe_allow_html=True)
+        st.markdown(f"<p>과세표준: {format_number(future_ownership_value)}원</p>", unsafe_allow_html=True)
         
-        for step in future_inheritance_steps:
-            st.markdown(f"<div class='calculation-step'>{step['bracket']}: {simple_format(step['amount'])}원 × {int(step['rate']*100)}% = {simple_format(step['tax'])}원</div>", unsafe_allow_html=True)
+        for line in step_lines(future_inheritance_steps):
+            st.markdown(f"<div class='calculation-step'>{line}</div>", unsafe_allow_html=True)
         
-        st.markdown(f"<p><b>총 상속증여세: {simple_format(future_inheritance_tax)}원</b> (실효세율: {future_inheritance_rate:.1f}%)</p>", unsafe_allow_html=True)
+        st.markdown(f"<p><b>총 상속증여세: {format_number(future_inheritance_tax)}원</b> (실효세율: {future_inheritance_rate:.1f}%)</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # 미래 양도소득세 계산 세부내역 - 이름 수정
     with st.expander("양도소득세(지방소득세 포함) 계산 세부내역"):
         st.markdown("<div class='calculation-box'>", unsafe_allow_html=True)
         
-        for step in future_transfer_steps:
-            st.markdown(f"<div class='calculation-step'>{step['description']}: {step['detail']}</div>", unsafe_allow_html=True)
+        for line in step_lines(future_transfer_steps):
+            st.markdown(f"<div class='calculation-step'>{line}</div>", unsafe_allow_html=True)
         
-        st.markdown(f"<p><b>총 양도소득세(지방소득세 포함): {simple_format(future_transfer_tax)}원</b> (실효세율: {future_transfer_rate:.1f}%)</p>", unsafe_allow_html=True)
+        st.markdown(f"<p><b>총 양도소득세(지방소득세 포함): {format_number(future_transfer_tax)}원</b> (실효세율: {future_transfer_rate:.1f}%)</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # 미래 청산소득세 계산 세부내역 - 수정
@@ -650,13 +338,13 @@ else:
         
         # 청산소득세 계산 과정에 법인과 개인 단계 표시
         st.markdown("<p><b>청산소득세 (법인세+종합소득세)</b></p>", unsafe_allow_html=True)
-        st.markdown(f"<p>법인: {simple_format(future_corporate_income)}원</p>", unsafe_allow_html=True)
-        st.markdown(f"<p>개인: {simple_format(future_individual_distribution)}원</p>", unsafe_allow_html=True)
+        st.markdown(f"<p>법인: {format_number(future_corporate_income)}원</p>", unsafe_allow_html=True)
+        st.markdown(f"<p>개인: {format_number(future_individual_distribution)}원</p>", unsafe_allow_html=True)
         
-        for step in future_liquidation_steps:
-            st.markdown(f"<div class='calculation-step'>{step['description']}: {step['detail']}</div>", unsafe_allow_html=True)
+        for line in step_lines(future_liquidation_steps):
+            st.markdown(f"<div class='calculation-step'>{line}</div>", unsafe_allow_html=True)
         
-        st.markdown(f"<p><b>총 청산소득세: {simple_format(future_liquidation_tax)}원</b> (실효세율: {future_liquidation_rate:.1f}%)</p>", unsafe_allow_html=True)
+        st.markdown(f"<p><b>총 청산소득세: {format_number(future_liquidation_tax)}원</b> (실효세율: {future_liquidation_rate:.1f}%)</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # 현재 vs 미래 세금 비교
@@ -699,12 +387,12 @@ else:
         </tbody>
     </table>
     """.format(
-        simple_format(current_inheritance_tax),
-        simple_format(future_inheritance_tax),
-        simple_format(current_transfer_tax),
-        simple_format(future_transfer_tax),
-        simple_format(current_liquidation_tax),
-        simple_format(future_liquidation_tax)
+        format_number(current_inheritance_tax),
+        format_number(future_inheritance_tax),
+        format_number(current_transfer_tax),
+        format_number(future_transfer_tax),
+        format_number(current_liquidation_tax),
+        format_number(future_liquidation_tax)
     ), unsafe_allow_html=True)
     
     # 세금 비교 분석
@@ -758,6 +446,71 @@ else:
     st.markdown("<p style='margin-top:15px;'>기업 가치의 성장에 따라 세금 부담도 증가합니다. 누진세율이 적용되는 상속증여세의 경우 가치 증가 비율보다 세금 증가 비율이 더 높을 수 있습니다.</p>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
     
+    # 주주별 세금
+    holders = normalize_holders(st.session_state.get('shareholders'))
+    if holders:
+        st.markdown("<h3 style='text-align:center; margin-top:30px;'>주주별 미래 세금</h3>", unsafe_allow_html=True)
+        with phase("calculation"):
+            cap_table = cache.cap_table(scenario_input, holders, future=True)
+        cap_df = pd.DataFrame(cap_table_rows(holders, cap_table))
+        cap_df = format_columns(cap_df, [CAP_TABLE_COLUMNS[key] for key in ("shares", "ownedValue", "inheritanceTax", "transferTax", "liquidationTax")])
+        st.dataframe(cap_df, hide_index=True, use_container_width=True)
+        st.markdown(f"<p class='note-text'>※ 청산소득세는 회사 법인세({format_number(cap_table['corporateTax'])}원)와 주주별 종합소득세의 합계입니다.</p>", unsafe_allow_html=True)
+    
+    # 연도별 세금 추이 (0년부터 예측 기간까지 한 번에 계산)
+    st.markdown("<h3 style='text-align:center; margin-top:30px;'>연도별 세금 추이</h3>", unsafe_allow_html=True)
+    with phase("calculation"):
+        timeline = cache.tax_timeline(scenario_input)
+    tax_names = ["상속증여세", "양도소득세(지방소득세 포함)", "청산소득세(종합소득세 포함)"]
+    timeline_years = eval_date.year + timeline["year"]
+    
+    timeline_df = pd.DataFrame({
+        tax_names[0]: timeline["inheritanceTax"],
+        tax_names[1]: timeline["transferTax"],
+        tax_names[2]: timeline["liquidationTax"],
+    }, index=pd.Index(timeline_years, name="연도"))
+    with phase("charts"):
+        st.line_chart(timeline_df)
+    
+    # 세금 종류별로 가장 적게 내는 연도와 전체 최소
+    cheapest = [int(timeline_df[name].to_numpy().argmin()) for name in tax_names]
+    best_year = int(timeline["minTax"].argmin())
+    for name, index in zip(tax_names, cheapest):
+        st.markdown(f"<div class='bullet-item'>{name}: <span class='blue-text'>{timeline_years[index]}년</span> ({format_number(timeline_df[name].iloc[index])}원)</div>", unsafe_allow_html=True)
+    st.markdown(f"<div style='text-align:center; margin:10px 0;'>예측 기간 중 세금이 가장 적은 시점은 <b>{timeline_years[best_year]}년 {tax_names[timeline['cheapestTax'][best_year]]}</b> ({format_number(timeline['minTax'][best_year])}원)입니다.</div>", unsafe_allow_html=True)
+    
+    with st.expander("연도별 세금 상세"):
+        timeline_table = timeline_df.copy()
+        timeline_table.insert(0, "대표이사 보유주식 가치", timeline["ownedValue"])
+        timeline_table["최소 세금"] = [tax_names[i] for i in timeline["cheapestTax"]]
+        st.dataframe(format_frame(timeline_table), use_container_width=True)
+    
+    # 몬테카를로 시뮬레이션 (연도별 성장률이 확률분포를 따른다고 가정)
+    with st.expander("몬테카를로 성장 시뮬레이션"):
+        st.markdown(f"<p class='note-text'>매년 성장률을 평균 {growth_rate}%인 확률분포에서 뽑아 {years}년 후 세금의 분포를 계산합니다. 미래 주식가치 페이지와 같이 매년 순이익이 자본총계에 누적되는 방식으로 평가합니다.</p>", unsafe_allow_html=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            mc_distribution = st.selectbox("성장률 분포", list(DISTRIBUTION_NAMES), key="mc_distribution")
+        with col2:
+            mc_spread = st.number_input("변동폭 (%p)", min_value=0.0, max_value=50.0, value=5.0, step=1.0, key="mc_spread",
+                                        help="정규분포는 표준편차, 균등분포는 평균에서 양쪽으로의 폭입니다.")
+        with col3:
+            mc_paths = st.selectbox("시뮬레이션 횟수", [1000, 10000, 100000, 1000000], index=1, key="mc_paths")
+        
+        if st.button("시뮬레이션 실행", key="mc_button"):
+            submit_job("mc_tax_job", "simulation", {
+                "inputs": scenario_input._asdict(),
+                "growth_spread": mc_spread,
+                "distribution": DISTRIBUTION_NAMES[mc_distribution],
+                "paths": mc_paths,
+            })
+        
+        mc_result = job_panel("mc_tax_job", "시뮬레이션")
+        if mc_result:
+            st.markdown(f"<small>{format_number(mc_result['paths'])}회, {mc_result['years']}년 기준</small>", unsafe_allow_html=True)
+            mc_df = pd.DataFrame(summary_rows(mc_result)).set_index("항목")
+            st.dataframe(format_frame(mc_df), use_container_width=True)
+    
     # 적용 세율 정보
     with st.expander("적용 세율 정보"):
         st.markdown("<div class='tax-info-section'>", unsafe_allow_html=True)
@@ -846,7 +599,8 @@ else:
         # HTML 다운로드 탭
         with tab1:
             if st.button("HTML 보고서 생성하기", key="generate_html"):
-                html_content = create_html_content(current_tax, future_tax, company_name, growth_rate, years)
+                with phase("reports"):
+                    html_content = future_tax_html(current_tax, future_tax, company_name, growth_rate, years)
                 
                 st.download_button(
                     label="📄 HTML 파일 다운로드",
@@ -860,7 +614,8 @@ else:
         # CSV 다운로드 탭
         with tab2:
             if st.button("CSV 데이터 생성하기", key="generate_csv"):
-                csv_content = create_csv_content(current_tax, future_tax, company_name, growth_rate, years)
+                with phase("reports"):
+                    csv_content = future_tax_csv(current_tax, future_tax, company_name, growth_rate, years)
                 
                 st.download_button(
                     label="📄 CSV 파일 다운로드",
@@ -893,3 +648,9 @@ else:
                 st.switch_page("1_비상장주식_평가.py")
             except:
                 st.markdown("<div class='sidebar-guide'>왼쪽 사이드바에서 <b>비상장주식 평가</b> 메뉴를 클릭하여 이동하세요.</div>", unsafe_allow_html=True)
+
+# 실행 시간 기록
+finish_rerun()
+
+# 실행 중인 백그라운드 작업이 있으면 진행률 갱신
+poll_jobs()
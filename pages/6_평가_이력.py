@@ -0,0 +1,111 @@
+import streamlit as st
+from datetime import date
+
+from valuation.cache import input_from_mapping
+from valuation.formatting import format_columns, format_number
+from valuation.history import DEFAULT_PAGE_SIZE, get_history_store, years_before
+from valuation.timing_widgets import finish_rerun, phase, start_rerun
+
+# 실행 단계별 시간 측정 시작
+start_rerun("history")
+
+# 조회 기간 (표시명 -> 연 수, None이면 전체)
+PERIOD_OPTIONS = {"전체 기간": None, "최근 1년": 1, "최근 3년": 3, "최근 5년": 5, "최근 10년": 10}
+
+# 이력 목록 컬럼 (키 -> 화면 표시명)
+HISTORY_COLUMNS = {
+    "id": "번호",
+    "eval_date": "평가 기준일",
+    "company_name": "회사명",
+    "evaluation_method": "평가 방법",
+    "final_value": "주당 평가액",
+    "total_value": "기업 총 가치",
+    "owned_value": "대표이사 보유주식 가치",
+    "created_at": "저장 시각",
+}
+
+# 조회 조건이 바뀌면 첫 페이지부터 표시
+def reset_page():
+    st.session_state.history_page = 1
+
+# 이력 1건을 평가 페이지 세션 상태로 불러오기 (버튼 콜백)
+def load_record(record_id):
+    record = get_history_store().get(record_id)
+    if record is None:
+        st.session_state.history_message = ("error", "이력을 찾을 수 없습니다.")
+        return
+    inputs = dict(record["inputs"])
+    inputs["eval_date"] = date.fromisoformat(record["eval_date"])
+    for key, value in inputs.items():
+        st.session_state[key] = value
+    # 평가 페이지의 주주명부 편집 표도 불러온 주주로 바꾸고 편집기 키를 바꿔 초기화
+    from valuation.captable import holders_frame
+
+    st.session_state.cap_table_base = holders_frame(inputs["shareholders"])
+    st.session_state.cap_table_version = st.session_state.get("cap_table_version", -1) + 1
+    st.session_state.valuation_input = input_from_mapping(st.session_state)
+    outputs = dict(record["outputs"])
+    outputs["evalDate"] = inputs["eval_date"]
+    st.session_state.stock_value = outputs
+    st.session_state.evaluated = True
+    st.session_state.initialized = True
+    st.session_state.history_message = (
+        "success", f"{record['company_name']} ({record['eval_date']}) 평가를 불러왔습니다. 결과와 세금 페이지에서 바로 확인할 수 있습니다."
+    )
+
+# 페이지 헤더
+st.title("평가 이력")
+st.markdown("비상장주식 평가 페이지에서 평가할 때마다 저장된 이력을 회사와 평가 기준일로 조회합니다.")
+
+store = get_history_store()
+
+# 조회 조건
+col1, col2 = st.columns(2)
+with col1:
+    company = st.selectbox("회사", ["전체"] + store.companies(), key="history_company", on_change=reset_page)
+with col2:
+    period = st.selectbox("평가 기준일", list(PERIOD_OPTIONS), index=3, key="history_period", on_change=reset_page)
+
+company_name = None if company == "전체" else company
+years = PERIOD_OPTIONS[period]
+since = years_before(date.today(), years) if years else None
+
+with phase("calculation"):
+    total = store.count(company_name, since=since)
+if total == 0:
+    st.info("조건에 맞는 평가 이력이 없습니다.")
+else:
+    # 표는 이력이 있을 때만 그리므로 pandas는 여기서 가져옴
+    import pandas as pd
+
+    page_count = (total - 1) // DEFAULT_PAGE_SIZE + 1
+    page = st.number_input(f"페이지 (전체 {page_count}쪽, {format_number(total)}건)", min_value=1, max_value=page_count,
+                           step=1, key="history_page")
+    with phase("calculation"):
+        records = store.query(company_name, since=since, limit=DEFAULT_PAGE_SIZE, offset=(page - 1) * DEFAULT_PAGE_SIZE)
+
+    history_df = pd.DataFrame(records, columns=list(HISTORY_COLUMNS)).rename(columns=HISTORY_COLUMNS).set_index("번호")
+    history_df = format_columns(history_df, ["주당 평가액", "기업 총 가치", "대표이사 보유주식 가치"])
+    st.dataframe(history_df, use_container_width=True)
+
+    # 불러오기
+    st.subheader("평가 불러오기")
+    options = [f"{record['id']} | {record['eval_date']} | {record['company_name']}" for record in records]
+    selected = st.selectbox("불러올 평가", options, key="history_selected")
+    st.button("선택한 평가 불러오기", type="primary", key="history_load_button",
+              on_click=load_record, args=(int(selected.split(" | ", 1)[0]),))
+
+message = st.session_state.pop("history_message", None)
+if message:
+    kind, text = message
+    (st.success if kind == "success" else st.error)(text)
+
+if st.session_state.get("evaluated"):
+    if st.button("평가 결과 보기", use_container_width=True, key="history_result_button"):
+        try:
+            st.switch_page("2_주식가치_결과.py")
+        except:
+            st.markdown("<div class='sidebar-guide'>왼쪽 사이드바에서 <b>주식가치 결과</b> 메뉴를 클릭하여 이동하세요.</div>", unsafe_allow_html=True)
+
+# 실행 시간 기록
+finish_rerun()
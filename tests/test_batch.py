@@ -0,0 +1,115 @@
+"""
+배열 연산 일괄 평가(valuation.batch, valuation.captable)가 1건씩 계산하는
+calculate_stock_value(), calculate_tax_details() 등과 같은 결과를 내는지 확인합니다.
+"""
+import numpy as np
+import pytest
+
+from valuation.batch import method_codes, value_companies
+from valuation.captable import value_cap_table
+from valuation.projection import calculate_future_stock_value, calculate_future_value
+from valuation.stock import METHOD_NAMES, calculate_stock_value, method_code
+from valuation.tax import calculate_tax_details
+
+# (자본총계, 1년 전, 2년 전, 3년 전 당기순이익, 발행주식수, 대표이사 보유주식수, 액면금액, 평가방법)
+COMPANIES = [
+    (1_000_000_000, 200_000_000, 180_000_000, 150_000_000, 10_000, 8_000, 5_000, "일반법인"),
+    (5_000_000_000, 300_000_000, 250_000_000, 200_000_000, 100_000, 30_000, 500, "부동산 과다법인"),
+    (800_000_000, 50_000_000, 40_000_000, 30_000_000, 20_000, 20_000, 5_000, "순자산가치만 평가"),
+    (300_000_000, -100_000_000, -50_000_000, 20_000_000, 10_000, 0, 5_000, "일반법인"),
+    (120_000_000_000, 9_000_000_000, 8_000_000_000, 7_500_000_000, 2_000_000, 1_500_000, 1_000, "일반법인"),
+    (-50_000_000, 10_000_000, 10_000_000, 10_000_000, 1_000, 500, 10_000, "부동산 과다법인"),
+]
+
+STOCK_KEYS = ("weightedIncome", "netAssetPerShare", "incomeValue", "finalValue", "totalValue", "ownedValue")
+TAX_KEYS = ("inheritanceTax", "transferTax", "liquidationTax")
+
+
+def _columns():
+    columns = list(zip(*COMPANIES))
+    return [np.array(c, dtype=np.float64) for c in columns[:7]] + [list(columns[7])]
+
+
+def _batch(**options):
+    equity, income1, income2, income3, shares, owned, price, methods = _columns()
+    return value_companies(equity, income1, income2, income3, shares, methods, owned_shares=owned,
+                           share_price=price, **options)
+
+
+@pytest.mark.parametrize("is_family_corp", [False, True])
+def test_value_companies_matches_scalar(is_family_corp):
+    result = _batch(taxes=True, is_family_corp=is_family_corp)
+    for i, (equity, income1, income2, income3, shares, owned, price, method) in enumerate(COMPANIES):
+        value = calculate_stock_value(equity, income1, income2, income3, shares, owned, method)
+        taxes = calculate_tax_details(value, owned, price, shares, is_family_corp)
+        for key in STOCK_KEYS:
+            assert result[key][i] == pytest.approx(value[key], rel=1e-9), (i, key)
+        for key in TAX_KEYS:
+            assert result[key][i] == pytest.approx(taxes[key], rel=1e-9, abs=1e-6), (i, key)
+
+
+@pytest.mark.parametrize("growth_rate, years", [(10, 10), (-5, 3), (0, 1)])
+def test_value_companies_accumulation_matches_scalar(growth_rate, years):
+    result = _batch(taxes=True, growth_rate=growth_rate, years=years, future_model="accumulation")
+    for i, (equity, income1, income2, income3, shares, owned, price, method) in enumerate(COMPANIES):
+        value = calculate_stock_value(equity, income1, income2, income3, shares, owned, method)
+        future = calculate_future_stock_value(value, equity, shares, owned, 10, method, growth_rate, years)
+        taxes = calculate_tax_details(future, owned, price, shares)
+        assert result["futureFinalValue"][i] == pytest.approx(future["finalValue"], rel=1e-9)
+        assert result["futureOwnedValue"][i] == pytest.approx(future["ownedValue"], rel=1e-9)
+        assert result["futureInheritanceTax"][i] == pytest.approx(taxes["inheritanceTax"], rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("growth_rate, years", [(10, 10), (-5, 3)])
+def test_value_companies_compound_matches_scalar(growth_rate, years):
+    result = _batch(taxes=True, growth_rate=growth_rate, years=years, future_model="compound")
+    for i, (equity, income1, income2, income3, shares, owned, price, method) in enumerate(COMPANIES):
+        value = calculate_stock_value(equity, income1, income2, income3, shares, owned, method)
+        future = calculate_future_value(value, growth_rate, years)
+        taxes = calculate_tax_details(future, owned, price, shares)
+        assert result["futureTotalValue"][i] == pytest.approx(future["totalValue"], rel=1e-9)
+        for key in TAX_KEYS:
+            future_key = f"future{key[0].upper()}{key[1:]}"
+            assert result[future_key][i] == pytest.approx(taxes[key], rel=1e-9, abs=1e-6), (i, key)
+
+
+def test_value_companies_rejects_unknown_future_model():
+    with pytest.raises(ValueError):
+        _batch(years=5, future_model="linear")
+
+
+@pytest.mark.parametrize("is_family_corp", [False, True])
+def test_cap_table_matches_scalar(is_family_corp):
+    equity, income1, income2, income3, shares, _, price, method = COMPANIES[0]
+    holders = [6_000, 2_500, 1_000, 500, 0]
+    value = calculate_stock_value(equity, income1, income2, income3, shares, 0, method)
+    table = value_cap_table(holders, value["finalValue"], value["totalValue"], shares, price, is_family_corp)
+    for i, holder_shares in enumerate(holders):
+        holder_value = dict(value, ownedValue=value["finalValue"] * holder_shares)
+        taxes = calculate_tax_details(holder_value, holder_shares, price, shares, is_family_corp)
+        assert table["ownedValue"][i] == pytest.approx(holder_value["ownedValue"], rel=1e-9)
+        for key in TAX_KEYS:
+            assert table[key][i] == pytest.approx(taxes[key], rel=1e-9, abs=1e-6), (i, key)
+    assert table["totals"]["shares"] == sum(holders)
+    assert table["totals"]["ownership"] == pytest.approx(100.0)
+
+
+def test_method_codes_mixed_names_and_codes():
+    codes = method_codes(["부동산 과다법인", 2, np.int64(0), "알 수 없음"])
+    assert codes.tolist() == [1, 2, 0, 0]
+    with pytest.raises(ValueError):
+        method_codes(np.array([0, 3]))
+
+
+@pytest.mark.parametrize("method, expected", [
+    (np.int64(2), 2), (np.int8(1), 1), (0, 0), ("순자산가치만 평가", 2), ("없는 방법", 0), (True, 0),
+])
+def test_method_code(method, expected):
+    code = method_code(method)
+    assert code == expected and type(code) is int
+
+
+@pytest.mark.parametrize("method", [np.int64(len(METHOD_NAMES)), -1, np.int32(-1)])
+def test_method_code_out_of_range(method):
+    with pytest.raises(ValueError):
+        method_code(method)
@@ -0,0 +1,40 @@
+"""누진세율 구간표(ProgressiveTable)의 1건 계산, 배열 계산, 계산 과정이 서로 일치하는지 확인합니다."""
+import numpy as np
+import pytest
+
+from valuation.brackets import ProgressiveTable
+from valuation.tax import CORPORATE_TAX_TABLE, INHERITANCE_TAX_TABLE, TRANSFER_TAX_TABLE
+
+TABLES = [INHERITANCE_TAX_TABLE, TRANSFER_TAX_TABLE, CORPORATE_TAX_TABLE]
+
+
+def _amounts(table):
+    # 구간 경계와 그 앞뒤, 0 이하 금액과 아주 큰 금액
+    limits = [upper for upper in table.uppers if upper != float("inf")]
+    edges = [value + delta for value in limits for delta in (-1, 0, 1)]
+    return [-1_000, 0, 1, *edges, 12_345_678_901, 1e15]
+
+
+@pytest.mark.parametrize("table", TABLES)
+def test_tax_matches_breakdown(table):
+    for amount in _amounts(table):
+        steps = table.breakdown(amount)
+        assert table.tax(amount) == pytest.approx(sum(step[3] for step in steps)), amount
+
+
+@pytest.mark.parametrize("table", TABLES)
+def test_tax_array_matches_tax(table):
+    amounts = _amounts(table)
+    expected = [table.tax(amount) for amount in amounts]
+    np.testing.assert_allclose(table.tax_array(amounts), expected, rtol=1e-12)
+
+
+def test_inheritance_tax_values():
+    assert INHERITANCE_TAX_TABLE.tax(100_000_000) == pytest.approx(10_000_000)
+    assert INHERITANCE_TAX_TABLE.tax(500_000_000) == pytest.approx(90_000_000)
+    assert INHERITANCE_TAX_TABLE.tax(4_000_000_000) == pytest.approx(1_540_000_000)
+
+
+def test_mismatched_table():
+    with pytest.raises(ValueError):
+        ProgressiveTable((1, float("inf")), (0.1,))
@@ -0,0 +1,49 @@
+"""분위수 스케치 합치기와 몬테카를로 시뮬레이션의 병렬/순차 결과 일치를 확인합니다."""
+import numpy as np
+import pytest
+
+from valuation import montecarlo, parallel
+from valuation.montecarlo import QuantileSketch
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def test_small_sketch_is_exact():
+    values = np.arange(1, 101, dtype=np.float64)
+    sketch = QuantileSketch(capacity=256)
+    sketch.update(values)
+    assert sketch.quantiles([0.5]).tolist() == [50.0]
+    assert np.isnan(QuantileSketch().quantiles([0.5])).all()
+
+
+def test_merge_matches_single_sketch():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    whole = QuantileSketch(capacity=512, seed=0)
+    whole.update(values)
+    merged = QuantileSketch(capacity=512, seed=0)
+    for part in np.array_split(values, 7):
+        sketch = QuantileSketch(capacity=512, seed=1)
+        sketch.update(part)
+        merged.merge(sketch)
+
+    assert merged.count == whole.count == len(values)
+    exact = np.quantile(values, QUANTILES)
+    # 순위 오차 1% 이내
+    for estimate in (merged.quantiles(QUANTILES), whole.quantiles(QUANTILES)):
+        ranks = np.searchsorted(np.sort(values), estimate) / len(values)
+        np.testing.assert_allclose(ranks, QUANTILES, atol=0.01)
+    np.testing.assert_allclose(merged.quantiles(QUANTILES), exact, rtol=0.05)
+
+
+def test_sketch_ignores_nan():
+    sketch = QuantileSketch()
+    sketch.update([1.0, np.nan, 3.0])
+    assert sketch.count == 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_simulate_matches_sequential(workers):
+    args = (1_000_000_000, 180_000_000, 10_000, 8_000, 5_000, "일반법인", 5, 10, 5, "normal", 20_000)
+    sequential = montecarlo.simulate(*args, chunk_size=4_000, seed=7)
+    result = parallel.simulate(*args, chunk_size=4_000, seed=7, workers=workers)
+    assert result == sequential
@@ -0,0 +1,81 @@
+"""포트폴리오 일괄 평가의 오류 행 처리, 묶음 순서, 주주명부 검증을 확인합니다."""
+import pandas as pd
+import pytest
+
+from valuation.captable import HOLDER_NAME_COLUMN, HOLDER_SHARES_COLUMN, validate_holders
+from valuation.parallel import map_chunks, value_portfolio
+from valuation.portfolio import result_columns, value_chunk
+from valuation.stock import calculate_stock_value
+
+COLUMNS = ["자본총계", "1년 전 당기순이익", "2년 전 당기순이익", "3년 전 당기순이익", "총 발행주식수", "액면금액", "대표이사 보유주식수"]
+
+ROWS = [
+    ("1,000,000,000", "200000000", "180000000", "150000000", "10000", "5000", "8000"),  # 정상 (콤마 허용)
+    ("abc", "1", "1", "1", "10", "", ""),                                               # 숫자가 아닌 필수값
+    ("1000000", "1", "1", "1", "0", "", ""),                                            # 발행주식수 0
+    ("1000000", "1", "1", "1", "100", "", "-5"),                                        # 음수 보유주식수
+    ("1000000", "1", "1", "1", "100", "", "101"),                                       # 보유주식수 초과
+    ("1000000", "1", "1", "1", "100", "오천", ""),                                      # 숫자가 아닌 액면금액
+    ("1000000", "1", "1", "1", "100", "5000", "x"),                                     # 숫자가 아닌 보유주식수
+    ("1000000", "1", "1", "1", "100", None, None),                                      # 빈 선택값은 0
+]
+
+
+def _frame(rows=ROWS):
+    return pd.DataFrame(rows, columns=COLUMNS, dtype=object)
+
+
+def _double(chunk):
+    return [value * 2 for value in chunk]
+
+
+def test_value_chunk_error_rows():
+    out = value_chunk(_frame(), taxes=True, growth_rate=10, years=5)
+    assert out["오류"].tolist() == [
+        "", "숫자가 아닌 값", "발행주식수 1 미만", "보유 주식수 0 미만", "보유 주식수가 발행주식수 초과",
+        "숫자가 아닌 값", "숫자가 아닌 값", "",
+    ]
+    errors = out["오류"] != ""
+    assert (out.loc[errors, "적용 평가방식"] == "").all()
+    assert out.loc[errors, "주당 평가액"].isna().all()
+    assert list(out.columns) == [*COLUMNS, *result_columns(True, 5)]
+
+    expected = calculate_stock_value(1_000_000_000, 200_000_000, 180_000_000, 150_000_000, 10_000, 8_000)
+    assert out.loc[0, "주당 평가액"] == round(expected["finalValue"])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_map_chunks_keeps_input_order(workers):
+    chunks = [list(range(start, start + 3)) for start in range(0, 30, 3)]
+    outcomes = list(map_chunks(_double, iter(chunks), workers, max_pending=2))
+    assert [outcome.index for outcome in outcomes] == list(range(len(chunks)))
+    assert [outcome.value for outcome in outcomes] == [_double(chunk) for chunk in chunks]
+    assert all(outcome.error == "" for outcome in outcomes)
+
+
+def test_value_portfolio_matches_value_chunk():
+    frame = _frame(ROWS * 3)
+    chunks = [frame.iloc[start:start + 5] for start in range(0, len(frame), 5)]
+    combined = pd.concat(list(value_portfolio(chunks, workers=1, taxes=True)), ignore_index=True)
+    pd.testing.assert_frame_equal(combined, value_chunk(frame, taxes=True))
+
+
+def test_validate_holders():
+    df = pd.DataFrame({
+        HOLDER_NAME_COLUMN: ["대표", "", "김", "이", "박"],
+        HOLDER_SHARES_COLUMN: ["6,000", None, "-1", "1.5", "abc"],
+    })
+    clean, errors, summary = validate_holders(df, 10_000)
+    assert clean[HOLDER_NAME_COLUMN].tolist() == ["대표", "김", "이", "박"]
+    assert clean[HOLDER_SHARES_COLUMN].tolist()[0] == 6_000
+    assert [message.split(":")[0] for message in errors] == [
+        "주식수가 숫자가 아닙니다", "주식수가 음수입니다", "주식수가 정수가 아닙니다",
+    ]
+    assert summary["count"] == 2
+
+
+def test_validate_holders_over_subscribed():
+    df = pd.DataFrame({HOLDER_NAME_COLUMN: ["대표", "김"], HOLDER_SHARES_COLUMN: [9_000, 2_000]})
+    _, errors, summary = validate_holders(df, 10_000)
+    assert len(errors) == 1 and "초과" in errors[0]
+    assert summary["ownership"] == pytest.approx(110.0)
@@ -0,0 +1,87 @@
+"""실행 시간 측정(valuation.timing)과 부하 시험(benchmarks.loadtest)의 집계를 확인합니다."""
+import pytest
+
+from valuation.timing import PageTimings, RerunTimer, percentile, summarize
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _record(page, total, interrupted=False):
+    return {"page": page, "total": total, "phases": {"render": total}, "interrupted": interrupted}
+
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 0.5) == pytest.approx(2.5)
+    assert percentile(list(range(101)), 0.95) == pytest.approx(95.0)
+
+
+def test_rerun_timer_phases():
+    clock = FakeClock()
+    timer = RerunTimer("valuation", "s1", clock=clock)
+    clock.now = 0.1
+    with timer.phase("calculation"):
+        clock.now = 0.4
+    clock.now = 0.5
+    record = timer.finish()
+    assert record["total"] == pytest.approx(0.5)
+    assert record["phases"]["calculation"] == pytest.approx(0.3)
+    assert sum(record["phases"].values()) == pytest.approx(record["total"])
+    assert record["interrupted"] is False
+
+
+@pytest.mark.parametrize("options", [{"interrupted": True}, {"stopped": True}])
+def test_rerun_timer_interrupted(options):
+    clock = FakeClock()
+    timer = RerunTimer("result", clock=clock)
+    clock.now = 0.2
+    timer.switch("render")
+    clock.now = 1.0
+    record = timer.finish(**options)
+    assert record["interrupted"] is True
+    if options.get("interrupted"):
+        # 마지막 단계 전환 시점까지만 계산
+        assert record["total"] == pytest.approx(0.2)
+
+
+def test_summarize_skips_interrupted():
+    records = [_record("valuation", 1.0), _record("valuation", 3.0), _record("valuation", 0.01, interrupted=True)]
+    summary = summarize(records)
+    assert summary["count"] == 2
+    assert summary["mean"] == pytest.approx(2.0)
+    assert summary["max"] == 3.0
+    assert summary["phases"] == {"render": pytest.approx(2.0)}
+    assert summarize([_record("valuation", 0.01, interrupted=True)])["count"] == 0
+
+
+def test_page_timings_keeps_recent_records():
+    timings = PageTimings(size=3)
+    for total in range(5):
+        timings.add(_record("history", float(total)))
+    timings.add(_record("valuation_portfolio", 1.0))
+    assert [record["total"] for record in timings.records("history")] == [2.0, 3.0, 4.0]
+    assert timings.pages() == ["history", "valuation_portfolio"]
+    assert timings.summary()["history"]["count"] == 3
+    timings.clear()
+    assert timings.pages() == []
+
+
+def test_load_test_single_user(tmp_path, monkeypatch):
+    # 이력 DB와 작업 저장소가 이미 기본 경로(상대 경로)로 정해졌어도 임시 디렉터리에 쓰도록 이동
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("VALUATION_HISTORY_DB", str(tmp_path / "history.db"))
+    monkeypatch.setenv("VALUATION_JOB_DIR", str(tmp_path / "jobs"))
+    from benchmarks.loadtest import PAGE_FILES, run_load, worst_p95
+
+    result = run_load(users=1, iterations=1, seed=1)
+    assert result["errors"] == []
+    assert result["reruns"] > 0
+    assert set(result["pages"]) == set(PAGE_FILES)
+    assert worst_p95(result) > 0
@@ -0,0 +1,38 @@
+"""
+기업가치 약식 평가계산기 계산 모듈
+
+Streamlit 페이지와 분리된 평가, 세금, 미래가치 계산 로직을 모아둔 패키지입니다.
+Streamlit, plotly, NumPy 없이 가져올 수 있으며 모든 함수는 명시적인 인자를 받습니다.
+배열 단위 일괄 계산은 NumPy가 필요한 valuation.batch 모듈을 사용하세요.
+"""
+from valuation.stock import (
+    METHOD_NAMES,
+    METHOD_TEXTS,
+    calculate_stock_value,
+    per_share_value,
+)
+from valuation.tax import (
+    calculate_inheritance_tax,
+    calculate_liquidation_tax,
+    calculate_tax_details,
+    calculate_transfer_tax,
+    inheritance_tax,
+)
+from valuation.projection import (
+    calculate_future_stock_value,
+    calculate_future_value,
+)
+
+__all__ = [
+    "METHOD_NAMES",
+    "METHOD_TEXTS",
+    "calculate_stock_value",
+    "per_share_value",
+    "calculate_inheritance_tax",
+    "inheritance_tax",
+    "calculate_transfer_tax",
+    "calculate_liquidation_tax",
+    "calculate_tax_details",
+    "calculate_future_stock_value",
+    "calculate_future_value",
+]
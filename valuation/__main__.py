@@ -0,0 +1,6 @@
+"""python -m valuation 으로 포트폴리오 일괄 평가 명령줄 도구를 실행합니다."""
+import sys
+
+from valuation.cli import main
+
+sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+비상장주식 일괄 평가 엔진
+
+상속세 및 증여세법 시행령 제54조에 따른 평가식을 NumPy 배열 연산으로 계산합니다.
+회사 수만큼의 배열을 한 번에 받아 순자산가치, 영업권, 손익가치, 최종 평가액을
+한 번의 벡터 연산으로 산출합니다.
+"""
+import numbers
+
+import numpy as np
+
+from valuation.projection import FUTURE_MODELS
+from valuation.stock import METHOD_GENERAL, METHOD_NAMES, METHOD_TEXTS, per_share_components
+from valuation.tax import inheritance_tax_array, liquidation_tax_array, transfer_tax_array
+
+
+def method_codes(methods):
+    """
+    평가방법 이름(또는 코드) 목록을 정수 코드 배열로 변환합니다.
+    알 수 없는 이름은 기존 화면과 동일하게 일반법인으로 처리하고,
+    METHOD_TEXTS 범위 밖의 코드는 ValueError를 냅니다.
+    """
+    if isinstance(methods, np.ndarray) and methods.dtype.kind in "iu":
+        codes = methods
+    else:
+        lookup = {name: code for code, name in enumerate(METHOD_NAMES)}
+        # 이름과 코드가 섞인 목록을 NumPy 배열로 바꾸면 코드가 문자열이 되므로 목록은 그대로 순회
+        items = methods if isinstance(methods, (list, tuple)) else np.atleast_1d(methods)
+        codes = np.fromiter(
+            (m if isinstance(m, numbers.Integral) and not isinstance(m, bool) else lookup.get(m, METHOD_GENERAL)
+             for m in items),
+            dtype=np.int64, count=len(items)
+        )
+    invalid = (codes < 0) | (codes >= len(METHOD_TEXTS))
+    if invalid.any():
+        raise ValueError(f"알 수 없는 평가방법 코드입니다: {codes[invalid].flat[0]}")
+    return codes.astype(np.int8)
+
+
+def per_share_values(total_equity, weighted_income, shares, methods, interest_rate=10):
+    """
+    자본총계와 가중평균 당기순이익으로 1주당 가치를 계산합니다.
+    계산식은 valuation.stock.per_share_components()를 배열 연산으로 실행하며,
+    모든 인자는 브로드캐스팅 가능한 배열이면 되므로 미래가치 예측 등에서도 재사용합니다.
+
+    Returns:
+    dict: netAssetPerShare, goodwill, assetValueWithGoodwill, incomeValue, finalValue 배열
+    """
+    return per_share_components(
+        np.asarray(total_equity, dtype=np.float64),
+        np.asarray(weighted_income, dtype=np.float64),
+        np.asarray(shares, dtype=np.float64),
+        np.asarray(methods),
+        np.asarray(interest_rate, dtype=np.float64),
+        maximum=np.maximum,
+        where=np.where
+    )
+
+
+def calculate_stock_values(total_equity, net_income1, net_income2, net_income3, shares,
+                           methods, owned_shares=0, interest_rate=10):
+    """
+    여러 회사의 비상장주식 가치를 한 번에 계산합니다.
+
+    Parameters:
+    total_equity (array): 자본총계 (원)
+    net_income1, net_income2, net_income3 (array): 1년 전, 2년 전, 3년 전 당기순이익 (원)
+    shares (array): 총 발행주식수
+    methods (array): 평가방법 코드(METHOD_*) 또는 평가방법 이름
+    owned_shares (array): 대표이사 보유 주식수
+    interest_rate (float or array): 환원율 (%)
+
+    Returns:
+    dict: calculate_stock_value()와 같은 키를 가진 배열 딕셔너리
+    """
+    total_equity = np.asarray(total_equity, dtype=np.float64)
+    shares = np.asarray(shares, dtype=np.float64)
+    codes = method_codes(methods)
+
+    weighted_income = (
+        np.asarray(net_income1, dtype=np.float64) * 3
+        + np.asarray(net_income2, dtype=np.float64) * 2
+        + np.asarray(net_income3, dtype=np.float64) * 1
+    ) / 6
+
+    values = per_share_values(total_equity, weighted_income, shares, codes, interest_rate)
+    final_value = values["finalValue"]
+    net_asset_per_share = values["netAssetPerShare"]
+
+    # 순자산가치 대비 평가액 비율 (%)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        increase_percentage = np.where(
+            net_asset_per_share > 0,
+            np.round(final_value / net_asset_per_share * 100),
+            0
+        ).astype(np.int64)
+
+    values.update({
+        "totalValue": final_value * shares,
+        "ownedValue": final_value * np.asarray(owned_shares, dtype=np.float64),
+        "increasePercentage": increase_percentage,
+        "weightedIncome": weighted_income,
+        "methodCode": codes,
+    })
+    return values
+
+
+def _growth_factors(growth_rates):
+    return 1 + np.asarray(growth_rates, dtype=np.float64) / 100
+
+
+def project_equity_income(total_equity, weighted_income, growth_rates, years):
+    """
+    매년 당기순이익이 성장률만큼 늘고 그 순이익이 자본총계에 누적될 때
+    예측 기간 말의 자본총계와 당기순이익을 등비급수 공식으로 계산합니다.
+
+        당기순이익(T) = I0 × g^T
+        자본총계(T)   = E0 + I0 × (g + g² + ... + g^T) = E0 + I0 × g × (g^T - 1) / (g - 1)
+
+    growth_rates와 years는 서로 브로드캐스팅되므로 growth_rates[:, None]과 years[None, :]를
+    넘기면 성장률×기간 행렬이 나옵니다.
+
+    Returns:
+    tuple: (자본총계 배열, 당기순이익 배열)
+    """
+    g = _growth_factors(growth_rates)
+    years = np.asarray(years, dtype=np.float64)
+    g_power = g ** years
+
+    # 성장률 0%이면 등비급수 합은 기간 T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series_sum = np.where(g == 1, years, g * (g_power - 1) / (g - 1))
+
+    future_income = np.asarray(weighted_income, dtype=np.float64) * g_power
+    future_equity = np.asarray(total_equity, dtype=np.float64) + np.asarray(weighted_income, dtype=np.float64) * series_sum
+    return future_equity, future_income
+
+
+def project_yearly_path(total_equity, weighted_income, growth_rates, years):
+    """
+    0년부터 years년까지 매년의 자본총계와 당기순이익 경로를 계산합니다.
+
+    Returns:
+    tuple: (자본총계, 당기순이익) - 각각 (성장률 수, years + 1) 배열
+    """
+    g = np.atleast_1d(_growth_factors(growth_rates))[:, None]
+    powers = g ** np.arange(years + 1)
+    income = np.asarray(weighted_income, dtype=np.float64) * powers
+    # 0년차 순이익은 이미 자본총계에 반영되어 있으므로 1년차부터 누적
+    equity = np.asarray(total_equity, dtype=np.float64) + np.cumsum(income, axis=1) - income[:, :1]
+    return equity, income
+
+
+def future_stock_value_grid(total_equity, weighted_income, shares, owned_shares, methods,
+                            growth_rates, years, interest_rate=10):
+    """
+    calculate_future_stock_value()의 평가를 성장률×예측기간 전체 조합에 대해 한 번에 계산합니다.
+
+    Parameters:
+    total_equity (float): 현재 자본총계
+    weighted_income (float): 현재 가중평균 당기순이익
+    shares, owned_shares (int): 총 발행주식수, 대표이사 보유 주식수
+    methods: 평가방법 이름 또는 코드
+    growth_rates (array): 성장률 목록 (%)
+    years (array): 예측 기간 목록 (년)
+
+    Returns:
+    dict: (성장률 수, 기간 수) 배열 딕셔너리
+    """
+    growth_rates = np.atleast_1d(np.asarray(growth_rates, dtype=np.float64))
+    years = np.atleast_1d(np.asarray(years, dtype=np.float64))
+    code = method_codes(methods)[0]
+
+    future_equity, future_income = project_equity_income(
+        total_equity, weighted_income, growth_rates[:, None], years[None, :]
+    )
+    values = per_share_values(future_equity, future_income, shares, code, interest_rate)
+    values.update({
+        "totalValue": values["finalValue"] * shares,
+        "ownedValue": values["finalValue"] * owned_shares,
+        "futureTotalEquity": future_equity,
+        "futureWeightedIncome": future_income,
+        "growthRates": growth_rates,
+        "years": years,
+    })
+    return values
+
+
+def scenario_grid(total_equity, weighted_income, shares, owned_shares, share_price, methods,
+                  growth_rates, years, interest_rate=10, is_family_corp=False):
+    """
+    성장률×예측기간 전체 조합의 미래 주식가치와 세금(상속증여세, 양도소득세, 청산소득세)을
+    한 번에 계산합니다. 연도별 추이 표시용으로 성장률별 최장 기간까지의 연도별 경로도 담습니다.
+
+    Parameters:
+    share_price (int): 액면금액 (양도소득세 취득가액 계산용)
+    is_family_corp (bool): 가족법인 여부 (청산소득세 법인세율)
+    나머지는 future_stock_value_grid()와 같음
+
+    Returns:
+    dict: future_stock_value_grid() 결과에 세금 배열과 yearlyEquity, yearlyIncome
+          ((성장률 수, 최장 기간 + 1) 배열)을 더한 딕셔너리
+    """
+    grid = future_stock_value_grid(total_equity, weighted_income, shares, owned_shares, methods,
+                                   growth_rates, years, interest_rate)
+
+    corporate_tax, individual_tax, liquidation_tax = liquidation_tax_array(
+        grid["totalValue"], shares, owned_shares, is_family_corp
+    )
+    yearly_equity, yearly_income = project_yearly_path(
+        total_equity, weighted_income, grid["growthRates"], int(grid["years"].max())
+    )
+    grid.update({
+        "inheritanceTax": inheritance_tax_array(grid["ownedValue"]),
+        "transferTax": transfer_tax_array(grid["ownedValue"], owned_shares * share_price),
+        "liquidationTax": liquidation_tax,
+        "corporateTax": corporate_tax,
+        "individualTax": individual_tax,
+        "yearlyEquity": yearly_equity,
+        "yearlyIncome": yearly_income,
+        "methodText": METHOD_TEXTS[method_codes(methods)[0]],
+    })
+    return grid
+
+
+def grid_scenario(grid, growth_rate, years):
+    """
+    scenario_grid() 결과에서 한 조합을 꺼내 calculate_future_stock_value()와 같은 형식의
+    딕셔너리로 돌려줍니다 (세금 항목 포함). 격자에 없는 조합이면 None을 돌려줍니다.
+    """
+    rows = np.flatnonzero(grid["growthRates"] == growth_rate)
+    cols = np.flatnonzero(grid["years"] == years)
+    if not len(rows) or not len(cols):
+        return None
+    i, j = rows[0], cols[0]
+    years = int(years)
+
+    result = {key: float(grid[key][i, j]) for key in (
+        "netAssetPerShare", "assetValueWithGoodwill", "incomeValue", "finalValue", "totalValue", "ownedValue",
+        "futureTotalEquity", "futureWeightedIncome",
+        "inheritanceTax", "transferTax", "liquidationTax", "corporateTax", "individualTax",
+    )}
+    result.update({
+        "methodText": grid["methodText"],
+        "growthRate": growth_rate,
+        "futureYears": years,
+        "yearlyEquity": grid["yearlyEquity"][i, :years + 1].tolist(),
+        "yearlyIncome": grid["yearlyIncome"][i, :years + 1].tolist(),
+    })
+    return result
+
+
+def tax_timeline(owned_value, total_value, owned_shares, share_price, total_shares, growth_rate, years,
+                 is_family_corp=False):
+    """
+    calculate_future_value()와 같은 복리 성장을 가정하고 0년(현재)부터 years년까지
+    매년의 상속증여세, 양도소득세, 청산소득세를 한 번의 배열 연산으로 계산합니다.
+
+    Parameters:
+    owned_value, total_value (float): 현재 대표이사 보유주식 가치, 회사 총가치
+    owned_shares, share_price, total_shares: calculate_tax_details()와 같음
+    growth_rate (float): 연간 성장률 (%)
+    years (int): 예측 기간 (년)
+
+    Returns:
+    dict: years + 1 길이 배열 딕셔너리 (year, ownedValue, totalValue, 세 가지 세액, minTax)와
+          가장 적은 세금 종류의 인덱스 배열 cheapestTax (0: 상속증여세, 1: 양도소득세, 2: 청산소득세)
+    """
+    year = np.arange(int(years) + 1)
+    factors = _growth_factors(growth_rate) ** year
+    owned_values = owned_value * factors
+    total_values = total_value * factors
+
+    taxes = np.vstack((
+        inheritance_tax_array(owned_values),
+        transfer_tax_array(owned_values, owned_shares * share_price),
+        liquidation_tax_array(total_values, total_shares, owned_shares, is_family_corp)[2],
+    ))
+    return {
+        "year": year,
+        "ownedValue": owned_values,
+        "totalValue": total_values,
+        "inheritanceTax": taxes[0],
+        "transferTax": taxes[1],
+        "liquidationTax": taxes[2],
+        "minTax": taxes.min(axis=0),
+        "cheapestTax": taxes.argmin(axis=0),
+    }
+
+
+def company_taxes(owned_value, total_value, shares, owned_shares, share_price, is_family_corp=False):
+    """
+    회사별 보유주식 가치와 회사 총가치 배열로 세 가지 세금 배열을 계산합니다.
+
+    Returns:
+    dict: inheritanceTax, transferTax, liquidationTax 배열
+    """
+    owned_shares = np.asarray(owned_shares, dtype=np.float64)
+    return {
+        "inheritanceTax": inheritance_tax_array(owned_value),
+        "transferTax": transfer_tax_array(owned_value, owned_shares * share_price),
+        "liquidationTax": liquidation_tax_array(total_value, shares, owned_shares, is_family_corp)[2],
+    }
+
+
+def value_companies(total_equity, net_income1, net_income2, net_income3, shares, methods, owned_shares=0,
+                    share_price=0, interest_rate=10, taxes=False, growth_rate=0, years=0, is_family_corp=False,
+                    future_model="accumulation"):
+    """
+    여러 회사의 주식가치와 (선택) 현재 세금, 미래 가치와 미래 세금을 한 번에 계산합니다.
+
+    Parameters:
+    taxes (bool): inheritanceTax, transferTax, liquidationTax 추가
+    growth_rate (float), years (int): years가 1 이상이면 futureFinalValue, futureTotalValue,
+        futureOwnedValue 추가 (taxes=True이면 futureInheritanceTax 등 미래 세금도 추가)
+    future_model (str): 미래 가치 계산 방식 (valuation.projection.FUTURE_MODELS).
+        "accumulation"은 미래 주식가치 페이지, "compound"는 미래 세금계산 페이지와 같은 결과
+    나머지는 calculate_stock_values()와 같음
+
+    Returns:
+    dict: calculate_stock_values() 결과에 위 키를 더한 배열 딕셔너리
+    """
+    shares = np.asarray(shares, dtype=np.float64)
+    owned_shares = np.asarray(owned_shares, dtype=np.float64)
+    codes = method_codes(methods)
+    result = calculate_stock_values(total_equity, net_income1, net_income2, net_income3, shares, codes,
+                                    owned_shares, interest_rate)
+    if taxes:
+        result.update(company_taxes(result["ownedValue"], result["totalValue"], shares, owned_shares,
+                                    share_price, is_family_corp))
+    if future_model not in FUTURE_MODELS:
+        raise ValueError(f"알 수 없는 미래 가치 계산 방식입니다: {future_model}")
+    if years:
+        if future_model == "compound":
+            # calculate_future_value()와 같이 현재 평가액에 복리 성장률을 곱함
+            final_value = result["finalValue"] * (1 + np.asarray(growth_rate, dtype=np.float64) / 100) ** years
+        else:
+            future_equity, future_income = project_equity_income(total_equity, result["weightedIncome"], growth_rate, years)
+            final_value = per_share_values(future_equity, future_income, shares, codes, interest_rate)["finalValue"]
+        future = {
+            "finalValue": final_value,
+            "totalValue": final_value * shares,
+            "ownedValue": final_value * owned_shares,
+        }
+        if taxes:
+            future.update(company_taxes(future["ownedValue"], future["totalValue"], shares, owned_shares,
+                                        share_price, is_family_corp))
+        result.update({f"future{key[0].upper()}{key[1:]}": values for key, values in future.items()})
+    return result
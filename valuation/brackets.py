@@ -0,0 +1,78 @@
+"""
+누진세율 구간표
+
+구간 상한, 세율과 함께 각 구간 하한까지의 누적세액을 미리 계산해 두고
+금액이 속한 구간을 이진 탐색으로 찾아 `누적세액 + (금액 - 구간 하한) × 세율`로
+세액을 구합니다. 구간 수와 관계없이 한 번의 탐색으로 세액이 나오며,
+배열 입력은 np.searchsorted로 한 번에 계산합니다.
+"""
+from bisect import bisect_left
+
+
+class ProgressiveTable:
+    """
+    누진세율 구간표
+
+    Parameters:
+    limits (sequence): 구간 상한 (오름차순, 마지막은 float('inf'))
+    rates (sequence): 구간별 세율
+    labels (sequence): 계산 과정 표시용 구간 이름
+    """
+    __slots__ = ("uppers", "lowers", "rates", "bases", "labels", "_arrays")
+
+    def __init__(self, limits, rates, labels=None):
+        if len(limits) != len(rates):
+            raise ValueError("limits와 rates의 길이가 다릅니다.")
+        self.uppers = tuple(float(limit) for limit in limits)
+        self.lowers = (0.0,) + self.uppers[:-1]
+        self.rates = tuple(float(rate) for rate in rates)
+        self.labels = tuple(labels) if labels else tuple(f"구간 {i + 1}" for i in range(len(limits)))
+
+        # 각 구간 하한까지의 누적세액
+        bases = [0.0]
+        for lower, upper, rate in zip(self.lowers[:-1], self.uppers[:-1], self.rates[:-1]):
+            bases.append(bases[-1] + (upper - lower) * rate)
+        self.bases = tuple(bases)
+        self._arrays = None
+
+    def tax(self, amount):
+        """금액 1건의 세액"""
+        if not amount > 0:
+            return 0
+        i = bisect_left(self.uppers, amount)
+        return self.bases[i] + (amount - self.lowers[i]) * self.rates[i]
+
+    def arrays(self):
+        """NumPy 계산용 구간표 (처음 사용할 때 한 번 만들고 읽기 전용으로 고정)"""
+        if self._arrays is None:
+            import numpy as np
+            arrays = tuple(np.array(values, dtype=np.float64) for values in (self.uppers, self.lowers, self.rates, self.bases))
+            for array in arrays:
+                array.setflags(write=False)
+            self._arrays = arrays
+        return self._arrays
+
+    def tax_array(self, amounts):
+        """금액 배열의 세액 배열 (0 이하 금액은 0)"""
+        import numpy as np
+        uppers, lowers, rates, bases = self.arrays()
+        amounts = np.asarray(amounts, dtype=np.float64)
+        i = np.searchsorted(uppers, amounts, side="left")
+        i = np.minimum(i, len(uppers) - 1)
+        return np.where(amounts > 0, bases[i] + (amounts - lowers[i]) * rates[i], 0.0)
+
+    def breakdown(self, amount):
+        """
+        구간별 계산 과정
+
+        Returns:
+        list: (구간 이름, 과세 금액, 세율, 세액) 튜플 목록 (과세 금액이 있는 구간만)
+        """
+        steps = []
+        if not amount > 0:
+            return steps
+        last = bisect_left(self.uppers, amount)
+        for i in range(last + 1):
+            taxable = min(amount, self.uppers[i]) - self.lowers[i]
+            steps.append((self.labels[i], taxable, self.rates[i], taxable * self.rates[i]))
+        return steps
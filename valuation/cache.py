@@ -0,0 +1,288 @@
+"""
+계산 결과 캐시
+
+평가 입력값을 해시 가능한 ValuationInput 레코드로 정규화하고, 같은 레코드에 대한
+주식가치, 세금, 미래가치 계산 결과를 프로세스 단위 LRU 캐시에 보관합니다.
+Streamlit 서버는 한 프로세스에서 모든 세션을 처리하므로 같은 입력으로 다시 실행하거나
+페이지를 옮겨 다닐 때, 그리고 다른 세션이 같은 회사를 조회할 때 다시 계산하지 않습니다.
+
+캐시된 결과는 여러 세션이 공유하므로 호출한 쪽에는 복사본을 돌려주고, 결과 안의 목록
+(세금 계산 과정, 연도별 자본총계와 순이익)은 튜플로, 배열은 읽기 전용으로, 주주 명부의
+합계 행은 읽기 전용 매핑(MappingProxyType)으로 보관합니다.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+
+from valuation.projection import (
+    FORECAST_YEAR_OPTIONS,
+    GROWTH_RATE_OPTIONS,
+    calculate_future_stock_value,
+    calculate_future_value,
+)
+from valuation.stock import DEFAULT_INTEREST_RATE, METHOD_NAMES, calculate_stock_value, method_code
+from valuation.tax import calculate_tax_details
+
+# 캐시 최대 항목 수 (함수별)
+CACHE_SIZE = 512
+
+
+class ValuationInput(NamedTuple):
+    """평가에 영향을 주는 입력값 묶음 (캐시 키)"""
+    total_equity: int
+    net_income1: int
+    net_income2: int
+    net_income3: int
+    shares: int
+    owned_shares: int = 0
+    share_price: int = 0
+    evaluation_method: str = "일반법인"
+    interest_rate: float = DEFAULT_INTEREST_RATE
+    growth_rate: float = 0
+    years: int = 0
+    is_family_corp: bool = False
+
+
+def normalize_input(total_equity, net_income1, net_income2, net_income3, shares,
+                    owned_shares=0, share_price=0, evaluation_method="일반법인",
+                    interest_rate=DEFAULT_INTEREST_RATE, growth_rate=0, years=0, is_family_corp=False):
+    """
+    입력값을 정규화된 ValuationInput으로 만듭니다.
+    금액과 주식수는 원/주 단위 정수로, 비율은 float로, 평가방법은 표준 이름으로 맞춰
+    표기만 다른 같은 입력이 같은 캐시 항목을 쓰도록 합니다.
+    """
+    return ValuationInput(
+        total_equity=int(total_equity),
+        net_income1=int(net_income1),
+        net_income2=int(net_income2),
+        net_income3=int(net_income3),
+        shares=max(int(shares), 1),
+        owned_shares=max(int(owned_shares or 0), 0),
+        share_price=max(int(share_price or 0), 0),
+        evaluation_method=METHOD_NAMES[method_code(evaluation_method)],
+        interest_rate=float(interest_rate),
+        growth_rate=float(growth_rate),
+        years=int(years),
+        is_family_corp=bool(is_family_corp),
+    )
+
+
+def input_from_mapping(state, **overrides):
+    """세션 상태처럼 평가 페이지와 같은 키를 가진 매핑에서 ValuationInput을 만듭니다."""
+    values = {
+        "total_equity": state["total_equity"],
+        "net_income1": state["net_income1"],
+        "net_income2": state["net_income2"],
+        "net_income3": state["net_income3"],
+        "shares": state["shares"],
+        "owned_shares": state["owned_shares"],
+        "share_price": state["share_price"],
+        "evaluation_method": state["evaluation_method"],
+        "interest_rate": state["interest_rate"],
+    }
+    values.update(overrides)
+    return normalize_input(**values)
+
+
+def with_scenario(inputs, growth_rate=None, years=None, is_family_corp=None):
+    """성장률, 예측기간, 가족법인 여부만 바꾼 정규화된 레코드를 돌려줍니다."""
+    changes = {}
+    if growth_rate is not None:
+        changes["growth_rate"] = float(growth_rate)
+    if years is not None:
+        changes["years"] = int(years)
+    if is_family_corp is not None:
+        changes["is_family_corp"] = bool(is_family_corp)
+    return inputs._replace(**changes)
+
+
+# 시나리오 항목은 주식가치에 영향이 없으므로 키에서 제외
+def _base(inputs):
+    return inputs._replace(growth_rate=0.0, years=0, is_family_corp=False)
+
+
+# 결과 안의 목록 항목 (캐시에는 튜플로 보관해 공유하는 세션이 바꿀 수 없게 함)
+_STEP_KEYS = ("inheritanceSteps", "transferSteps", "liquidationSteps")
+_YEARLY_KEYS = ("yearlyEquity", "yearlyIncome")
+
+
+def _freeze(result, keys):
+    if result is not None:
+        for key in keys:
+            if key in result:
+                result[key] = tuple(result[key])
+    return result
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _stock_value(inputs):
+    return calculate_stock_value(
+        inputs.total_equity, inputs.net_income1, inputs.net_income2, inputs.net_income3,
+        inputs.shares, inputs.owned_shares, inputs.evaluation_method, inputs.interest_rate
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _tax_details(inputs):
+    return _freeze(calculate_tax_details(
+        _stock_value(_base(inputs)), inputs.owned_shares, inputs.share_price, inputs.shares, inputs.is_family_corp
+    ), _STEP_KEYS)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _future_stock_value(inputs):
+    return _freeze(calculate_future_stock_value(
+        _stock_value(_base(inputs)), inputs.total_equity, inputs.shares, inputs.owned_shares,
+        inputs.interest_rate, inputs.evaluation_method, inputs.growth_rate, inputs.years
+    ), _YEARLY_KEYS)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _future_value(inputs):
+    return calculate_future_value(_stock_value(_base(inputs)), inputs.growth_rate, inputs.years)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _future_tax_details(inputs):
+    return _freeze(calculate_tax_details(
+        _future_value(inputs._replace(is_family_corp=False)), inputs.owned_shares, inputs.share_price,
+        inputs.shares, inputs.is_family_corp
+    ), _STEP_KEYS)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _scenario_grid(inputs):
+    # NumPy는 격자를 처음 계산할 때만 가져옴
+    from valuation.batch import scenario_grid as build_grid
+
+    grid = build_grid(
+        inputs.total_equity, _stock_value(_base(inputs))["weightedIncome"], inputs.shares, inputs.owned_shares,
+        inputs.share_price, inputs.evaluation_method, GROWTH_RATE_OPTIONS, FORECAST_YEAR_OPTIONS,
+        inputs.interest_rate, inputs.is_family_corp
+    )
+    # 여러 세션이 같은 배열을 공유하므로 읽기 전용으로 고정
+    for value in grid.values():
+        if hasattr(value, "setflags"):
+            value.setflags(write=False)
+    return grid
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _tax_timeline(inputs):
+    from valuation.batch import tax_timeline as build_timeline
+
+    value = _stock_value(_base(inputs))
+    timeline = build_timeline(
+        value["ownedValue"], value["totalValue"], inputs.owned_shares, inputs.share_price, inputs.shares,
+        inputs.growth_rate, inputs.years, inputs.is_family_corp
+    )
+    for array in timeline.values():
+        array.setflags(write=False)
+    return timeline
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cap_table(inputs, holders, future):
+    from valuation.captable import value_cap_table
+
+    value = _future_value(inputs._replace(is_family_corp=False)) if future else _stock_value(_base(inputs))
+    result = value_cap_table(
+        [shares for _, shares in holders], value["finalValue"], value["totalValue"],
+        inputs.shares, inputs.share_price, inputs.is_family_corp
+    )
+    for array in result.values():
+        if hasattr(array, "setflags"):
+            array.setflags(write=False)
+    result["totals"] = MappingProxyType(result["totals"])
+    return result
+
+
+def stock_value(inputs, eval_date=None):
+    """주식가치 평가 결과 (calculate_stock_value와 같은 형식)"""
+    result = dict(_stock_value(_base(inputs)))
+    result["evalDate"] = eval_date
+    return result
+
+
+def tax_details(inputs):
+    """현재 주식가치 기준 세금 (calculate_tax_details와 같은 형식)"""
+    return dict(_tax_details(inputs._replace(growth_rate=0.0, years=0)))
+
+
+def future_stock_value(inputs):
+    """매년 누적 방식 미래 주식가치 (calculate_future_stock_value와 같은 형식)"""
+    return dict(_future_stock_value(inputs._replace(is_family_corp=False)))
+
+
+def future_value(inputs):
+    """복리 성장 미래 가치 (calculate_future_value와 같은 형식)"""
+    return dict(_future_value(inputs._replace(is_family_corp=False)))
+
+
+def future_tax_details(inputs):
+    """복리 성장 미래 가치 기준 세금"""
+    return dict(_future_tax_details(inputs))
+
+
+def scenario_grid(inputs):
+    """
+    성장률(GROWTH_RATE_OPTIONS)×예측기간(FORECAST_YEAR_OPTIONS) 전체의 미래 주식가치와 세금 격자
+    (valuation.batch.scenario_grid 형식, 읽기 전용 배열)
+    """
+    return dict(_scenario_grid(inputs._replace(growth_rate=0.0, years=0)))
+
+
+def scenario(inputs):
+    """
+    inputs의 성장률과 예측 기간에 해당하는 미래 주식가치와 세금.
+    격자에 있는 조합이면 격자에서 꺼내고, 없는 조합이면 매년 누적 방식으로 계산합니다.
+    """
+    from valuation.batch import grid_scenario
+
+    result = grid_scenario(scenario_grid(inputs), inputs.growth_rate, inputs.years)
+    if result is None:
+        result = future_stock_value(inputs)
+    return result
+
+
+def tax_timeline(inputs):
+    """
+    복리 성장 기준 0년부터 inputs.years년까지 연도별 세금
+    (valuation.batch.tax_timeline 형식, 읽기 전용 배열)
+    """
+    return dict(_tax_timeline(inputs))
+
+
+def cap_table(inputs, holders, future=False):
+    """
+    주주별 보유주식 가치와 세금 (valuation.captable.value_cap_table 형식, 읽기 전용 배열과 합계 행)
+
+    Parameters:
+    holders (tuple): valuation.captable.normalize_holders()로 만든 (이름, 주식수) 튜플
+    future (bool): True이면 inputs의 성장률과 예측 기간을 적용한 복리 성장 미래 가치 기준
+    """
+    if not future:
+        inputs = inputs._replace(growth_rate=0.0, years=0)
+    return dict(_cap_table(inputs, tuple(holders), bool(future)))
+
+
+_CACHED_FUNCTIONS = {
+    "stock_value": _stock_value,
+    "tax_details": _tax_details,
+    "future_stock_value": _future_stock_value,
+    "future_value": _future_value,
+    "future_tax_details": _future_tax_details,
+    "scenario_grid": _scenario_grid,
+    "tax_timeline": _tax_timeline,
+    "cap_table": _cap_table,
+}
+
+
+def cache_info():
+    """함수별 캐시 적중/미적중 통계"""
+    return {name: func.cache_info() for name, func in _CACHED_FUNCTIONS.items()}
+
+
+def cache_clear():
+    for func in _CACHED_FUNCTIONS.values():
+        func.cache_clear()
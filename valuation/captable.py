@@ -0,0 +1,249 @@
+"""
+주주명부(cap table) 일괄 평가
+
+주주별 보유 주식수 배열로 보유주식 가치와 세 가지 세금(상속증여세, 양도소득세,
+청산소득세)을 한 번의 배열 연산으로 계산합니다. 주주 한 명씩 대표이사 칸에
+넣어 평가를 반복하는 것과 같은 결과를 냅니다.
+"""
+from valuation.tax import inheritance_tax_array, liquidation_tax_array, transfer_tax_array
+
+# 결과 표 컬럼 (키 -> 화면 표시명)
+CAP_TABLE_COLUMNS = {
+    "name": "주주",
+    "shares": "보유 주식수",
+    "ownership": "지분율(%)",
+    "ownedValue": "보유주식 가치",
+    "inheritanceTax": "상속증여세",
+    "transferTax": "양도소득세(지방소득세 포함)",
+    "liquidationTax": "청산소득세(종합소득세 포함)",
+}
+
+
+def normalize_holders(shareholders):
+    """
+    세션 상태의 주주 목록({"name", "shares"} 딕셔너리)을 (이름, 주식수) 튜플로 정리합니다.
+    보유 주식수가 0 이하인 행은 빼고, 이름이 없으면 '주주 n'으로 채웁니다.
+    튜플이므로 캐시 키로 쓸 수 있습니다.
+    """
+    holders = []
+    for i, holder in enumerate(shareholders or []):
+        try:
+            shares = int(holder.get("shares") or 0)
+        except (TypeError, ValueError):
+            continue
+        if shares > 0:
+            name = str(holder.get("name") or "").strip() or f"주주 {i + 1}"
+            holders.append((name, shares))
+    return tuple(holders)
+
+
+def value_cap_table(holder_shares, final_value, total_value, total_shares, share_price, is_family_corp=False):
+    """
+    주주별 보유주식 가치와 세금을 계산합니다.
+
+    Parameters:
+    holder_shares (array): 주주별 보유 주식수
+    final_value (float): 주당 평가액
+    total_value (float): 회사 총가치
+    total_shares (int): 총 발행주식수
+    share_price (int): 액면금액 (양도소득세 취득가액 계산용)
+    is_family_corp (bool): 가족법인 여부
+
+    Returns:
+    dict: 주주 수 길이의 배열 딕셔너리 (shares, ownership, ownedValue, 세 가지 세액,
+          individualTax)와 회사 단위 법인세 corporateTax, 합계 행 totals
+    """
+    import numpy as np
+    holder_shares = np.asarray(holder_shares, dtype=np.float64)
+    owned_value = holder_shares * final_value
+    corporate_tax, individual_tax, liquidation_tax = liquidation_tax_array(
+        total_value, total_shares, holder_shares, is_family_corp
+    )
+    result = {
+        "shares": holder_shares,
+        "ownership": holder_shares / total_shares * 100,
+        "ownedValue": owned_value,
+        "inheritanceTax": inheritance_tax_array(owned_value),
+        "transferTax": transfer_tax_array(owned_value, holder_shares * share_price),
+        "liquidationTax": liquidation_tax,
+        "individualTax": individual_tax,
+        "corporateTax": float(np.max(corporate_tax)) if len(holder_shares) else 0.0,
+    }
+    result["totals"] = {
+        key: float(result[key].sum())
+        for key in ("shares", "ownership", "ownedValue", "inheritanceTax", "transferTax", "individualTax")
+    }
+    return result
+
+
+def cap_table_rows(holders, result):
+    """
+    value_cap_table() 결과를 표로 보여주기 위한 행 목록 (CAP_TABLE_COLUMNS 표시명 키)
+
+    Parameters:
+    holders (sequence): (이름, 주식수) 튜플 목록
+    """
+    columns = list(CAP_TABLE_COLUMNS.items())[1:]
+    rows = []
+    for i, (name, _) in enumerate(holders):
+        row = {CAP_TABLE_COLUMNS["name"]: name}
+        for key, label in columns:
+            row[label] = round(float(result[key][i]), 2) if key == "ownership" else round(float(result[key][i]))
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# 주주명부 입력 (pandas 필요 - 화면 입력과 파일 업로드용)
+# ---------------------------------------------------------------------------
+
+# 주주명부 입력 컬럼
+HOLDER_NAME_COLUMN = "주주"
+HOLDER_SHARES_COLUMN = "보유 주식수"
+
+# 업로드 파일에서 자주 쓰는 다른 표기
+HOLDER_COLUMN_ALIASES = {
+    "이름": HOLDER_NAME_COLUMN,
+    "주주명": HOLDER_NAME_COLUMN,
+    "성명": HOLDER_NAME_COLUMN,
+    "name": HOLDER_NAME_COLUMN,
+    "주식수": HOLDER_SHARES_COLUMN,
+    "보유주식수": HOLDER_SHARES_COLUMN,
+    "shares": HOLDER_SHARES_COLUMN,
+}
+
+
+class CapTableError(ValueError):
+    """주주명부 파일 형식 오류"""
+
+
+def holders_frame(shareholders):
+    """세션 상태의 주주 목록을 주주명부 편집용 DataFrame으로 만듭니다."""
+    import pandas as pd
+
+    return pd.DataFrame({
+        HOLDER_NAME_COLUMN: [str(holder.get("name") or "") for holder in shareholders or []],
+        HOLDER_SHARES_COLUMN: [holder.get("shares") or 0 for holder in shareholders or []],
+    })
+
+
+def _normalize_holder_columns(df):
+    df = df.rename(columns=lambda c: HOLDER_COLUMN_ALIASES.get(str(c).strip(), str(c).strip()))
+    if HOLDER_NAME_COLUMN not in df.columns or HOLDER_SHARES_COLUMN not in df.columns:
+        # 머리글이 없으면 앞의 두 컬럼을 이름, 주식수로 사용
+        if len(df.columns) < 2:
+            raise CapTableError(f"'{HOLDER_NAME_COLUMN}', '{HOLDER_SHARES_COLUMN}' 두 컬럼이 필요합니다.")
+        header = list(df.columns[:2])
+        df = df.iloc[:, :2]
+        df.columns = [HOLDER_NAME_COLUMN, HOLDER_SHARES_COLUMN]
+        if not any(str(c).startswith("Unnamed") for c in header):
+            # 첫 행이 머리글로 읽힌 경우 데이터로 되돌림
+            import pandas as pd
+            df = pd.concat([pd.DataFrame([header], columns=df.columns), df], ignore_index=True)
+    return df[[HOLDER_NAME_COLUMN, HOLDER_SHARES_COLUMN]]
+
+
+def parse_holders_text(text):
+    """
+    붙여넣은 주주명부 텍스트(한 줄에 '이름, 주식수' 또는 엑셀에서 복사한 탭 구분)를 DataFrame으로 읽습니다.
+    """
+    import io
+    import pandas as pd
+
+    text = (text or "").strip()
+    if not text:
+        return holders_frame([])
+    sep = "\t" if "\t" in text else ","
+    if sep == ",":
+        # '홍길동, 1,000'처럼 숫자에 천 단위 콤마가 있으면 첫 콤마만 구분자로 사용
+        lines = [line.split(",", 1) for line in text.splitlines() if line.strip()]
+        df = pd.DataFrame([line + [""] * (2 - len(line)) for line in lines], dtype=str)
+    else:
+        df = pd.read_csv(io.StringIO(text), sep=sep, header=None, dtype=str, skipinitialspace=True)
+    if len(df.columns) < 2:
+        raise CapTableError("한 줄에 이름과 주식수를 함께 입력하세요.")
+    df = df.iloc[:, :2]
+    df.columns = [HOLDER_NAME_COLUMN, HOLDER_SHARES_COLUMN]
+    # 첫 줄이 머리글이면 제외
+    first = str(df.iloc[0, 0]).strip()
+    if HOLDER_COLUMN_ALIASES.get(first, first) == HOLDER_NAME_COLUMN:
+        df = df.iloc[1:]
+    return df.reset_index(drop=True)
+
+
+def read_holders_file(source, file_name=""):
+    """CSV 또는 XLSX 주주명부 파일을 DataFrame으로 읽습니다."""
+    import pandas as pd
+
+    name = (file_name or str(source)).lower()
+    if name.endswith(".xls"):
+        # 예전 엑셀 형식은 xlrd가 따로 필요하므로 받지 않음
+        raise CapTableError("XLS 파일은 지원하지 않습니다. XLSX 또는 CSV로 저장해 올려 주세요.")
+    if name.endswith(".xlsx"):
+        try:
+            df = pd.read_excel(source, dtype=str)
+        except ImportError as e:
+            raise CapTableError("XLSX 파일을 읽으려면 openpyxl 패키지가 필요합니다.") from e
+    else:
+        df = pd.read_csv(source, dtype=str, skipinitialspace=True)
+    return _normalize_holder_columns(df).reset_index(drop=True)
+
+
+def validate_holders(df, total_shares):
+    """
+    주주명부를 한 번에 검증하고 정리합니다.
+    이름과 주식수가 모두 빈 행은 버리고, 숫자가 아니거나 음수, 소수인 주식수와
+    발행주식수를 넘는 합계를 오류로 알려줍니다.
+
+    Parameters:
+    df (DataFrame): 주주, 보유 주식수 컬럼을 가진 주주명부
+    total_shares (int): 총 발행주식수
+
+    Returns:
+    tuple: (정리된 DataFrame, 오류 메시지 목록, 요약 딕셔너리 {count, shares, ownership})
+    """
+    import numpy as np
+    import pandas as pd
+
+    names = df[HOLDER_NAME_COLUMN].fillna("").astype(str).str.strip()
+    raw_shares = df[HOLDER_SHARES_COLUMN]
+    if raw_shares.dtype == object:
+        raw_shares = raw_shares.astype(str).str.replace(",", "", regex=False).str.strip().replace({"": None, "None": None, "nan": None})
+    shares = pd.to_numeric(raw_shares, errors="coerce")
+
+    empty = (names == "") & shares.isna()
+    names, shares = names[~empty], shares[~empty]
+    row_numbers = np.flatnonzero(~empty.to_numpy()) + 1
+
+    errors = []
+    checks = (
+        (shares.isna().to_numpy(), "주식수가 숫자가 아닙니다"),
+        ((shares < 0).to_numpy(), "주식수가 음수입니다"),
+        ((shares.notna() & (shares % 1 != 0)).to_numpy(), "주식수가 정수가 아닙니다"),
+    )
+    for mask, message in checks:
+        if mask.any():
+            rows = ", ".join(str(n) for n in row_numbers[mask][:10])
+            more = f" 외 {int(mask.sum()) - 10}행" if mask.sum() > 10 else ""
+            errors.append(f"{message}: {rows}행{more}")
+
+    shares = shares.fillna(0).clip(lower=0).astype(np.int64)
+    total = int(shares.sum())
+    if total > total_shares:
+        errors.append(f"주주들의 보유 주식수 합계({total:,}주)가 발행주식수({int(total_shares):,}주)를 초과합니다.")
+
+    clean = pd.DataFrame({HOLDER_NAME_COLUMN: names.to_numpy(), HOLDER_SHARES_COLUMN: shares.to_numpy()})
+    summary = {
+        "count": int((shares > 0).sum()),
+        "shares": total,
+        "ownership": total / total_shares * 100 if total_shares > 0 else 0.0,
+    }
+    return clean, errors, summary
+
+
+def holders_records(df):
+    """정리된 주주명부 DataFrame을 세션 상태의 주주 목록({"name", "shares"} 딕셔너리) 형식으로 바꿉니다."""
+    return [
+        {"name": name, "shares": int(shares)}
+        for name, shares in zip(df[HOLDER_NAME_COLUMN].tolist(), df[HOLDER_SHARES_COLUMN].tolist())
+    ]
@@ -0,0 +1,110 @@
+"""
+포트폴리오 일괄 평가 명령줄 도구
+
+Streamlit 서버 없이 포트폴리오 파일(CSV/XLSX)을 읽어 주식가치, 현시점 세금,
+미래 주식가치와 미래 세금을 계산하고 결과를 CSV로 씁니다. 계산은 평가 페이지의
+포트폴리오 일괄 평가와 같은 valuation.portfolio.value_chunk()를 사용합니다.
+미래 가치는 --future-model로 고른 방식(기본값: 미래 주식가치 페이지의 매년 누적 방식,
+compound는 미래 세금계산 페이지의 복리 성장 방식)으로 계산하고 컬럼 이름에 방식을 표시합니다.
+
+    python -m valuation portfolio.csv -o result.csv --growth-rate 10 --years 10 --workers 4
+"""
+import argparse
+import sys
+import time
+
+from valuation.projection import FUTURE_MODELS
+from valuation.stock import DEFAULT_INTEREST_RATE
+
+# portfolio 모듈의 DEFAULT_CHUNK_SIZE와 같은 값 (--help를 pandas 없이 빠르게 띄우기 위해 따로 둠)
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def build_parser():
+    """명령줄 인자 파서"""
+    parser = argparse.ArgumentParser(
+        prog="python -m valuation",
+        description="포트폴리오 파일의 회사별 주식가치와 세금을 일괄 계산합니다."
+    )
+    parser.add_argument("input", help="포트폴리오 파일 경로 (CSV 또는 XLSX)")
+    parser.add_argument("-o", "--output", default="-", help="결과 CSV 경로 (기본값: 표준 출력)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"한 번에 읽어 평가할 행 수 (기본값: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="묶음을 나눠 계산할 프로세스 수 (기본값: 1, 현재 프로세스에서 계산, 0이면 CPU 코어 수)")
+    parser.add_argument("--interest-rate", type=float, default=DEFAULT_INTEREST_RATE,
+                        help=f"손익가치 환원율 (%%, 기본값: {DEFAULT_INTEREST_RATE})")
+    parser.add_argument("--growth-rate", type=float, default=10, help="미래 예측 연간 성장률 (%%, 기본값: 10)")
+    parser.add_argument("--years", type=int, default=10, help="미래 예측 기간 (년, 기본값: 10, 0이면 생략)")
+    parser.add_argument("--future-model", choices=tuple(FUTURE_MODELS), default="accumulation",
+                        help="미래 가치 계산 방식: accumulation은 매년 순이익을 자본총계에 쌓아 다시 평가(미래 주식가치 페이지), "
+                             "compound는 현재 평가액에 복리 성장률을 곱함(미래 세금계산 페이지). "
+                             "미래 컬럼 이름에 방식이 표시됩니다 (기본값: accumulation)")
+    parser.add_argument("--family-corp", action="store_true", help="청산소득세에 가족법인 세율 적용")
+    parser.add_argument("--no-tax", action="store_true", help="세금 컬럼을 계산하지 않음")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 상황을 표시하지 않음")
+    return parser
+
+
+def run(args, stderr=sys.stderr):
+    """
+    파싱한 인자로 일괄 평가를 실행합니다.
+
+    Returns:
+    dict: rows(처리 행 수), errors(오류 행 수), seconds(소요 시간)
+    """
+    from valuation.parallel import value_portfolio
+    from valuation.portfolio import read_portfolio, write_csv_chunks
+
+    if args.chunk_size < 1:
+        raise ValueError("--chunk-size는 1 이상이어야 합니다.")
+    if args.years < 0:
+        raise ValueError("--years는 0 이상이어야 합니다.")
+
+    summary = {"rows": 0, "errors": 0}
+
+    def counted(chunks):
+        for chunk in chunks:
+            summary["errors"] += int((chunk["오류"] != "").sum())
+            yield chunk
+
+    started = time.perf_counter()
+    chunks = value_portfolio(
+        read_portfolio(args.input, chunk_size=args.chunk_size),
+        workers=args.workers,
+        interest_rate=args.interest_rate,
+        taxes=not args.no_tax,
+        growth_rate=args.growth_rate,
+        years=args.years,
+        is_family_corp=args.family_corp,
+        future_model=args.future_model
+    )
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for rows in write_csv_chunks(counted(chunks), output):
+            summary["rows"] = rows
+            if not args.quiet:
+                print(f"\r{rows:,}행 처리", end="", file=stderr, flush=True)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    summary["seconds"] = time.perf_counter() - started
+
+    if not args.quiet:
+        rate = summary["rows"] / summary["seconds"] if summary["seconds"] > 0 else 0
+        print(f"\r{summary['rows']:,}행 처리 완료 (오류 {summary['errors']:,}행, "
+              f"{summary['seconds']:.2f}초, 초당 {rate:,.0f}행)", file=stderr)
+    return summary
+
+
+def main(argv=None):
+    """명령줄 진입점. 성공하면 0, 입력 오류이면 2를 돌려줍니다."""
+    args = build_parser().parse_args(argv)
+    from valuation.portfolio import PortfolioError
+
+    try:
+        run(args)
+    except (PortfolioError, ValueError, OSError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    return 0
@@ -0,0 +1,106 @@
+"""
+숫자 표시 형식
+
+모든 페이지와 보고서가 함께 쓰는 천 단위 콤마 형식입니다. "{:,}" 형식은 로케일과
+무관하므로 로케일을 설정할 필요가 없습니다. 정수는 미리 만들어 둔 형식 함수로 바로
+문자열을 만들고, 표의 컬럼은 format_column()으로 컬럼 전체를 한 번에 형식화합니다.
+"""
+
+# 미리 만들어 둔 천 단위 콤마 형식 함수
+_format_int = "{:,}".format
+
+# 표시 단위 -> 원 단위 크기
+UNITS = {
+    "원": 1,
+    "천원": 1_000,
+    "만원": 10_000,
+    "백만원": 1_000_000,
+    "억원": 100_000_000,
+}
+
+# 이 범위 밖의 실수는 int64로 바꿀 수 없어 1건씩 형식화
+_INT64_LIMIT = 2.0 ** 63
+
+
+def format_number(num):
+    """천 단위 콤마 정수 문자열 (소수점 이하 버림, 숫자가 아니면 그대로 문자열로)"""
+    if type(num) is int:
+        return _format_int(num)
+    try:
+        return _format_int(int(num))
+    except (TypeError, ValueError, OverflowError):
+        return str(num)
+
+
+def to_unit(num, unit="원"):
+    """
+    원 단위 금액을 unit 단위 정수로 바꿉니다 (내림).
+
+    Parameters:
+    num (float): 원 단위 금액
+    unit (str): UNITS의 단위
+
+    Returns:
+    int: unit 단위 금액
+    """
+    return int(num) // UNITS[unit]
+
+
+def format_unit(num, unit="원", decimals=0):
+    """
+    원 단위 금액을 unit 단위로 형식화합니다.
+
+    Parameters:
+    num (float): 원 단위 금액
+    unit (str): UNITS의 단위 (천원, 억원 등)
+    decimals (int): 소수점 자릿수. 0이면 내림한 정수 (예: 1,234,567,890원 -> "1,234,567천원",
+        억원에 decimals=1이면 "12.3억원")
+
+    Returns:
+    str: 단위를 붙인 문자열 (숫자가 아니면 그대로 문자열로)
+    """
+    try:
+        if decimals:
+            return f"{num / UNITS[unit]:,.{decimals}f}{unit}"
+        return _format_int(to_unit(num, unit)) + unit
+    except (TypeError, ValueError, OverflowError):
+        return str(num)
+
+
+def format_column(values):
+    """
+    숫자 컬럼 전체를 천 단위 콤마 문자열 목록으로 한 번에 형식화합니다.
+    format_number()를 값마다 호출하는 것과 같은 결과이며, 정수와 유한한 실수는
+    int64 배열로 한 번에 바꾼 뒤 형식화합니다 (NumPy 필요).
+
+    Parameters:
+    values (Series, ndarray, list): 숫자 값
+
+    Returns:
+    list: 형식화한 문자열 목록
+    """
+    import numpy as np
+
+    array = np.asarray(values)
+    if array.dtype.kind in "iu":
+        return list(map(_format_int, array.tolist()))
+    if array.dtype.kind != "f":
+        return [format_number(value) for value in array.tolist()]
+    # 실수: int64로 바꿀 수 있는 값은 한 번에 버림, 나머지(NaN, inf, 아주 큰 값)만 1건씩
+    convertible = np.isfinite(array) & (np.abs(array) < _INT64_LIMIT)
+    if convertible.all():
+        return list(map(_format_int, array.astype(np.int64).tolist()))
+    formatted = [format_number(value) for value in array.tolist()]
+    for i, value in zip(np.flatnonzero(convertible).tolist(), array[convertible].astype(np.int64).tolist()):
+        formatted[i] = _format_int(value)
+    return formatted
+
+
+def format_columns(df, columns):
+    """df의 columns 컬럼을 format_column()으로 형식화한 복사본"""
+    return df.assign(**{column: format_column(df[column]) for column in columns})
+
+
+def format_frame(df):
+    """df의 모든 숫자 컬럼을 형식화한 복사본 (문자열 컬럼은 그대로)"""
+    return format_columns(df, [column for column in df.columns if df[column].dtype.kind in "iuf"])
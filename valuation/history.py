@@ -0,0 +1,185 @@
+"""
+평가 이력 저장소 (SQLite)
+
+평가할 때마다 입력값, 평가 결과, 평가 기준일, 회사명, 평가방법을 로컬 SQLite 파일에
+한 행으로 남깁니다. 회사명과 평가 기준일에 인덱스가 있어 특정 회사의 최근 몇 년간
+평가 이력을 한 번의 인덱스 조회로 불러올 수 있습니다.
+"""
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+from functools import lru_cache
+
+# 이력 DB 기본 경로 (VALUATION_HISTORY_DB 환경 변수로 변경)
+DEFAULT_DB_PATH = os.environ.get("VALUATION_HISTORY_DB", "valuation_history.db")
+
+DEFAULT_PAGE_SIZE = 20
+
+# 이력에 저장하는 평가 입력 항목 (평가 페이지 세션 상태 키)
+HISTORY_INPUT_KEYS = ("company_name", "eval_date", "total_equity", "net_income1", "net_income2", "net_income3",
+                      "shares", "owned_shares", "share_price", "interest_rate", "evaluation_method", "shareholders")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS valuations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT NOT NULL,
+    eval_date TEXT NOT NULL,
+    evaluation_method TEXT NOT NULL,
+    final_value REAL,
+    total_value REAL,
+    owned_value REAL,
+    inputs TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_valuations_company_date ON valuations (company_name, eval_date);
+CREATE INDEX IF NOT EXISTS idx_valuations_eval_date ON valuations (eval_date);
+"""
+
+# 목록 조회에서 돌려주는 요약 컬럼 (입력값/결과 JSON은 get()으로 조회)
+SUMMARY_COLUMNS = ("id", "company_name", "eval_date", "evaluation_method", "final_value", "total_value",
+                   "owned_value", "created_at")
+
+
+def _iso_date(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return date.fromisoformat(str(value)[:10]).isoformat()
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"JSON으로 저장할 수 없는 값입니다: {type(value).__name__}")
+
+
+def years_before(day, years):
+    """day로부터 years년 전 날짜"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 2월 29일
+        return day.replace(year=day.year - years, day=28)
+
+
+class HistoryStore:
+    """
+    평가 이력 저장소
+
+    Parameters:
+    path (str): SQLite 파일 경로 (":memory:"는 지원하지 않음 - 호출마다 연결을 새로 엶)
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # 연결을 호출마다 열어 Streamlit 세션 스레드 간에 공유하지 않음
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def save(self, company_name, eval_date, evaluation_method, inputs, outputs):
+        """
+        평가 1건을 저장하고 이력 ID를 돌려줍니다.
+
+        Parameters:
+        inputs (dict): 평가 입력값 (세션 상태의 입력 항목)
+        outputs (dict): 평가 결과 (calculate_stock_value 형식)
+        """
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO valuations (company_name, eval_date, evaluation_method, final_value, total_value,"
+                " owned_value, inputs, outputs, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(company_name or "").strip(),
+                    _iso_date(eval_date) or date.today().isoformat(),
+                    evaluation_method,
+                    outputs.get("finalValue"),
+                    outputs.get("totalValue"),
+                    outputs.get("ownedValue"),
+                    json.dumps(inputs, ensure_ascii=False, default=_json_default),
+                    json.dumps(outputs, ensure_ascii=False, default=_json_default),
+                    datetime.now().isoformat(timespec="seconds"),
+                )
+            )
+            return cursor.lastrowid
+
+    @staticmethod
+    def _where(company_name=None, since=None, until=None):
+        clauses, params = [], []
+        if company_name:
+            clauses.append("company_name = ?")
+            params.append(company_name)
+        if since:
+            clauses.append("eval_date >= ?")
+            params.append(_iso_date(since))
+        if until:
+            clauses.append("eval_date <= ?")
+            params.append(_iso_date(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, company_name=None, since=None, until=None, limit=DEFAULT_PAGE_SIZE, offset=0):
+        """
+        조건에 맞는 이력을 평가 기준일 최신순으로 limit건씩 조회합니다.
+
+        Parameters:
+        company_name (str): 회사명 (없으면 전체)
+        since, until (date or str): 평가 기준일 범위 (포함)
+
+        Returns:
+        list: SUMMARY_COLUMNS 키를 가진 딕셔너리 목록
+        """
+        where, params = self._where(company_name, since, until)
+        sql = (f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM valuations{where}"
+               " ORDER BY eval_date DESC, id DESC LIMIT ? OFFSET ?")
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, [*params, int(limit), int(offset)])]
+
+    def count(self, company_name=None, since=None, until=None):
+        """조건에 맞는 이력 수"""
+        where, params = self._where(company_name, since, until)
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM valuations{where}", params).fetchone()[0]
+
+    def company_history(self, company_name, years=5, today=None):
+        """회사의 최근 years년간 평가 이력 (평가 기준일 최신순, 회사명+기준일 인덱스 조회 한 번)"""
+        since = years_before(today or date.today(), years)
+        return self.query(company_name, since=since, limit=-1)
+
+    def companies(self):
+        """이력이 있는 회사명 목록 (가나다순)"""
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT company_name FROM valuations ORDER BY company_name")]
+
+    def get(self, record_id):
+        """이력 1건 (inputs, outputs는 딕셔너리로 변환, 없으면 None)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM valuations WHERE id = ?", (int(record_id),)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["inputs"] = json.loads(record["inputs"])
+        record["outputs"] = json.loads(record["outputs"])
+        return record
+
+    def delete(self, record_id):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM valuations WHERE id = ?", (int(record_id),))
+
+
+@lru_cache(maxsize=None)
+def get_history_store():
+    """서버 프로세스 전체가 공유하는 평가 이력 저장소 (평가 페이지와 이력 페이지가 함께 사용)"""
+    return HistoryStore()
@@ -0,0 +1,79 @@
+"""
+Streamlit 페이지용 백그라운드 작업 표시
+
+작업 ID를 주소창의 쿼리 파라미터(st.query_params)에 보관하므로 브라우저를 새로 고쳐도
+같은 작업의 진행률과 결과를 다시 보여주고, 계산을 반복하지 않습니다.
+실행 중인 작업이 있으면 페이지 끝에서 poll_jobs()가 잠시 기다린 뒤 다시 실행해
+진행률을 갱신합니다. 그동안에도 다른 입력은 그대로 사용할 수 있습니다.
+"""
+import time
+
+import streamlit as st
+
+from valuation.jobs import ACTIVE_STATUSES, CANCELLED, DONE, FAILED, STATUS_LABELS, JobManager
+
+# 진행률 갱신 간격 (초)
+POLL_INTERVAL = 1.0
+
+
+@st.cache_resource
+def get_manager():
+    """서버 프로세스 전체가 공유하는 작업 관리자"""
+    return JobManager()
+
+
+def submit_job(param_key, kind, params):
+    """작업을 제출하고 작업 ID를 쿼리 파라미터 param_key에 기록합니다."""
+    job_id = get_manager().submit(kind, params)
+    st.query_params[param_key] = job_id
+    return job_id
+
+
+def _clear(param_key):
+    if param_key in st.query_params:
+        del st.query_params[param_key]
+
+
+def job_panel(param_key, label="작업"):
+    """
+    쿼리 파라미터 param_key의 작업 상태를 표시합니다.
+    실행 중이면 진행률과 취소 버튼을, 실패나 취소면 안내와 닫기 버튼을 보여줍니다.
+
+    Returns:
+    완료된 작업의 결과 (완료 전이거나 작업이 없으면 None)
+    """
+    job_id = st.query_params.get(param_key)
+    if not job_id:
+        return None
+    manager = get_manager()
+    job = manager.status(job_id)
+    if job is None:
+        _clear(param_key)
+        return None
+
+    status = job["status"]
+    if status in ACTIVE_STATUSES:
+        text = f"{label} {STATUS_LABELS[status]}" + (f" - {job['message']}" if job["message"] else "")
+        st.progress(job["progress"], text=text)
+        st.button("작업 취소", key=f"{param_key}_cancel", on_click=manager.cancel, args=(job_id,))
+        st.session_state._jobs_polling = True
+        return None
+    if status == DONE:
+        return manager.result(job_id)
+
+    if status == FAILED:
+        st.error(f"{label} 실패: {job['error']}")
+    elif status == CANCELLED:
+        st.info(f"{label}이(가) 취소되었습니다.")
+    st.button("닫기", key=f"{param_key}_dismiss", on_click=_clear, args=(param_key,))
+    return None
+
+
+def poll_jobs(interval=POLL_INTERVAL):
+    """
+    이번 실행에서 job_panel()이 실행 중인 작업을 표시했으면 interval초 뒤 페이지를 다시 실행합니다.
+    페이지 스크립트의 마지막에 호출하세요.
+    """
+    if st.session_state.pop("_jobs_polling", False):
+        time.sleep(interval)
+        st.rerun()
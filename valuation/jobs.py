@@ -0,0 +1,388 @@
+"""
+백그라운드 작업 큐
+
+몬테카를로 시뮬레이션, 포트폴리오 일괄 평가처럼 오래 걸리는 계산을 작업 프로세스에서
+실행합니다. 작업 상태, 진행률, 결과는 작업별 디렉터리에 파일로 저장하므로 화면을
+새로 고치거나 다른 세션에서 조회해도 같은 작업을 이어서 확인할 수 있습니다.
+같은 종류와 같은 입력의 작업을 다시 제출하면 새로 계산하지 않고 기존 작업 ID를 돌려줍니다.
+
+    manager = JobManager()
+    job_id = manager.submit("simulation", params)
+    manager.status(job_id)   # {"status": "running", "progress": 0.4, ...}
+    manager.cancel(job_id)
+    manager.result(job_id)
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+
+# 작업 저장소 기본 경로 (VALUATION_JOB_DIR 환경 변수로 변경)
+DEFAULT_JOB_DIR = os.environ.get("VALUATION_JOB_DIR", ".valuation_jobs")
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+STATUS_LABELS = {
+    QUEUED: "대기 중",
+    RUNNING: "실행 중",
+    DONE: "완료",
+    FAILED: "실패",
+    CANCELLED: "취소됨",
+}
+
+# 진행률 파일을 다시 쓰는 최소 간격 (초)
+PROGRESS_INTERVAL = 0.2
+
+# 오래된 작업 자동 삭제 기준 (일)
+DEFAULT_RETENTION_DAYS = 7
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청으로 계산을 중단할 때 발생"""
+
+
+def job_key(kind, params):
+    """작업 종류와 입력값으로 만든 중복 제출 판별 키"""
+    data = json.dumps([kind, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class JobStore:
+    """
+    디스크 작업 저장소
+
+    <root>/<작업 ID>/ 디렉터리에 상태(job.json), 결과(result.pickle), 취소 요청 표시(cancel)와
+    작업이 만든 파일을 둡니다. 상태 파일은 임시 파일에 쓴 뒤 교체하므로 읽는 쪽이
+    쓰다 만 파일을 보지 않습니다.
+    """
+
+    def __init__(self, root=DEFAULT_JOB_DIR):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, job_id, name=""):
+        """작업 디렉터리 (name을 주면 그 안의 파일 경로)"""
+        if not job_id or os.sep in job_id or job_id.startswith("."):
+            raise ValueError(f"잘못된 작업 ID입니다: {job_id}")
+        return os.path.join(self.root, job_id, name)
+
+    def _write_json(self, path, data):
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp, path)
+
+    def create(self, kind, params, key, owner=None):
+        """작업을 대기 상태로 등록하고 작업 ID를 돌려줍니다."""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.path(job_id))
+        now = time.time()
+        self._write_json(self.path(job_id, "job.json"), {
+            "id": job_id,
+            "kind": kind,
+            "params": params,
+            "key": key,
+            "owner": owner or os.getpid(),
+            "status": QUEUED,
+            "progress": 0.0,
+            "message": "",
+            "error": "",
+            "created": now,
+            "updated": now,
+        })
+        return job_id
+
+    def load(self, job_id):
+        """작업 상태 딕셔너리 (없으면 None)"""
+        try:
+            with open(self.path(job_id, "job.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def update(self, job_id, **changes):
+        job = self.load(job_id)
+        if job is None:
+            return None
+        job.update(changes, updated=time.time())
+        self._write_json(self.path(job_id, "job.json"), job)
+        return job
+
+    def jobs(self):
+        """저장된 작업 목록 (최근 작업 먼저)"""
+        jobs = []
+        for job_id in os.listdir(self.root):
+            job = self.load(job_id) if os.path.isdir(os.path.join(self.root, job_id)) else None
+            if job is not None:
+                jobs.append(job)
+        return sorted(jobs, key=lambda job: job["created"], reverse=True)
+
+    def find(self, key):
+        """같은 키로 제출된 작업 중 실패나 취소되지 않은 가장 최근 작업"""
+        for job in self.jobs():
+            if job["key"] == key and job["status"] not in (FAILED, CANCELLED):
+                return job
+        return None
+
+    def save_result(self, job_id, result):
+        temp = self.path(job_id, f"result.pickle.{os.getpid()}.tmp")
+        with open(temp, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.path(job_id, "result.pickle"))
+
+    def load_result(self, job_id):
+        with open(self.path(job_id, "result.pickle"), "rb") as f:
+            return pickle.load(f)
+
+    def request_cancel(self, job_id):
+        with open(self.path(job_id, "cancel"), "w"):
+            pass
+
+    def cancel_requested(self, job_id):
+        return os.path.exists(self.path(job_id, "cancel"))
+
+    def save_file(self, data, suffix=""):
+        """
+        작업 입력 파일을 내용 해시 이름으로 저장하고 경로를 돌려줍니다.
+        같은 파일을 다시 올리면 같은 경로가 되므로 중복 제출 판별 키도 같아집니다.
+        """
+        directory = os.path.join(self.root, "uploads")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, hashlib.sha1(data).hexdigest() + suffix)
+        if not os.path.exists(path):
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+        return path
+
+    def delete(self, job_id):
+        shutil.rmtree(self.path(job_id), ignore_errors=True)
+
+    def purge(self, retention_days=DEFAULT_RETENTION_DAYS):
+        """retention_days보다 오래된 끝난 작업을 지웁니다."""
+        limit = time.time() - retention_days * 86400
+        for job in self.jobs():
+            if job["status"] not in ACTIVE_STATUSES and job["updated"] < limit:
+                self.delete(job["id"])
+
+
+class Progress:
+    """
+    작업 함수에 넘기는 진행률 보고 함수 (progress(처리량, 전체량, 메시지))
+    호출될 때마다 취소 요청을 확인하고, 요청이 있으면 JobCancelled를 일으킵니다.
+    """
+    __slots__ = ("store", "job_id", "_last")
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+        self._last = 0.0
+
+    def __call__(self, done, total=None, message=""):
+        if self.store.cancel_requested(self.job_id):
+            raise JobCancelled()
+        now = time.monotonic()
+        if now - self._last >= PROGRESS_INTERVAL or (total and done >= total):
+            fraction = min(done / total, 1.0) if total else 0.0
+            self.store.update(self.job_id, progress=fraction, message=message)
+            self._last = now
+
+
+# 작업 종류 -> 작업 함수 (params, progress, workdir) -> 결과
+JOB_KINDS = {}
+
+
+def job_kind(name):
+    """작업 함수를 JOB_KINDS에 등록하는 데코레이터"""
+    def register(func):
+        JOB_KINDS[name] = func
+        return func
+    return register
+
+
+def run_job(root, job_id):
+    """작업 프로세스에서 작업 하나를 실행하고 결과와 상태를 저장소에 기록합니다."""
+    store = JobStore(root)
+    job = store.load(job_id)
+    if job is None or job["status"] != QUEUED:
+        return
+    if store.cancel_requested(job_id):
+        store.update(job_id, status=CANCELLED)
+        return
+    store.update(job_id, status=RUNNING, worker=os.getpid(), started=time.time())
+    try:
+        result = JOB_KINDS[job["kind"]](job["params"], Progress(store, job_id), store.path(job_id))
+        store.save_result(job_id, result)
+        store.update(job_id, status=DONE, progress=1.0, finished=time.time())
+    except JobCancelled:
+        store.update(job_id, status=CANCELLED, finished=time.time())
+    except Exception as e:
+        store.update(job_id, status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+
+
+class JobManager:
+    """
+    작업 제출, 조회, 취소, 결과 확인
+
+    Parameters:
+    root (str): 작업 저장소 경로
+    workers (int): 동시에 실행할 작업 수 (기본값: CPU 코어 수 - 1, 최소 1)
+    processes (bool): True이면 별도 프로세스에서, False이면 스레드에서 실행
+    """
+
+    def __init__(self, root=DEFAULT_JOB_DIR, workers=None, processes=True):
+        self.store = JobStore(root)
+        self.workers = workers or max((os.cpu_count() or 2) - 1, 1)
+        if processes:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # 웹 서버의 스레드 상태를 복제하지 않도록 새 인터프리터로 시작
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(self.workers)
+        self.futures = {}
+        self._recover()
+        self.store.purge()
+
+    def _recover(self):
+        # 이전 서버 프로세스가 맡았다가 끝내지 못한 작업은 실패로 정리
+        for job in self.store.jobs():
+            if job["status"] in ACTIVE_STATUSES and job["owner"] != os.getpid() and not _pid_alive(job["owner"]):
+                self.store.update(job["id"], status=FAILED, error="서버가 다시 시작되어 작업이 중단되었습니다.")
+
+    def submit(self, kind, params, dedupe=True):
+        """
+        작업을 제출하고 작업 ID를 돌려줍니다.
+        dedupe=True이면 같은 종류, 같은 입력의 진행 중이거나 끝난 작업이 있을 때 그 ID를 돌려줍니다.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"알 수 없는 작업 종류입니다: {kind}")
+        key = job_key(kind, params)
+        if dedupe:
+            existing = self.store.find(key)
+            if existing is not None:
+                return existing["id"]
+        job_id = self.store.create(kind, params, key)
+        self.futures[job_id] = self.executor.submit(run_job, self.store.root, job_id)
+        return job_id
+
+    def status(self, job_id):
+        """작업 상태 딕셔너리 (없는 작업이면 None)"""
+        try:
+            job = self.store.load(job_id)
+        except ValueError:
+            return None
+        future = self.futures.get(job_id)
+        if job is not None and job["status"] in ACTIVE_STATUSES and future is not None and future.done():
+            # 작업 프로세스가 상태를 기록하지 못하고 끝난 경우
+            error = future.exception()
+            if error is not None:
+                job = self.store.update(job_id, status=FAILED, error=f"{type(error).__name__}: {error}")
+        return job
+
+    def cancel(self, job_id):
+        """작업 취소를 요청합니다. 대기 중이면 바로, 실행 중이면 다음 진행률 보고 때 멈춥니다."""
+        job = self.status(job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return False
+        self.store.request_cancel(job_id)
+        future = self.futures.get(job_id)
+        if future is not None and future.cancel():
+            self.store.update(job_id, status=CANCELLED)
+        return True
+
+    def result(self, job_id):
+        """끝난 작업의 결과 (완료되지 않았으면 None)"""
+        job = self.status(job_id)
+        if job is None or job["status"] != DONE:
+            return None
+        return self.store.load_result(job_id)
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# 작업 종류
+# ---------------------------------------------------------------------------
+
+@job_kind("simulation")
+def simulation_job(params, progress, workdir):
+    """
+    몬테카를로 시뮬레이션 (valuation.parallel.simulate). 같은 seed이면 workers 수와 관계없이
+    montecarlo.simulate()와 같은 결과입니다. 작업 자체가 이미 JobManager의 작업 프로세스에서
+    실행되므로 기본값은 현재 프로세스에서 계산(workers=1)하고, 프로세스를 더 띄우지 않습니다.
+
+    params: inputs(ValuationInput 필드 딕셔너리), growth_spread, distribution, paths, seed,
+        workers(경로 묶음을 나눠 계산할 프로세스 수, 기본값 1)
+    """
+    from valuation import cache
+    from valuation.parallel import simulate
+
+    inputs = cache.normalize_input(**params["inputs"])
+    return simulate(
+        inputs.total_equity, cache.stock_value(inputs)["weightedIncome"], inputs.shares, inputs.owned_shares,
+        inputs.share_price, inputs.evaluation_method, inputs.years, inputs.growth_rate, params["growth_spread"],
+        params.get("distribution", "normal"), params["paths"], interest_rate=inputs.interest_rate,
+        is_family_corp=inputs.is_family_corp, seed=params.get("seed", 0), workers=params.get("workers", 1),
+        on_chunk=lambda done, total: progress(done, total, f"{done:,}/{total:,}회")
+    )
+
+
+@job_kind("portfolio")
+def portfolio_job(params, progress, workdir):
+    """
+    포트폴리오 일괄 평가. 결과 CSV는 작업 디렉터리의 result.csv에 씁니다.
+
+    params: source(입력 파일 경로), file_name, chunk_size, interest_rate와 value_chunk()의 선택 항목
+    Returns: rows, errors, path, file_name
+    """
+    from valuation.portfolio import DEFAULT_CHUNK_SIZE, iter_valued_chunks, write_csv_chunks
+    from valuation.stock import DEFAULT_INTEREST_RATE
+
+    source = params["source"]
+    file_name = params.get("file_name") or source
+    options = {key: params[key] for key in ("taxes", "growth_rate", "years", "is_family_corp", "future_model")
+               if key in params}
+    total_rows = None
+    if not file_name.lower().endswith(".xlsx"):
+        # 진행률 표시용 전체 행 수 (CSV 줄 수)
+        with open(source, "rb") as f:
+            total_rows = max(sum(1 for _ in f) - 1, 1)
+
+    errors = 0
+
+    def counted(chunks):
+        nonlocal errors
+        for chunk in chunks:
+            errors += int((chunk["오류"] != "").sum())
+            yield chunk
+
+    path = os.path.join(workdir, "result.csv")
+    rows = 0
+    chunks = iter_valued_chunks(source, file_name, int(params.get("chunk_size") or DEFAULT_CHUNK_SIZE),
+                                params.get("interest_rate", DEFAULT_INTEREST_RATE), **options)
+    with open(path, "wb") as output:
+        for rows in write_csv_chunks(counted(chunks), output):
+            progress(rows, total_rows, f"{rows:,}개 회사 평가 완료")
+    return {"rows": rows, "errors": errors, "path": path, "file_name": params.get("file_name", "")}
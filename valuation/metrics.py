@@ -0,0 +1,208 @@
+"""
+운영 지표 (Prometheus 텍스트 형식)
+
+페이지가 다시 실행될 때마다 valuation.timing의 실행 기록을 observe_rerun()으로 넘기면
+실행 시간 히스토그램, 보고서 생성 시간 히스토그램, 단계별 누적 시간을 모읍니다. 계산 결과
+캐시 적중/미적중 수와 최근 활성 세션 수는 수집할 때 읽습니다.
+
+VALUATION_METRICS_PORT 환경 변수를 주면 Streamlit 서버 프로세스 안에서 백그라운드 스레드로
+GET /metrics를 제공합니다 (바인딩 주소는 VALUATION_METRICS_HOST, 기본값 127.0.0.1).
+
+    VALUATION_METRICS_PORT=9464 streamlit run app.py
+    curl -s localhost:9464/metrics
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from valuation import cache
+from valuation.timing import PAGE_TIMINGS
+
+# 실행 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 이 시간(초) 안에 실행된 세션을 활성 세션으로 셈
+ACTIVE_SESSION_WINDOW = 300
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """구간별 누적 개수, 합계, 개수를 라벨 조합마다 보관하는 히스토그램"""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            counts, total = self._values.get(labels) or ([0] * (len(self.buckets) + 1), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._values[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, (counts, total) in values:
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                lines.append(f"{self.name}_bucket{_labels(self.labels, labels, [('le', _number(bound))])} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {counts[-1]}")
+        return lines
+
+
+class Counter:
+    """라벨 조합별로 증가만 하는 값"""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labels, labels)} {_number(value)}" for labels, value in values)
+        return lines
+
+
+def _gauge(name, help, samples, labels=(), kind="gauge"):
+    """수집 시점에 계산한 (라벨 값 튜플, 값) 목록을 지표 텍스트로"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels, values)} {_number(value)}" for values, value in samples if value is not None)
+    return lines
+
+
+RERUN_SECONDS = Histogram("valuation_rerun_seconds", "끝까지 실행된 페이지 1회 실행 시간 (초)", ("page",))
+REPORT_SECONDS = Histogram("valuation_report_seconds", "보고서(HTML/CSV) 생성 시간 (초)", ("page",))
+PHASE_SECONDS = Counter("valuation_rerun_phase_seconds_total", "단계별 누적 실행 시간 (초)", ("page", "phase"))
+INTERRUPTED = Counter("valuation_reruns_interrupted_total", "st.stop(), st.rerun() 등으로 중간에 끝난 실행 수", ("page",))
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def observe_rerun(record):
+    """valuation.timing 실행 기록 1건을 지표에 반영합니다."""
+    page = record["page"]
+    for phase, seconds in record["phases"].items():
+        PHASE_SECONDS.inc(seconds, page, phase)
+    if record.get("interrupted"):
+        # 중간에 끝난 실행은 실행 시간 히스토그램에 넣지 않고 수만 셈
+        INTERRUPTED.inc(1, page)
+    else:
+        RERUN_SECONDS.observe(record["total"], page)
+        if "reports" in record["phases"]:
+            REPORT_SECONDS.observe(record["phases"]["reports"], page)
+    if record.get("session"):
+        with _sessions_lock:
+            _sessions[record["session"]] = time.monotonic()
+
+
+def active_sessions(window=ACTIVE_SESSION_WINDOW):
+    """최근 window초 안에 페이지를 실행한 세션 수 (오래된 세션은 정리)"""
+    cutoff = time.monotonic() - window
+    with _sessions_lock:
+        for session in [session for session, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session]
+        return len(_sessions)
+
+
+def render():
+    """모든 지표를 Prometheus 텍스트 형식으로"""
+    lines = []
+    for metric in (RERUN_SECONDS, REPORT_SECONDS, PHASE_SECONDS, INTERRUPTED):
+        lines.extend(metric.render())
+
+    summary = PAGE_TIMINGS.summary()
+    lines.extend(_gauge("valuation_rerun_p95_seconds", "페이지별 최근 실행 시간의 95분위수 (초)",
+                        [((page,), stats["p95"]) for page, stats in summary.items()], ("page",)))
+    lines.extend(_gauge("valuation_active_sessions", f"최근 {ACTIVE_SESSION_WINDOW}초 안에 실행된 세션 수",
+                        [((), active_sessions())]))
+
+    info = cache.cache_info()
+    lines.extend(_gauge("valuation_cache_hits_total", "계산 결과 캐시 적중 수",
+                        [((name,), stats.hits) for name, stats in info.items()], ("function",), "counter"))
+    lines.extend(_gauge("valuation_cache_misses_total", "계산 결과 캐시 미적중 수",
+                        [((name,), stats.misses) for name, stats in info.items()], ("function",), "counter"))
+    lines.extend(_gauge("valuation_cache_hit_ratio", "계산 결과 캐시 적중률 (조회가 없으면 생략)",
+                        [((name,), stats.hits / (stats.hits + stats.misses) if stats.hits + stats.misses else None)
+                         for name, stats in info.items()], ("function",)))
+    lines.extend(_gauge("valuation_cache_entries", "계산 결과 캐시 항목 수",
+                        [((name,), stats.currsize) for name, stats in info.items()], ("function",)))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics 요청 처리기"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(host="127.0.0.1", port=9464):
+    """지표 HTTP 서버를 데몬 스레드로 시작합니다. 이미 실행 중이면 그 서버를 돌려줍니다."""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            server = ThreadingHTTPServer((host, port), MetricsHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="valuation-metrics", daemon=True).start()
+            _exporter = server
+        return _exporter
+
+
+def exporter_from_env():
+    """VALUATION_METRICS_PORT가 있으면 지표 서버를 시작합니다 (없으면 None)."""
+    port = os.environ.get("VALUATION_METRICS_PORT")
+    if not port:
+        return None
+    return start_exporter(os.environ.get("VALUATION_METRICS_HOST", "127.0.0.1"), int(port))
@@ -0,0 +1,304 @@
+"""
+몬테카를로 성장 시뮬레이션
+
+매년 성장률을 확률분포에서 뽑은 (경로 수, 예측 기간) 배열로 미래 주식가치와 세금의
+분포를 계산합니다. 경로는 chunk_size개씩 만들어 평가한 뒤 버리고, 분위수는
+QuantileSketch로 누적하므로 경로 수와 관계없이 메모리 사용량이 일정합니다.
+"""
+from functools import partial
+
+import numpy as np
+
+from valuation.batch import method_codes, per_share_values
+from valuation.stock import DEFAULT_INTEREST_RATE
+from valuation.tax import inheritance_tax_array, liquidation_tax_array, transfer_tax_array
+
+# 성장률 분포 (이름 -> 화면 표시명)
+DISTRIBUTIONS = {
+    "normal": "정규분포",
+    "uniform": "균등분포",
+}
+DISTRIBUTION_NAMES = {label: name for name, label in DISTRIBUTIONS.items()}
+
+DEFAULT_PATHS = 10000
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+# 분위수를 집계하는 항목
+SIMULATION_METRICS = ("finalValue", "totalValue", "ownedValue", "inheritanceTax", "transferTax", "liquidationTax")
+
+# 항목별 화면 표시명
+METRIC_LABELS = {
+    "finalValue": "주당 평가액",
+    "totalValue": "회사 총가치",
+    "ownedValue": "대표이사 보유주식 가치",
+    "inheritanceTax": "상속증여세",
+    "transferTax": "양도소득세(지방소득세 포함)",
+    "liquidationTax": "청산소득세(종합소득세 포함)",
+}
+
+# 성장률 하한 (%) - -100% 이하이면 순이익 부호가 바뀌므로 제한
+MIN_GROWTH_RATE = -99.0
+
+
+class QuantileSketch:
+    """
+    스트리밍 분위수 추정기 (KLL 방식 압축)
+
+    값은 레벨별 버퍼에 쌓이고, 버퍼가 capacity를 넘으면 정렬 후 한 칸씩 건너뛰어 절반만
+    다음 레벨로 올립니다. 레벨 h의 값은 원래 값 2^h개를 대표합니다. 입력 개수가 capacity
+    이하이면 정확한 분위수를 돌려줍니다.
+
+    Parameters:
+    capacity (int): 레벨별 최대 보관 개수 (클수록 정확하고 메모리를 더 씀)
+    seed: 압축 위치(짝수/홀수)를 고르는 난수 시드
+    """
+    __slots__ = ("capacity", "count", "levels", "_rng")
+
+    def __init__(self, capacity=4096, seed=None):
+        if capacity < 2:
+            raise ValueError("capacity는 2 이상이어야 합니다.")
+        self.capacity = int(capacity)
+        self.count = 0
+        self.levels = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """값 배열을 추가합니다."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self._push(0, values)
+        self._compress()
+
+    def _push(self, level, values):
+        if level == len(self.levels):
+            self.levels.append(values)
+        else:
+            self.levels[level] = np.concatenate((self.levels[level], values))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity:
+                items = np.sort(items)
+                # 홀수 개이면 마지막 하나는 현재 레벨에 남김
+                even = len(items) - len(items) % 2
+                offset = int(self._rng.integers(2))
+                self.levels[level] = items[even:]
+                self._push(level + 1, items[offset:even:2])
+            level += 1
+
+    def merge(self, other):
+        """다른 스케치(다른 프로세스에서 만든 것 포함)의 값을 레벨별로 합칩니다."""
+        for level, values in enumerate(other.levels):
+            self._push(level, values)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """
+        분위수 목록에 해당하는 값
+
+        Parameters:
+        qs (sequence): 0~1 사이 분위수
+
+        Returns:
+        ndarray: 분위수별 추정값 (값이 없으면 NaN)
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if not self.count:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0 ** level) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        return items[np.minimum(index, len(items) - 1)]
+
+
+def draw_growth_rates(rng, paths, years, mean_growth, growth_spread, distribution="normal"):
+    """
+    (paths, years) 크기의 연도별 성장률(%) 배열을 뽑습니다.
+
+    Parameters:
+    rng (numpy.random.Generator): 난수 생성기
+    mean_growth (float): 평균 성장률 (%)
+    growth_spread (float): 정규분포는 표준편차, 균등분포는 평균에서 양쪽으로의 폭 (%)
+    distribution (str): DISTRIBUTIONS의 이름
+    """
+    if distribution == "normal":
+        rates = rng.normal(mean_growth, growth_spread, size=(paths, years))
+    elif distribution == "uniform":
+        rates = rng.uniform(mean_growth - growth_spread, mean_growth + growth_spread, size=(paths, years))
+    else:
+        raise ValueError(f"지원하지 않는 분포입니다: {distribution}")
+    return np.maximum(rates, MIN_GROWTH_RATE)
+
+
+def value_paths(total_equity, weighted_income, shares, owned_shares, share_price, methods, growth_rates,
+                interest_rate=DEFAULT_INTEREST_RATE, is_family_corp=False):
+    """
+    경로별 연도별 성장률 배열로 예측 기간 말의 주식가치와 세금을 계산합니다.
+    calculate_future_stock_value()와 같이 매년 당기순이익이 그해 성장률만큼 늘고
+    그 순이익이 자본총계에 누적되며, 최종 연도 기준으로 평가합니다.
+
+    Parameters:
+    growth_rates (ndarray): (경로 수, 예측 기간) 성장률 배열 (%). 예측 기간이 0이면 현재 값으로 평가
+
+    Returns:
+    dict: SIMULATION_METRICS 키를 가진 경로 수 길이의 배열 딕셔너리
+    """
+    factors = np.cumprod(1 + np.asarray(growth_rates, dtype=np.float64) / 100, axis=1)
+    income = weighted_income * factors
+    if income.shape[1]:
+        future_income = income[:, -1]
+    else:
+        # 예측 기간 0년: calculate_future_stock_value()처럼 현재 순이익과 자본총계로 평가
+        future_income = np.full(len(income), weighted_income, dtype=np.float64)
+    future_equity = total_equity + income.sum(axis=1)
+
+    values = per_share_values(future_equity, future_income, shares, method_codes(methods)[0], interest_rate)
+    final_value = values["finalValue"]
+    total_value = final_value * shares
+    owned_value = final_value * owned_shares
+    return {
+        "finalValue": final_value,
+        "totalValue": total_value,
+        "ownedValue": owned_value,
+        "inheritanceTax": inheritance_tax_array(owned_value),
+        "transferTax": transfer_tax_array(owned_value, owned_shares * share_price),
+        "liquidationTax": liquidation_tax_array(total_value, shares, owned_shares, is_family_corp)[2],
+    }
+
+
+def simulate(total_equity, weighted_income, shares, owned_shares, share_price, methods, years,
+             mean_growth, growth_spread, distribution="normal", paths=DEFAULT_PATHS,
+             chunk_size=DEFAULT_CHUNK_SIZE, interest_rate=DEFAULT_INTEREST_RATE, is_family_corp=False,
+             seed=None, quantiles=DEFAULT_QUANTILES, sketch_capacity=4096, on_chunk=None):
+    """
+    몬테카를로 시뮬레이션으로 예측 기간 말 주식가치와 세금의 분위수를 계산합니다.
+    경로 묶음마다 simulate_part()를 현재 프로세스에서 차례로 실행하며, 여러 프로세스로
+    나눠 실행하는 valuation.parallel.simulate()와 같은 seed이면 같은 결과를 냅니다.
+
+    Parameters:
+    years (int): 예측 기간 (년)
+    mean_growth, growth_spread, distribution: draw_growth_rates() 참고
+    paths (int): 경로 수
+    chunk_size (int): 한 번에 만들어 평가할 경로 수
+    seed: 난수 시드 (같은 시드면 같은 결과)
+    quantiles (sequence): 계산할 분위수
+    on_chunk (callable): 묶음마다 (처리한 경로 수, 전체 경로 수)로 호출 (진행률 표시용)
+    나머지는 value_paths()와 같음
+
+    Returns:
+    dict: quantiles, paths, years와 항목별 {"quantiles": 분위수 값 목록, "mean": 평균}
+    """
+    work = partial(
+        simulate_part,
+        total_equity=total_equity, weighted_income=weighted_income, shares=shares,
+        owned_shares=owned_shares, share_price=share_price, methods=methods, years=years,
+        mean_growth=mean_growth, growth_spread=growth_spread, distribution=distribution,
+        interest_rate=interest_rate, is_family_corp=is_family_corp, sketch_capacity=sketch_capacity
+    )
+    parts = ((unit[0], work(unit)) for unit in simulation_units(paths, chunk_size, seed))
+    return combine_parts(parts, paths, years, quantiles, sketch_capacity, seed, on_chunk)
+
+
+def simulation_units(paths, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    """
+    경로를 chunk_size개씩 나눈 작업 단위 목록. 묶음마다 seed에서 파생한 독립 난수열을
+    쓰므로 묶음을 어느 프로세스에서 계산해도 결과가 같습니다.
+
+    Returns:
+    list: simulate_part()에 넘길 (경로 수, 난수 시드) 튜플 목록
+    """
+    paths = int(paths)
+    chunk_size = max(int(chunk_size), 1)
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+
+def simulate_part(unit, total_equity, weighted_income, shares, owned_shares, share_price, methods, years,
+                  mean_growth, growth_spread, distribution="normal", interest_rate=DEFAULT_INTEREST_RATE,
+                  is_family_corp=False, sketch_capacity=4096):
+    """
+    경로 일부를 계산해 항목별 분위수 스케치와 합계를 돌려줍니다 (병렬 실행의 작업 단위).
+
+    Parameters:
+    unit (tuple): (경로 수, 난수 시드)
+    나머지는 simulate()와 같음
+
+    Returns:
+    tuple: (항목별 QuantileSketch 딕셔너리, 항목별 합계 딕셔너리)
+    """
+    size, seed = unit
+    rng = np.random.default_rng(seed)
+    growth_rates = draw_growth_rates(rng, int(size), int(years), mean_growth, growth_spread, distribution)
+    values = value_paths(total_equity, weighted_income, shares, owned_shares, share_price, methods,
+                         growth_rates, interest_rate, is_family_corp)
+    sketches, sums = {}, {}
+    for metric in SIMULATION_METRICS:
+        sketches[metric] = QuantileSketch(sketch_capacity, seed=rng.integers(2 ** 32))
+        sketches[metric].update(values[metric])
+        sums[metric] = float(values[metric].sum())
+    return sketches, sums
+
+
+def combine_parts(parts, paths, years, quantiles=DEFAULT_QUANTILES, sketch_capacity=4096, seed=None,
+                  on_chunk=None):
+    """
+    simulate_part() 결과를 입력 순서대로 합쳐 simulate() 형식의 결과를 만듭니다.
+
+    Parameters:
+    parts (iterable): (경로 수, simulate_part() 결과) 튜플
+    on_chunk (callable): 묶음마다 (처리한 경로 수, 전체 경로 수)로 호출
+
+    Returns:
+    dict: summarize() 결과
+    """
+    paths = int(paths)
+    sketches = {metric: QuantileSketch(sketch_capacity, seed=seed) for metric in SIMULATION_METRICS}
+    sums = dict.fromkeys(SIMULATION_METRICS, 0.0)
+    done = 0
+    for size, (part_sketches, part_sums) in parts:
+        for metric in SIMULATION_METRICS:
+            sketches[metric].merge(part_sketches[metric])
+            sums[metric] += part_sums[metric]
+        done += size
+        if on_chunk is not None:
+            on_chunk(done, paths)
+    return summarize(sketches, sums, paths, int(years), quantiles)
+
+
+def summarize(sketches, sums, paths, years, quantiles=DEFAULT_QUANTILES):
+    """항목별 스케치와 합계로 simulate() 형식의 결과 딕셔너리를 만듭니다."""
+    result = {"quantiles": tuple(quantiles), "paths": paths, "years": years}
+    for metric in SIMULATION_METRICS:
+        result[metric] = {
+            "quantiles": sketches[metric].quantiles(quantiles).tolist(),
+            "mean": sums[metric] / paths if paths else float("nan"),
+        }
+    return result
+
+
+def summary_rows(result):
+    """
+    simulate() 결과를 표로 보여주기 위한 행 목록 (항목, P5/P50/P95 등 분위수, 평균)
+
+    Returns:
+    list: 항목별 딕셔너리 목록 (금액은 원 단위 반올림 정수)
+    """
+    rows = []
+    for metric, label in METRIC_LABELS.items():
+        row = {"항목": label}
+        for q, value in zip(result["quantiles"], result[metric]["quantiles"]):
+            row[f"P{q * 100:g}"] = round(value)
+        row["평균"] = round(result[metric]["mean"])
+        rows.append(row)
+    return rows
@@ -0,0 +1,138 @@
+"""
+프로세스 풀 병렬 실행
+
+큰 포트폴리오나 몬테카를로 시뮬레이션을 묶음(chunk) 단위 작업으로 나눠 여러 CPU
+코어에서 계산합니다. 결과는 입력 순서대로 돌려주고, 한 묶음에서 난 예외는 그
+묶음의 결과(ChunkResult.error)로만 남기 때문에 나머지 묶음 계산은 계속됩니다.
+동시에 제출하는 묶음 수를 제한하므로 입력 크기와 관계없이 메모리 사용량이 일정합니다.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, NamedTuple
+
+from valuation.stock import DEFAULT_INTEREST_RATE
+
+
+class ChunkResult(NamedTuple):
+    """묶음 하나의 실행 결과 (error가 빈 문자열이면 성공)"""
+    index: int
+    item: Any
+    value: Any
+    error: str
+
+
+def resolve_workers(workers=None):
+    """작업 프로세스 수 (None 또는 0 이하이면 CPU 코어 수)"""
+    if not workers or workers < 1:
+        return os.cpu_count() or 1
+    return int(workers)
+
+
+def _call(func, item):
+    try:
+        return func(item), ""
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _collect(index, item, future):
+    try:
+        value, error = future.result()
+    except Exception as e:
+        # 작업 프로세스 비정상 종료, 피클링 실패 등
+        value, error = None, f"{type(e).__name__}: {e}"
+    return ChunkResult(index, item, value, error)
+
+
+def map_chunks(func, items, workers=None, max_pending=None):
+    """
+    items의 각 묶음에 func를 적용한 결과를 입력 순서대로 돌려줍니다.
+
+    Parameters:
+    func (callable): 묶음 하나를 받는 함수 (프로세스 간 전달을 위해 모듈 최상위 함수나 partial)
+    items (iterable): 묶음 목록 또는 제너레이터 (필요한 만큼만 읽음)
+    workers (int): 작업 프로세스 수 (1이면 현재 프로세스에서 실행, None이면 CPU 코어 수)
+    max_pending (int): 동시에 제출해 둘 최대 묶음 수 (기본값: workers의 두 배)
+
+    Yields:
+    ChunkResult: (순번, 입력 묶음, 결과, 오류 메시지)
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for index, item in enumerate(items):
+            yield ChunkResult(index, item, *_call(func, item))
+        return
+
+    max_pending = max(int(max_pending or workers * 2), 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for index, item in enumerate(items):
+            pending.append((index, item, executor.submit(_call, func, item)))
+            if len(pending) >= max_pending:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+
+
+def value_portfolio(chunks, workers=None, interest_rate=DEFAULT_INTEREST_RATE, **options):
+    """
+    포트폴리오 묶음을 병렬로 평가해 결과 DataFrame을 입력 순서대로 돌려줍니다.
+    묶음 안의 잘못된 행은 value_chunk_isolated()가 행 단위로 걸러내고, 묶음 전체가
+    실패하면(작업 프로세스 종료 등) 그 묶음의 행만 '오류' 컬럼에 사유를 적어 돌려줍니다.
+
+    Parameters:
+    chunks (iterable): read_portfolio()가 돌려주는 DataFrame 묶음
+    options: value_chunk()의 taxes, growth_rate, years, is_family_corp, future_model
+    """
+    from valuation.portfolio import error_chunk, value_chunk_isolated
+
+    evaluate = partial(value_chunk_isolated, interest_rate=interest_rate, **options)
+    for outcome in map_chunks(evaluate, chunks, workers):
+        if outcome.error:
+            yield error_chunk(outcome.item, f"묶음 평가 실패: {outcome.error}", options.get("taxes", False),
+                              options.get("years", 0), options.get("future_model", "accumulation"))
+        else:
+            yield outcome.value
+
+
+def simulate(total_equity, weighted_income, shares, owned_shares, share_price, methods, years,
+             mean_growth, growth_spread, distribution="normal", paths=None, chunk_size=None,
+             interest_rate=DEFAULT_INTEREST_RATE, is_family_corp=False, seed=None, quantiles=None,
+             sketch_capacity=4096, workers=None, on_chunk=None):
+    """
+    montecarlo.simulate()를 경로 묶음 단위로 나눠 여러 프로세스에서 실행합니다.
+    묶음 나누기와 난수열(montecarlo.simulation_units()), 스케치 합치기(montecarlo.combine_parts())가
+    montecarlo.simulate()와 같으므로 같은 seed, paths, chunk_size이면 workers 수와 관계없이
+    montecarlo.simulate()와 같은 결과가 나옵니다.
+
+    Parameters:
+    workers (int): 작업 프로세스 수 (None이면 CPU 코어 수)
+    나머지는 montecarlo.simulate()와 같음
+
+    Returns:
+    dict: montecarlo.simulate()와 같은 형식
+    """
+    from valuation import montecarlo
+
+    paths = int(montecarlo.DEFAULT_PATHS if paths is None else paths)
+    quantiles = montecarlo.DEFAULT_QUANTILES if quantiles is None else quantiles
+    units = montecarlo.simulation_units(paths, chunk_size or montecarlo.DEFAULT_CHUNK_SIZE, seed)
+
+    work = partial(
+        montecarlo.simulate_part,
+        total_equity=total_equity, weighted_income=weighted_income, shares=shares,
+        owned_shares=owned_shares, share_price=share_price, methods=methods, years=years,
+        mean_growth=mean_growth, growth_spread=growth_spread, distribution=distribution,
+        interest_rate=interest_rate, is_family_corp=is_family_corp, sketch_capacity=sketch_capacity
+    )
+
+    def parts():
+        for outcome in map_chunks(work, units, workers):
+            if outcome.error:
+                # 일부 경로가 빠진 분위수는 의미가 없으므로 중단
+                raise RuntimeError(f"시뮬레이션 묶음 {outcome.index + 1} 실패: {outcome.error}")
+            yield outcome.item[0], outcome.value
+
+    return montecarlo.combine_parts(parts(), paths, years, quantiles, sketch_capacity, seed, on_chunk)
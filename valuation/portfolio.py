@@ -0,0 +1,273 @@
+"""
+포트폴리오(여러 회사) 일괄 평가
+
+CSV 또는 XLSX 파일의 한 행을 한 회사로 보고 일정 크기의 묶음(chunk) 단위로 읽어
+valuation.batch 엔진으로 평가합니다. 결과도 묶음 단위로 내보내므로 파일 크기와
+관계없이 메모리 사용량이 일정합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from valuation.batch import METHOD_TEXTS, method_codes, value_companies
+from valuation.projection import FUTURE_MODELS
+from valuation.stock import DEFAULT_INTEREST_RATE
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# 입력 파일 컬럼 (평가 페이지 CSV 다운로드의 항목명과 같음) -> 내부 이름
+INPUT_COLUMNS = {
+    "회사명": "company_name",
+    "자본총계": "total_equity",
+    "1년 전 당기순이익": "net_income1",
+    "2년 전 당기순이익": "net_income2",
+    "3년 전 당기순이익": "net_income3",
+    "총 발행주식수": "shares",
+    "액면금액": "share_price",
+    "평가 방법": "evaluation_method",
+    "대표이사 보유주식수": "owned_shares",
+}
+
+# 자주 쓰는 다른 표기
+COLUMN_ALIASES = {
+    "발행주식수": "총 발행주식수",
+    "평가방법": "평가 방법",
+    "당기순이익1": "1년 전 당기순이익",
+    "당기순이익2": "2년 전 당기순이익",
+    "당기순이익3": "3년 전 당기순이익",
+    "보유주식수": "대표이사 보유주식수",
+}
+
+REQUIRED_COLUMNS = ("자본총계", "1년 전 당기순이익", "2년 전 당기순이익", "3년 전 당기순이익", "총 발행주식수")
+
+NUMERIC_COLUMNS = ("total_equity", "net_income1", "net_income2", "net_income3", "shares", "share_price", "owned_shares")
+
+# 결과 파일 컬럼
+OUTPUT_COLUMNS = {
+    "netAssetPerShare": "1주당 순자산가치",
+    "goodwill": "1주당 영업권",
+    "assetValueWithGoodwill": "영업권 고려 후 자산가치",
+    "incomeValue": "1주당 손익가치",
+    "finalValue": "주당 평가액",
+    "totalValue": "기업 총 가치",
+    "ownedValue": "대표이사 보유주식 가치",
+}
+
+# 세금 결과 컬럼 (taxes=True일 때)
+TAX_COLUMNS = {
+    "inheritanceTax": "상속증여세",
+    "transferTax": "양도소득세(지방소득세 포함)",
+    "liquidationTax": "청산소득세(종합소득세 포함)",
+}
+
+# 미래 가치 결과 컬럼 (years를 지정했을 때, 컬럼 이름 뒤에 계산 방식을 붙임: future_columns())
+FUTURE_COLUMNS = {
+    "futureFinalValue": "미래 주당 평가액",
+    "futureTotalValue": "미래 기업 총 가치",
+    "futureOwnedValue": "미래 대표이사 보유주식 가치",
+}
+FUTURE_TAX_COLUMNS = {
+    "futureInheritanceTax": "미래 상속증여세",
+    "futureTransferTax": "미래 양도소득세(지방소득세 포함)",
+    "futureLiquidationTax": "미래 청산소득세(종합소득세 포함)",
+}
+
+
+def future_columns(future_model="accumulation", taxes=False):
+    """미래 가치(taxes=True이면 미래 세금 포함) 결과 키 -> 계산 방식을 붙인 컬럼 이름"""
+    columns = dict(FUTURE_COLUMNS)
+    if taxes:
+        columns.update(FUTURE_TAX_COLUMNS)
+    return {key: f"{name} [{FUTURE_MODELS[future_model]}]" for key, name in columns.items()}
+
+
+class PortfolioError(ValueError):
+    """포트폴리오 파일 형식 오류"""
+
+
+def template_csv():
+    """업로드용 CSV 서식 (예시 1행 포함)"""
+    example = pd.DataFrame([{
+        "회사명": "엘비즈",
+        "자본총계": 1000000000,
+        "1년 전 당기순이익": 450000000,
+        "2년 전 당기순이익": 400000000,
+        "3년 전 당기순이익": 370000000,
+        "총 발행주식수": 10000,
+        "액면금액": 5000,
+        "평가 방법": "일반법인",
+        "대표이사 보유주식수": 8000,
+    }])
+    return example.to_csv(index=False).encode('utf-8')
+
+
+def _normalize_columns(df):
+    df = df.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip(), str(c).strip()))
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise PortfolioError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    return df
+
+
+def read_portfolio(source, file_name="", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    포트폴리오 파일을 chunk_size 행씩 DataFrame으로 읽어 돌려줍니다.
+
+    Parameters:
+    source: 파일 경로 또는 파일 객체 (Streamlit 업로드 파일 포함)
+    file_name (str): 확장자 판별용 파일명 (source가 경로이면 생략 가능)
+    chunk_size (int): 한 번에 읽을 행 수
+    """
+    name = (file_name or str(source)).lower()
+    if name.endswith(".xls"):
+        # 예전 엑셀 형식은 xlrd가 따로 필요하므로 받지 않음
+        raise PortfolioError("XLS 파일은 지원하지 않습니다. XLSX 또는 CSV로 저장해 올려 주세요.")
+    if name.endswith(".xlsx"):
+        # 엑셀은 스트리밍 읽기를 지원하지 않으므로 읽은 뒤 나눠서 처리
+        try:
+            df = pd.read_excel(source, dtype=str)
+        except ImportError as e:
+            raise PortfolioError("XLSX 파일을 읽으려면 openpyxl 패키지가 필요합니다.") from e
+        df = _normalize_columns(df)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        for chunk in pd.read_csv(source, dtype=str, chunksize=chunk_size, skipinitialspace=True):
+            yield _normalize_columns(chunk)
+
+
+def _to_number(series):
+    # 콤마가 포함된 숫자 문자열 허용
+    return pd.to_numeric(series.str.replace(',', '', regex=False).str.strip(), errors="coerce")
+
+
+def value_chunk(df, interest_rate=DEFAULT_INTEREST_RATE, taxes=False, growth_rate=0, years=0,
+                is_family_corp=False, future_model="accumulation"):
+    """
+    포트폴리오 한 묶음을 평가해 입력 컬럼 뒤에 결과 컬럼을 붙인 DataFrame을 돌려줍니다.
+    숫자가 아니거나 발행주식수가 1 미만이거나 보유 주식수가 0 미만 또는 발행주식수를 넘는 행은
+    결과와 적용 평가방식을 비우고 '오류' 컬럼에 사유를 적습니다.
+
+    Parameters:
+    taxes (bool): 현재 가치 기준 세금 컬럼(TAX_COLUMNS) 추가
+    growth_rate (float), years (int): years가 1 이상이면 미래 가치 컬럼(FUTURE_COLUMNS) 추가
+        (taxes=True이면 미래 가치 기준 세금도 추가)
+    is_family_corp (bool): 청산소득세 계산 시 가족법인 세율 적용
+    future_model (str): 미래 가치 계산 방식 (valuation.projection.FUTURE_MODELS 키, 컬럼 이름에 표시)
+    """
+    df = _normalize_columns(df).reset_index(drop=True)
+    n = len(df)
+
+    values = {}
+    for column, key in INPUT_COLUMNS.items():
+        if key in NUMERIC_COLUMNS:
+            values[key] = _to_number(df[column]) if column in df.columns else pd.Series(np.zeros(n))
+    methods = df["평가 방법"].fillna("일반법인").str.strip() if "평가 방법" in df.columns else pd.Series(["일반법인"] * n)
+
+    errors = np.full(n, "", dtype=object)
+    invalid = np.zeros(n, dtype=bool)
+    for key in ("total_equity", "net_income1", "net_income2", "net_income3", "shares"):
+        bad = values[key].isna().to_numpy()
+        invalid |= bad
+    # 액면금액·보유주식수는 빈 칸이면 0으로 보지만, 값이 있는데 숫자가 아니면 오류
+    for column, key in INPUT_COLUMNS.items():
+        if key in ("share_price", "owned_shares") and column in df.columns:
+            filled = df[column].notna().to_numpy() & (df[column].astype(str).str.strip() != "").to_numpy()
+            invalid |= filled & values[key].isna().to_numpy()
+    errors[invalid] = "숫자가 아닌 값"
+    bad_shares = ~invalid & (values["shares"].to_numpy() < 1)
+    errors[bad_shares] = "발행주식수 1 미만"
+    invalid |= bad_shares
+    # 평가 페이지와 같이 대표이사 보유 주식수는 0 이상, 발행주식수 이하
+    negative_owned = ~invalid & (values["owned_shares"].fillna(0).to_numpy() < 0)
+    errors[negative_owned] = "보유 주식수 0 미만"
+    invalid |= negative_owned
+    bad_owned = ~invalid & (values["owned_shares"].fillna(0).to_numpy() > values["shares"].to_numpy())
+    errors[bad_owned] = "보유 주식수가 발행주식수 초과"
+    invalid |= bad_owned
+
+    shares = np.where(invalid, 1, values["shares"].fillna(1).to_numpy(dtype=np.float64))
+    result = value_companies(
+        values["total_equity"].fillna(0).to_numpy(dtype=np.float64),
+        values["net_income1"].fillna(0).to_numpy(dtype=np.float64),
+        values["net_income2"].fillna(0).to_numpy(dtype=np.float64),
+        values["net_income3"].fillna(0).to_numpy(dtype=np.float64),
+        shares,
+        method_codes(methods.to_numpy()),
+        owned_shares=values["owned_shares"].fillna(0).to_numpy(dtype=np.float64),
+        share_price=values["share_price"].fillna(0).to_numpy(dtype=np.float64),
+        interest_rate=interest_rate,
+        taxes=taxes,
+        growth_rate=growth_rate,
+        years=years,
+        is_family_corp=is_family_corp,
+        future_model=future_model
+    )
+
+    out = df.copy()
+    out["적용 평가방식"] = np.where(invalid, "", np.asarray(METHOD_TEXTS, dtype=object)[result["methodCode"]])
+    columns = dict(OUTPUT_COLUMNS)
+    if taxes:
+        columns.update(TAX_COLUMNS)
+    if years:
+        columns.update(future_columns(future_model, taxes))
+    for key, column in columns.items():
+        out[column] = np.where(invalid, np.nan, np.round(result[key]))
+    out["오류"] = errors
+    return out
+
+
+def result_columns(taxes=False, years=0, future_model="accumulation"):
+    """value_chunk()가 입력 컬럼 뒤에 붙이는 결과 컬럼 이름 목록"""
+    columns = ["적용 평가방식", *OUTPUT_COLUMNS.values()]
+    if taxes:
+        columns += TAX_COLUMNS.values()
+    if years:
+        columns += future_columns(future_model, taxes).values()
+    return columns + ["오류"]
+
+
+def error_chunk(df, message, taxes=False, years=0, future_model="accumulation"):
+    """평가하지 못한 행을 결과 컬럼을 비우고 '오류' 컬럼에 message를 적은 DataFrame으로 돌려줍니다."""
+    out = df.reindex(columns=[*df.columns, *result_columns(taxes, years, future_model)])
+    out["적용 평가방식"] = ""
+    out["오류"] = message
+    return out
+
+
+def value_chunk_isolated(df, interest_rate=DEFAULT_INTEREST_RATE, **options):
+    """
+    value_chunk()와 같지만 묶음 평가 중 예외가 나면 행 단위로 다시 평가해
+    문제가 된 행만 '오류' 컬럼에 사유를 적고 나머지 행은 정상 결과를 돌려줍니다.
+    """
+    try:
+        return value_chunk(df, interest_rate, **options)
+    except Exception:
+        pass
+    columns = (options.get("taxes", False), options.get("years", 0), options.get("future_model", "accumulation"))
+    rows = []
+    for i in range(len(df)):
+        row = df.iloc[i:i + 1]
+        try:
+            rows.append(value_chunk(row, interest_rate, **options))
+        except Exception as e:
+            rows.append(error_chunk(row, f"평가 실패: {e}", *columns))
+    return pd.concat(rows) if rows else error_chunk(df, "", *columns)
+
+
+def iter_valued_chunks(source, file_name="", chunk_size=DEFAULT_CHUNK_SIZE, interest_rate=DEFAULT_INTEREST_RATE,
+                       **options):
+    """파일을 묶음 단위로 읽어 평가 결과 DataFrame을 차례로 돌려줍니다 (options는 value_chunk() 참고)."""
+    for chunk in read_portfolio(source, file_name, chunk_size):
+        yield value_chunk(chunk, interest_rate, **options)
+
+
+def write_csv_chunks(valued_chunks, buffer):
+    """
+    평가 결과 묶음을 buffer에 CSV로 이어 씁니다. 첫 묶음에만 헤더를 씁니다.
+    진행률 표시를 위해 각 묶음을 쓴 뒤 지금까지 처리한 행 수를 돌려줍니다.
+    """
+    rows = 0
+    for i, chunk in enumerate(valued_chunks):
+        buffer.write(chunk.to_csv(index=False, header=(i == 0)).encode('utf-8'))
+        rows += len(chunk)
+        yield rows
@@ -0,0 +1,99 @@
+"""
+미래 주식가치 예측
+
+성장률을 적용해 미래 시점의 주식가치를 계산합니다.
+"""
+from valuation.stock import per_share_value
+
+# 미래 주식가치 페이지에서 고를 수 있는 성장률(%)과 예측 기간(년)
+GROWTH_RATE_OPTIONS = (5, 10, 15, 20, 25, 30)
+FORECAST_YEAR_OPTIONS = (5, 10, 15, 20, 30)
+
+# 미래 가치 계산 방식 (이름 -> 표시명)
+# - accumulation: 매년 순이익이 성장률만큼 늘고 자본총계에 누적된 뒤 다시 평가 (calculate_future_stock_value, 미래 주식가치 페이지)
+# - compound: 현재 평가액에 복리 성장률을 곱함 (calculate_future_value, 미래 세금계산 페이지)
+FUTURE_MODELS = {
+    "accumulation": "매년 누적 방식",
+    "compound": "복리 성장 방식",
+}
+
+
+# 미래 주식가치 계산 함수 (매년 누적 방식)
+def calculate_future_stock_value(stock_value, total_equity, shares, owned_shares,
+                                 interest_rate, evaluation_method, growth_rate, future_years):
+    """
+    매년 당기순이익이 성장률만큼 증가하고 그 순이익이 자본총계에 누적된다고 보고
+    최종 연도 기준으로 주식가치를 평가합니다.
+    """
+    if not stock_value:
+        return None
+
+    # 초기값 설정
+    current_total_equity = total_equity
+    current_weighted_income = stock_value["weightedIncome"]
+
+    # 연도별 값 저장할 리스트 (시각화용)
+    yearly_equity = [current_total_equity]
+    yearly_income = [current_weighted_income]
+
+    # 매년 순차적으로 계산
+    for year in range(1, future_years + 1):
+        # 당해 연도 순이익 계산 (성장률 적용)
+        current_income = current_weighted_income * (1 + (growth_rate / 100))
+
+        # 자본총계 업데이트 (전년도 자본총계 + 당해 연도 순이익)
+        current_total_equity += current_income
+
+        # 가중평균 순이익 업데이트
+        current_weighted_income = current_income
+
+        # 값 저장
+        yearly_equity.append(current_total_equity)
+        yearly_income.append(current_weighted_income)
+
+    # 최종 연도 기준으로 주식 가치 평가
+    result = per_share_value(current_total_equity, current_weighted_income, shares, evaluation_method, interest_rate)
+    final_value = result["finalValue"]
+
+    return {
+        "netAssetPerShare": result["netAssetPerShare"],
+        "assetValueWithGoodwill": result["assetValueWithGoodwill"],
+        "incomeValue": result["incomeValue"],
+        "finalValue": final_value,
+        "totalValue": final_value * shares,
+        "ownedValue": final_value * owned_shares,
+        "methodText": result["methodText"],
+        "futureTotalEquity": current_total_equity,
+        "futureWeightedIncome": current_weighted_income,
+        "growthRate": growth_rate,
+        "futureYears": future_years,
+        "yearlyEquity": yearly_equity,
+        "yearlyIncome": yearly_income
+    }
+
+
+# 미래 가치 계산 함수 (복리 성장)
+def calculate_future_value(current_value, growth_rate, years):
+    """
+    현재 가치에서 성장률을 적용하여 미래 가치를 계산합니다.
+
+    Parameters:
+    current_value (dict): 현재 주식 가치 정보가 담긴 딕셔너리
+    growth_rate (float): 연간 성장률 (%)
+    years (int): 예측 기간 (년)
+
+    Returns:
+    dict: 미래 주식 가치 정보가 담긴 딕셔너리
+    """
+    factor = (1 + growth_rate / 100) ** years
+    future_value = {}
+
+    for key, value in current_value.items():
+        if isinstance(value, (int, float)):
+            # 숫자 값에만 성장률 적용
+            future_value[key] = value * factor
+        else:
+            # 문자열 등 다른 값은 그대로 복사
+            future_value[key] = value
+
+    return future_value
@@ -0,0 +1,341 @@
+"""
+보고서 생성
+
+미래 주식가치, 미래 세금 페이지의 HTML/CSV 다운로드 보고서를 만듭니다.
+Streamlit 없이 명시적인 인자만 받으므로 일괄 작업과 성능 측정에서도 그대로 사용합니다.
+pandas는 CSV를 만들 때만 가져옵니다 (페이지 첫 화면 시작 시간 단축).
+"""
+import io
+from datetime import datetime
+
+from valuation.formatting import format_number
+
+
+def future_value_html(current_value, future_value, company_name, growth_rate, future_years):
+    """
+    미래 주식가치 예측 HTML 보고서
+
+    Parameters:
+    current_value (dict): 현재 주식가치 (calculate_stock_value 형식)
+    future_value (dict): 매년 누적 방식 미래 주식가치 (calculate_future_stock_value 형식)
+    """
+    target_year = datetime.now().year + future_years
+    value_increase = (future_value["finalValue"] / current_value["finalValue"] - 1) * 100
+    
+    # 연도별 데이터가 있는 경우 테이블 데이터 생성
+    yearly_table = ""
+    if "yearlyEquity" in future_value and "yearlyIncome" in future_value:
+        yearly_table = """
+        <h2>연도별 성장 내역</h2>
+        <table>
+            <tr>
+                <th>연도</th>
+                <th>자본총계 (원)</th>
+                <th>가중평균 당기순이익 (원)</th>
+            </tr>
+        """
+        
+        current_year = datetime.now().year
+        for i in range(len(future_value["yearlyEquity"])):
+            yearly_table += f"""
+            <tr>
+                <td>{current_year + i}년</td>
+                <td>{format_number(future_value["yearlyEquity"][i])}</td>
+                <td>{format_number(future_value["yearlyIncome"][i])}</td>
+            </tr>
+            """
+            
+        yearly_table += "</table>"
+    
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>미래 주식가치 예측 보고서 - {company_name}</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
+            h1 {{ color: #2c3e50; text-align: center; }}
+            h2 {{ color: #3498db; margin-top: 20px; }}
+            .info {{ margin-bottom: 5px; }}
+            .value-box {{ background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 10px 0; }}
+            .current {{ border-left: 4px solid #3498db; }}
+            .future {{ border-left: 4px solid #e67e22; }}
+            .result {{ margin-top: 10px; font-weight: bold; }}
+            .increase {{ color: #27ae60; font-weight: bold; font-size: 1.2em; }}
+            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
+            table, th, td {{ border: 1px solid #ddd; }}
+            th, td {{ padding: 12px; text-align: left; }}
+            th {{ background-color: #f2f2f2; }}
+        </style>
+    </head>
+    <body>
+        <h1>미래 주식가치 예측 보고서</h1>
+        
+        <h2>회사 정보</h2>
+        <div class="info">회사명: {company_name}</div>
+        
+        <h2>예측 정보</h2>
+        <div class="info">적용 성장률: 연 {growth_rate}% (매년)</div>
+        <div class="info">예측 기간: {future_years}년 (기준: {datetime.now().year}년 → 예측: {target_year}년)</div>
+        
+        <div class="value-box current">
+            <h3>현재 가치</h3>
+            <div class="info">주당 가치: {format_number(current_value["finalValue"])}원</div>
+            <div class="info">회사 총가치: {format_number(current_value["totalValue"])}원</div>
+        </div>
+        
+        <div class="value-box future">
+            <h3>미래 가치</h3>
+            <div class="info">주당 가치: {format_number(future_value["finalValue"])}원</div>
+            <div class="info">회사 총가치: {format_number(future_value["totalValue"])}원</div>
+        </div>
+        
+        <div style="text-align: center; margin: 20px 0;">
+            <p>예상 가치 증가율: <span class="increase">+{value_increase:.1f}%</span> ({future_years}년 후)</p>
+        </div>
+        
+        {yearly_table}
+        
+        <h2>세부 계산 내역</h2>
+        <table>
+            <tr>
+                <th>항목</th>
+                <th>금액 (원)</th>
+            </tr>
+            <tr>
+                <td>미래 자본총계</td>
+                <td>{format_number(future_value["futureTotalEquity"])}</td>
+            </tr>
+            <tr>
+                <td>1주당 순자산가치</td>
+                <td>{format_number(future_value["netAssetPerShare"])}</td>
+            </tr>
+            <tr>
+                <td>1주당 손익가치</td>
+                <td>{format_number(future_value["incomeValue"])}</td>
+            </tr>
+            <tr>
+                <td>미래 주당 평가액</td>
+                <td>{format_number(future_value["finalValue"])}</td>
+            </tr>
+            <tr>
+                <td>미래 회사 총 주식가치</td>
+                <td>{format_number(future_value["totalValue"])}</td>
+            </tr>
+        </table>
+        
+        <div style="margin-top: 30px; padding: 10px; background-color: #edf7ed; border-radius: 5px;">
+            <p><b>참고:</b> 이 예측은 매년 당기순이익이 성장률에 따라 증가하고, 그 순이익이 자본총계에 누적되는 방식으로 계산되었습니다.</p>
+        </div>
+        
+        <div style="margin-top: 30px; text-align: center; color: #777; font-size: 0.9em;">
+            <p>생성일: {datetime.now().strftime('%Y년 %m월 %d일')}</p>
+        </div>
+    </body>
+    </html>
+    """
+    return html_content
+
+
+
+def future_value_csv(current_value, future_value, company_name, growth_rate, future_years):
+    """미래 주식가치 예측 CSV 보고서 (UTF-8 bytes, 연도별 내역이 있으면 빈 줄 뒤에 덧붙임)"""
+    import pandas as pd
+
+    # 현재 년도 계산
+    current_year = datetime.now().year
+    target_year = current_year + future_years
+    
+    # 가치 증가율 계산
+    value_increase = (future_value["finalValue"] / current_value["finalValue"] - 1) * 100
+    
+    # CSV 데이터 생성
+    data = {
+        '항목': [
+            '회사명', '성장률', '예측기간', 
+            '예측 시작 연도', '예측 종료 연도',
+            '현재 주당 가치', '미래 주당 가치', 
+            '현재 회사 총가치', '미래 회사 총가치',
+            '가치 증가율',
+            '미래 자본총계', '미래 1주당 순자산가치', 
+            '미래 1주당 손익가치', '미래 주당 평가액'
+        ],
+        '값': [
+            company_name, f"{growth_rate}%", f"{future_years}년",
+            str(current_year), str(target_year),
+            current_value["finalValue"], future_value["finalValue"],
+            current_value["totalValue"], future_value["totalValue"],
+            f"{value_increase:.1f}%",
+            future_value["futureTotalEquity"], future_value["netAssetPerShare"],
+            future_value["incomeValue"], future_value["finalValue"]
+        ]
+    }
+    
+    # 연도별 데이터가 있는 경우 추가
+    if "yearlyEquity" in future_value:
+        yearly_df = pd.DataFrame({
+            "연도": [current_year + i for i in range(len(future_value["yearlyEquity"]))],
+            "자본총계": future_value["yearlyEquity"],
+            "가중평균 당기순이익": future_value["yearlyIncome"]
+        })
+        
+        # 원본 DataFrame 생성
+        main_df = pd.DataFrame(data)
+        
+        # CSV로 변환 (둘 다 포함)
+        csv_bytes = io.BytesIO()
+        
+        # 기본 정보 먼저 저장
+        main_df.to_csv(csv_bytes, index=False, encoding='utf-8')
+        
+        # 그 다음에 빈 줄 추가
+        csv_bytes.write("\n\n".encode('utf-8'))
+        
+        # 연도별 데이터 추가
+        yearly_df.to_csv(csv_bytes, index=False, encoding='utf-8')
+        
+        # 처음으로 이동하고 내용 얻기
+        csv_bytes.seek(0)
+        return csv_bytes.getvalue()
+    else:
+        # DataFrame 생성 후 CSV로 변환
+        df = pd.DataFrame(data)
+        csv = df.to_csv(index=False).encode('utf-8')
+        return csv
+
+
+
+def future_tax_html(current_tax, future_tax, company_name, growth_rate, future_years):
+    """
+    미래 세금 계산 HTML 보고서
+
+    Parameters:
+    current_tax, future_tax (dict): inheritance, transfer, liquidation 세액과 best_option(최적 세금 옵션 이름)
+    """
+    target_year = datetime.now().year + future_years
+    
+    # 세금 증가율 계산 (현재 세금이 0이면 0%, 화면 표시와 같음)
+    inheritance_increase = (future_tax["inheritance"] / current_tax["inheritance"] - 1) * 100 if current_tax["inheritance"] > 0 else 0
+    transfer_increase = (future_tax["transfer"] / current_tax["transfer"] - 1) * 100 if current_tax["transfer"] > 0 else 0
+    liquidation_increase = (future_tax["liquidation"] / current_tax["liquidation"] - 1) * 100 if current_tax["liquidation"] > 0 else 0
+    
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>미래 세금 계산 보고서 - {company_name}</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
+            h1 {{ color: #2c3e50; text-align: center; }}
+            h2 {{ color: #3498db; margin-top: 20px; }}
+            .info {{ margin-bottom: 5px; }}
+            .tax-box {{ background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 10px 0; }}
+            .current {{ border-left: 4px solid #3498db; }}
+            .future {{ border-left: 4px solid #e67e22; }}
+            .increase {{ color: #27ae60; font-weight: bold; }}
+            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
+            table, th, td {{ border: 1px solid #ddd; }}
+            th, td {{ padding: 12px; text-align: center; }}
+            th {{ background-color: #f2f2f2; }}
+            td.number {{ text-align: right; }}
+            .best-option {{ background-color: #e6f7e6; padding: 10px; border-radius: 5px; margin: 10px 0; }}
+        </style>
+    </head>
+    <body>
+        <h1>미래 세금 계산 보고서</h1>
+        
+        <h2>회사 정보</h2>
+        <div class="info">회사명: {company_name}</div>
+        
+        <h2>예측 정보</h2>
+        <div class="info">적용 성장률: 연 {growth_rate}% (복리)</div>
+        <div class="info">예측 기간: {future_years}년 (기준: {datetime.now().year}년 → 예측: {target_year}년)</div>
+        
+        <h2>현재 vs 미래 세금 비교</h2>
+        <table>
+            <tr>
+                <th>세금 유형</th>
+                <th>현재 (2025년)</th>
+                <th>미래 ({target_year}년)</th>
+                <th>증가율</th>
+            </tr>
+            <tr>
+                <td>상속증여세 (누진세율)</td>
+                <td class="number">{format_number(current_tax["inheritance"])}원</td>
+                <td class="number">{format_number(future_tax["inheritance"])}원</td>
+                <td class="number">{inheritance_increase:.1f}%</td>
+            </tr>
+            <tr>
+                <td>양도소득세(지방소득세 포함) (20%~25%)</td>
+                <td class="number">{format_number(current_tax["transfer"])}원</td>
+                <td class="number">{format_number(future_tax["transfer"])}원</td>
+                <td class="number">{transfer_increase:.1f}%</td>
+            </tr>
+            <tr>
+                <td>청산소득세 (법인세+종합소득세)</td>
+                <td class="number">{format_number(current_tax["liquidation"])}원</td>
+                <td class="number">{format_number(future_tax["liquidation"])}원</td>
+                <td class="number">{liquidation_increase:.1f}%</td>
+            </tr>
+        </table>
+        
+        <div class="best-option">
+            <h3>최적 세금 옵션</h3>
+            <p>현재 기준 최적 세금 옵션: <strong>{current_tax["best_option"]}</strong></p>
+            <p>미래 기준 최적 세금 옵션: <strong>{future_tax["best_option"]}</strong></p>
+        </div>
+        
+        <div style="margin-top: 30px; padding: 10px; background-color: #f8f9fa; border-radius: 5px;">
+            <p><b>참고:</b> 이 보고서의 세금 계산은 참고용으로만 사용하시기 바랍니다. 실제 세금은 개인 상황, 보유기간, 대주주 여부, 사업 형태 등에 따라 달라질 수 있습니다.</p>
+            <p>미래 가치 예측은 단순 성장률 적용으로 실제 기업 가치 변동과는 차이가 있을 수 있습니다.</p>
+        </div>
+        
+        <div style="margin-top: 30px; text-align: center; color: #777; font-size: 0.9em;">
+            <p>생성일: {datetime.now().strftime('%Y년 %m월 %d일')}</p>
+        </div>
+    </body>
+    </html>
+    """
+    return html_content
+
+
+
+def future_tax_csv(current_tax, future_tax, company_name, growth_rate, future_years):
+    """미래 세금 계산 CSV 보고서 (UTF-8 bytes)"""
+    import pandas as pd
+
+    # 현재 년도 계산
+    current_year = datetime.now().year
+    target_year = current_year + future_years
+    
+    # 세금 증가율 계산
+    inheritance_increase = (future_tax["inheritance"] / current_tax["inheritance"] - 1) * 100 if current_tax["inheritance"] > 0 else 0
+    transfer_increase = (future_tax["transfer"] / current_tax["transfer"] - 1) * 100 if current_tax["transfer"] > 0 else 0
+    liquidation_increase = (future_tax["liquidation"] / current_tax["liquidation"] - 1) * 100 if current_tax["liquidation"] > 0 else 0
+    
+    # CSV 데이터 생성
+    data = {
+        '항목': [
+            '회사명', '성장률', '예측기간', 
+            '예측 시작 연도', '예측 종료 연도',
+            '현재 상속증여세', '미래 상속증여세', '상속증여세 증가율',
+            '현재 양도소득세(지방소득세 포함)', '미래 양도소득세(지방소득세 포함)', '양도소득세 증가율',
+            '현재 청산소득세(종합소득세 포함)', '미래 청산소득세(종합소득세 포함)', '청산소득세 증가율',
+            '현재 최적 세금 옵션', '미래 최적 세금 옵션'
+        ],
+        '값': [
+            company_name, f"{growth_rate}%", f"{future_years}년",
+            str(current_year), str(target_year),
+            current_tax["inheritance"], future_tax["inheritance"], f"{inheritance_increase:.1f}%",
+            current_tax["transfer"], future_tax["transfer"], f"{transfer_increase:.1f}%",
+            current_tax["liquidation"], future_tax["liquidation"], f"{liquidation_increase:.1f}%",
+            current_tax["best_option"], future_tax["best_option"]
+        ]
+    }
+    
+    # DataFrame 생성 후 CSV로 변환
+    df = pd.DataFrame(data)
+    csv = df.to_csv(index=False).encode('utf-8')
+    return csv
@@ -0,0 +1,342 @@
+"""
+평가 HTTP 서비스
+
+다른 시스템이 Streamlit 화면을 거치지 않고 평가 결과를 가져갈 수 있도록 표준 라이브러리
+http.server로 JSON API를 제공합니다. 한 프로세스가 계속 떠 있으면서 세율 구간표와
+valuation.cache의 계산 결과를 재사용하므로 요청마다 다시 준비할 것이 없습니다.
+
+    python -m valuation.service --port 8000
+
+엔드포인트 (모두 POST, JSON 본문)
+- /valuate: 회사 1곳의 주식가치 (calculate_stock_value 형식)
+- /tax/current: 현재 주식가치 기준 세금 (calculate_tax_details 형식)
+- /tax/future: growth_rate, years를 적용한 복리 성장 미래 가치와 세금
+- /batch: {"companies": [...]} 여러 회사의 주식가치, 세금, 미래 가치를 배열 연산으로 한 번에 계산.
+  미래 가치는 기본적으로 /tax/future와 같은 복리 성장 방식이며, "future_model": "accumulation"을
+  주면 미래 주식가치 페이지와 같은 매년 누적 방식으로 계산합니다 (응답의 futureModel).
+- GET /health: 상태와 캐시 통계
+- GET /metrics: 캐시 적중/미적중 수 등 운영 지표 (Prometheus 텍스트 형식, valuation.metrics)
+
+회사 입력 키는 valuation.cache.ValuationInput 필드명(total_equity, net_income1, net_income2,
+net_income3, shares, owned_shares, share_price, evaluation_method, interest_rate, growth_rate,
+years, is_family_corp)과 같습니다. /batch에서는 회사마다 total_equity, net_income1~3, shares,
+owned_shares, share_price, evaluation_method만 읽고, interest_rate, growth_rate, years,
+is_family_corp, taxes, future_model은 요청 본문 최상위에서 모든 회사에 공통으로 적용합니다.
+"""
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from valuation import cache
+from valuation.cache import ValuationInput, normalize_input
+from valuation.projection import FUTURE_MODELS
+from valuation.stock import DEFAULT_INTEREST_RATE, METHOD_TEXTS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# 요청 본문 최대 크기 (바이트)
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+REQUIRED_FIELDS = ("total_equity", "net_income1", "net_income2", "net_income3", "shares")
+INPUT_FIELDS = ValuationInput._fields
+
+
+class ServiceError(ValueError):
+    """잘못된 요청 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def check_inputs(shares, owned_shares, methods, interest_rate, indexed=False):
+    """
+    /valuate와 /batch가 함께 쓰는 입력 검사입니다. 계산 함수가 조용히 보정하거나
+    (발행주식수 0 -> 1, 보유 주식수 음수 -> 0) 예외를 내는(평가방법 코드 범위 밖, 환원율 0) 값을
+    400 오류로 돌려줍니다.
+
+    Parameters:
+    shares (sequence): 회사별 발행주식수
+    owned_shares (sequence): 회사별 대표이사 보유 주식수 (None은 0)
+    methods (sequence): 회사별 평가방법 이름 또는 코드
+    interest_rate: 환원율 (%, None이면 기본값)
+    indexed (bool): 오류 메시지 앞에 companies[순번]을 붙일지 여부
+
+    Returns:
+    tuple: (발행주식수 float 배열, 보유 주식수 float 배열, 환원율 float)
+    """
+    import numpy as np
+
+    def where(i):
+        return f"companies[{i}]: " if indexed else ""
+
+    try:
+        shares = np.asarray(shares, dtype=np.float64)
+        owned_shares = np.asarray([0 if value is None else value for value in owned_shares], dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise ServiceError(f"shares, owned_shares에 숫자가 아닌 값이 있습니다: {e}") from e
+    invalid = ~(shares >= 1)
+    if invalid.any():
+        raise ServiceError(f"{where(int(np.argmax(invalid)))}발행주식수는 1 이상이어야 합니다.")
+    invalid = ~(owned_shares >= 0)
+    if invalid.any():
+        raise ServiceError(f"{where(int(np.argmax(invalid)))}보유 주식수는 0 이상이어야 합니다.")
+    for i, method in enumerate(methods):
+        if isinstance(method, str):
+            continue
+        if isinstance(method, bool) or not isinstance(method, (int, np.integer)) or not 0 <= method < len(METHOD_TEXTS):
+            raise ServiceError(f"{where(i)}평가방법은 이름 또는 0~{len(METHOD_TEXTS) - 1} 코드여야 합니다: {method}")
+    if interest_rate is None:
+        return shares, owned_shares, float(DEFAULT_INTEREST_RATE)
+    try:
+        interest_rate = float(interest_rate)
+    except (TypeError, ValueError) as e:
+        raise ServiceError(f"interest_rate가 숫자가 아닙니다: {interest_rate}") from e
+    if not interest_rate > 0:
+        raise ServiceError("interest_rate는 0보다 커야 합니다.")
+    return shares, owned_shares, interest_rate
+
+
+def parse_input(body):
+    """요청 본문의 회사 입력값을 정규화된 ValuationInput으로 만듭니다."""
+    if not isinstance(body, dict):
+        raise ServiceError("요청 본문은 JSON 객체여야 합니다.")
+    missing = [field for field in REQUIRED_FIELDS if body.get(field) is None]
+    if missing:
+        raise ServiceError(f"필수 항목이 없습니다: {', '.join(missing)}")
+    _, _, interest_rate = check_inputs([body["shares"]], [body.get("owned_shares")],
+                                       [body.get("evaluation_method", "일반법인")], body.get("interest_rate"))
+    values = {field: body[field] for field in INPUT_FIELDS if body.get(field) is not None}
+    values["interest_rate"] = interest_rate
+    try:
+        return normalize_input(**values)
+    except (TypeError, ValueError) as e:
+        raise ServiceError(f"입력값이 올바르지 않습니다: {e}") from e
+
+
+def handle_valuate(body):
+    inputs = parse_input(body)
+    return cache.stock_value(inputs, body.get("eval_date"))
+
+
+def handle_current_tax(body):
+    return cache.tax_details(parse_input(body))
+
+
+def handle_future_tax(body):
+    inputs = parse_input(body)
+    if inputs.years < 1:
+        raise ServiceError("years는 1 이상이어야 합니다.")
+    result = cache.future_tax_details(inputs)
+    result["future"] = cache.future_value(inputs)
+    return result
+
+
+def _column(companies, field, default=None):
+    values = []
+    for i, company in enumerate(companies):
+        value = company.get(field) if isinstance(company, dict) else None
+        if value is None:
+            if default is None:
+                raise ServiceError(f"companies[{i}]: 필수 항목이 없습니다: {field}")
+            value = default
+        values.append(value)
+    return values
+
+
+def _float_column(companies, field, default=None):
+    import numpy as np
+
+    try:
+        return np.array(_column(companies, field, default), dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise ServiceError(f"{field}에 숫자가 아닌 값이 있습니다: {e}") from e
+
+
+def handle_batch(body):
+    """
+    {"companies": [회사 입력, ...], "taxes": true, "growth_rate": 10, "years": 10, ...}
+    taxes, growth_rate, years, interest_rate, is_family_corp, future_model은 모든 회사에 공통으로
+    적용합니다 (회사 항목에 있어도 읽지 않음). future_model의 기본값은 /tax/future와 같은 "compound"입니다.
+    """
+    import numpy as np
+
+    from valuation.batch import value_companies
+
+    companies = body.get("companies") if isinstance(body, dict) else None
+    if not isinstance(companies, list):
+        raise ServiceError("companies 배열이 필요합니다.")
+    if not companies:
+        return {"count": 0, "results": []}
+
+    methods = _column(companies, "evaluation_method", "일반법인")
+    shares, owned_shares, interest_rate = check_inputs(
+        _column(companies, "shares"), _column(companies, "owned_shares", 0), methods, body.get("interest_rate"),
+        indexed=True
+    )
+    future_model = body.get("future_model", "compound")
+    if future_model not in FUTURE_MODELS:
+        raise ServiceError(f"future_model은 {', '.join(FUTURE_MODELS)} 중 하나여야 합니다: {future_model}")
+    try:
+        years = int(body.get("years") or 0)
+        result = value_companies(
+            _float_column(companies, "total_equity"),
+            _float_column(companies, "net_income1"),
+            _float_column(companies, "net_income2"),
+            _float_column(companies, "net_income3"),
+            shares,
+            methods,
+            owned_shares=owned_shares,
+            share_price=_float_column(companies, "share_price", 0),
+            interest_rate=interest_rate,
+            taxes=bool(body.get("taxes", True)),
+            growth_rate=float(body.get("growth_rate") or 0),
+            years=years,
+            is_family_corp=bool(body.get("is_family_corp", False)),
+            future_model=future_model
+        )
+    except ServiceError:
+        raise
+    except (TypeError, ValueError) as e:
+        raise ServiceError(f"입력값이 올바르지 않습니다: {e}") from e
+
+    method_texts = np.asarray(METHOD_TEXTS, dtype=object)[result.pop("methodCode")].tolist()
+    columns = {key: values.tolist() for key, values in result.items()}
+    results = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    for row, text in zip(results, method_texts):
+        row["methodText"] = text
+    response = {"count": len(results), "results": results}
+    if years:
+        response["futureModel"] = future_model
+    return response
+
+
+# 경로 -> 처리 함수
+ROUTES = {
+    "/valuate": handle_valuate,
+    "/tax/current": handle_current_tax,
+    "/tax/future": handle_future_tax,
+    "/batch": handle_batch,
+}
+
+
+def health():
+    """상태와 함수별 캐시 적중/미적중 수"""
+    return {
+        "status": "ok",
+        "cache": {name: {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+                  for name, info in cache.cache_info().items()},
+    }
+
+
+class ValuationHandler(BaseHTTPRequestHandler):
+    """JSON 요청을 ROUTES의 처리 함수로 넘기는 요청 처리기"""
+    protocol_version = "HTTP/1.1"
+    # 연결 재사용 시 헤더와 본문을 나눠 보내며 생기는 지연(Nagle) 방지
+    disable_nagle_algorithm = True
+    server_version = "ValuationService/1.0"
+    quiet = True
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            # 본문을 읽지 않으므로 응답 후 연결을 닫음
+            self.close_connection = True
+            raise ServiceError("요청 본문이 너무 큽니다.", status=413)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ServiceError(f"JSON 형식 오류: {e}") from e
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._send_json(200, health())
+        elif path == "/metrics":
+            from valuation import metrics
+
+            data = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", metrics.CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+
+    def do_POST(self):
+        handler = ROUTES.get(self.path.split("?", 1)[0])
+        try:
+            # 연결을 재사용하므로 경로가 없어도 본문은 끝까지 읽음
+            body = self._read_body()
+            if handler is None:
+                raise ServiceError(f"알 수 없는 경로입니다: {self.path}", status=404)
+            self._send_json(200, handler(body))
+        except ServiceError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def warm_up():
+    """
+    NumPy 배열 엔진과 세율 구간표 배열을 미리 준비하고 각 엔드포인트를 한 번씩 실행해
+    첫 요청부터 같은 지연 시간으로 응답하게 합니다.
+    """
+    from valuation import tax
+
+    for table in (tax.INHERITANCE_TAX_TABLE, tax.TRANSFER_TAX_TABLE, tax.CORPORATE_TAX_TABLE,
+                  tax.FAMILY_CORPORATE_TAX_TABLE):
+        table.arrays()
+    sample = {
+        "total_equity": 1000000000, "net_income1": 450000000, "net_income2": 400000000,
+        "net_income3": 370000000, "shares": 10000, "owned_shares": 8000, "share_price": 5000,
+        "growth_rate": 10, "years": 10,
+    }
+    for handler in ROUTES.values():
+        handler({"companies": [sample], "years": 10} if handler is handle_batch else sample)
+    # 예시 입력이 실제 요청의 캐시 통계에 섞이지 않도록 비움
+    cache.cache_clear()
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=True):
+    """요청마다 스레드를 쓰는 HTTP 서버를 만듭니다 (serve_forever()로 실행)."""
+    handler = type("Handler", (ValuationHandler,), {"quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m valuation.service", description="평가 HTTP 서비스를 실행합니다.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"바인딩 주소 (기본값: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"포트 (기본값: {DEFAULT_PORT})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="요청 로그 출력")
+    args = parser.parse_args(argv)
+
+    warm_up()
+    server = make_server(args.host, args.port, quiet=not args.verbose)
+    print(f"평가 서비스 실행 중: http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
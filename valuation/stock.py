@@ -0,0 +1,143 @@
+"""
+비상장주식 평가 (상속세 및 증여세법 시행령 제54조)
+
+Streamlit 세션 상태 대신 명시적인 인자를 받아 1개 회사의 주식가치를 계산합니다.
+"""
+import numbers
+
+# 평가방법 코드와 이름
+METHOD_GENERAL = 0          # 일반법인
+METHOD_REAL_ESTATE = 1      # 부동산 과다법인
+METHOD_NET_ASSET_ONLY = 2   # 순자산가치만 평가
+
+METHOD_NAMES = ("일반법인", "부동산 과다법인", "순자산가치만 평가")
+METHOD_TEXTS = (
+    '일반법인: (수익가치×0.6 + 자산가치×0.4)',
+    '부동산 과다법인: (자산가치×0.6 + 수익가치×0.4)',
+    '순자산가치만 평가',
+)
+
+# 영업권 계산용 연금현가계수 (5년, 10%)
+ANNUITY_FACTOR = 3.7908
+
+# 환원율 기본값 (%)
+DEFAULT_INTEREST_RATE = 10
+
+
+def method_code(evaluation_method):
+    """
+    평가방법 이름을 코드로 변환합니다. 알 수 없는 이름은 일반법인으로 처리하고,
+    정수 코드(numpy 정수 포함, bool 제외)는 그대로 쓰되 METHOD_TEXTS 범위 밖이면 ValueError를 냅니다.
+    """
+    if isinstance(evaluation_method, numbers.Integral) and not isinstance(evaluation_method, bool):
+        if not 0 <= evaluation_method < len(METHOD_TEXTS):
+            raise ValueError(f"알 수 없는 평가방법 코드입니다: {evaluation_method}")
+        return int(evaluation_method)
+    try:
+        return METHOD_NAMES.index(evaluation_method)
+    except ValueError:
+        return METHOD_GENERAL
+
+
+def weighted_average_income(net_income1, net_income2, net_income3):
+    """최근 3개년 당기순이익의 가중평균 (3:2:1)"""
+    return (net_income1 * 3 + net_income2 * 2 + net_income3 * 1) / 6
+
+
+def _select(condition, if_true, if_false):
+    return if_true if condition else if_false
+
+
+def per_share_components(total_equity, weighted_income, shares, code, interest_rate=DEFAULT_INTEREST_RATE,
+                         maximum=max, where=_select):
+    """
+    1주당 가치 계산식 (per_share_value()와 valuation.batch.per_share_values()가 함께 사용).
+    기본값(max, 조건 선택)이면 숫자 1개를, maximum=np.maximum, where=np.where이면 배열을 계산합니다.
+
+    Parameters:
+    code (int or ndarray): 평가방법 코드 (METHOD_*)
+
+    Returns:
+    dict: netAssetPerShare, goodwill, assetValueWithGoodwill, incomeValue, finalValue
+    """
+    # 1. 순자산가치
+    net_asset_per_share = total_equity / shares
+
+    # 2. 영업권
+    weighted_income_per_share = weighted_income / shares
+    equity_return = (total_equity * (interest_rate / 100)) / shares
+    goodwill = maximum(0, (weighted_income_per_share * 0.5 - equity_return) * ANNUITY_FACTOR)
+
+    # 3. 순자산가치 + 영업권
+    asset_value_with_goodwill = net_asset_per_share + goodwill
+
+    # 4. 손익가치
+    income_value = weighted_income_per_share * (100 / interest_rate)
+
+    # 5. 평가방법별 최종가치 (순자산가치만 평가가 아니면 순자산가치 80% 하한 적용)
+    general = (income_value * 0.6) + (asset_value_with_goodwill * 0.4)
+    real_estate = (asset_value_with_goodwill * 0.6) + (income_value * 0.4)
+    final_value = where(
+        code == METHOD_NET_ASSET_ONLY,
+        net_asset_per_share,
+        maximum(where(code == METHOD_REAL_ESTATE, real_estate, general), net_asset_per_share * 0.8)
+    )
+
+    return {
+        "netAssetPerShare": net_asset_per_share,
+        "goodwill": goodwill,
+        "assetValueWithGoodwill": asset_value_with_goodwill,
+        "incomeValue": income_value,
+        "finalValue": final_value,
+    }
+
+
+def per_share_value(total_equity, weighted_income, shares, evaluation_method, interest_rate=DEFAULT_INTEREST_RATE):
+    """
+    자본총계와 가중평균 당기순이익으로 1주당 가치를 계산합니다.
+
+    Returns:
+    dict: netAssetPerShare, goodwill, assetValueWithGoodwill, incomeValue, finalValue, methodText
+    """
+    code = method_code(evaluation_method)
+    result = per_share_components(total_equity, weighted_income, shares, code, interest_rate)
+    result["methodText"] = METHOD_TEXTS[code]
+    return result
+
+
+def calculate_stock_value(total_equity, net_income1, net_income2, net_income3, shares,
+                          owned_shares=0, evaluation_method="일반법인",
+                          interest_rate=DEFAULT_INTEREST_RATE, eval_date=None):
+    """
+    비상장주식 가치를 계산합니다.
+
+    Parameters:
+    total_equity (int): 자본총계 (원)
+    net_income1, net_income2, net_income3 (int): 1년 전, 2년 전, 3년 전 당기순이익 (원)
+    shares (int): 총 발행주식수
+    owned_shares (int): 대표이사 보유 주식수
+    evaluation_method (str): 평가방법 이름
+    interest_rate (float): 환원율 (%)
+    eval_date (date): 평가 기준일
+
+    Returns:
+    dict: 주식 가치 평가 결과
+    """
+    weighted_income = weighted_average_income(net_income1, net_income2, net_income3)
+    result = per_share_value(total_equity, weighted_income, shares, evaluation_method, interest_rate)
+
+    final_value = result["finalValue"]
+    net_asset_per_share = result["netAssetPerShare"]
+
+    return {
+        "evalDate": eval_date,
+        "netAssetPerShare": net_asset_per_share,
+        "assetValueWithGoodwill": result["assetValueWithGoodwill"],
+        "incomeValue": result["incomeValue"],
+        "finalValue": final_value,
+        "totalValue": final_value * shares,
+        "ownedValue": final_value * owned_shares,
+        "methodText": result["methodText"],
+        "increasePercentage": round((final_value / net_asset_per_share) * 100) if net_asset_per_share > 0 else 0,
+        "weightedIncome": weighted_income
+    }
@@ -0,0 +1,288 @@
+"""
+세금 계산 (상속증여세, 양도소득세, 청산소득세)
+
+현시점 세금계산과 미래 세금계산 페이지가 함께 사용하는 세금 계산 함수입니다.
+세율 구간표와 공제액은 모듈을 가져올 때 한 번만 만들어지며(변경 불가),
+건별 계산(calculate_*)과 배열 계산(*_array)이 같은 구간표를 사용합니다.
+
+calculate_* 함수의 계산 과정은 문자열 대신 (종류, 숫자...) 튜플로 돌려주며,
+화면이나 보고서에 표시할 때 format_steps() / step_lines()로 문자열을 만듭니다.
+"""
+from valuation.brackets import ProgressiveTable
+from valuation.formatting import format_number
+
+
+# 계산 과정 기록 종류별 (설명, 상세) 문자열 생성 함수
+_STEP_FORMATS = {
+    # 누진세율 구간 (상속증여세, 양도소득세 3억 초과)
+    "bracket": lambda label, amount, rate, tax: (
+        label, f"{format_number(amount)}원 × {int(rate * 100)}% = {format_number(tax)}원"),
+    # 양도소득세
+    "transfer_profit": lambda transfer_value, acquisition_value, profit: (
+        "양도차익 계산", f"양도가액({format_number(transfer_value)}원) - 취득가액({format_number(acquisition_value)}원) = {format_number(profit)}원"),
+    "deduction": lambda amount: ("기본공제", f"{format_number(amount)}원"),
+    "taxable": lambda amount: ("과세표준", f"{format_number(amount)}원"),
+    "flat_tax": lambda amount, rate, tax: (
+        "세액 계산", f"{format_number(amount)}원 × {rate:.0%} = {format_number(tax)}원"),
+    "income_tax": lambda tax: ("소득세 합계", f"{format_number(tax)}원"),
+    "local_tax": lambda tax, rate, local_tax: (
+        "지방소득세", f"{format_number(tax)}원 × {rate:.0%} = {format_number(local_tax)}원"),
+    "transfer_total": lambda tax, local_tax, total: (
+        "총 세액", f"{format_number(tax)}원 + {format_number(local_tax)}원 = {format_number(total)}원"),
+    # 청산소득세
+    "liquidation_income": lambda company_value, capital, income: (
+        "청산소득금액", f"잔여재산가액({format_number(company_value)}원) - 자기자본총액({format_number(capital)}원) = {format_number(income)}원"),
+    "corporate_family": lambda income, tax: (
+        "법인세(가족법인)", f"{format_number(income)}원 × 19% = {format_number(tax)}원"),
+    "corporate_low": lambda income, tax: (
+        "법인세(2억 이하)", f"{format_number(income)}원 × 9% = {format_number(tax)}원"),
+    "corporate": lambda excess, tax: (
+        "법인세", f"2억원 × 9% + {format_number(excess)}원 × 19% = {format_number(tax)}원"),
+    "after_corporate_tax": lambda income, tax, remaining: (
+        "법인세 납부 후 잔여재산", f"{format_number(income)}원 - {format_number(tax)}원 = {format_number(remaining)}원"),
+    "owner_share": lambda remaining, ratio, distribution: (
+        "대표자 몫(80%)", f"{format_number(remaining)}원 × {ratio:.1%} = {format_number(distribution)}원"),
+    "individual_tax": lambda distribution, tax: (
+        "종합소득세", f"{format_number(distribution)}원 × 45% - 65,400,000원(누진공제) = {format_number(tax)}원"),
+    "liquidation_total": lambda corporate_tax, individual_tax, total: (
+        "총 세액(법인세 + 종합소득세)", f"{format_number(corporate_tax)}원 + {format_number(individual_tax)}원 = {format_number(total)}원"),
+}
+
+
+def format_step(step):
+    """계산 과정 기록 하나를 (설명, 상세) 문자열로 바꿉니다."""
+    kind, *values = step
+    return _STEP_FORMATS[kind](*values)
+
+
+def format_steps(steps):
+    """계산 과정 기록 목록을 (설명, 상세) 문자열 목록으로 바꿉니다."""
+    return [format_step(step) for step in steps]
+
+
+def step_lines(steps):
+    """계산 과정 기록 목록을 '설명: 상세' 한 줄 문자열 목록으로 바꿉니다."""
+    return [f"{description}: {detail}" for description, detail in format_steps(steps)]
+
+
+# ---------------------------------------------------------------------------
+# 세율표와 공제액 (모듈을 가져올 때 한 번 만들어 모든 페이지와 계산이 공유)
+# ---------------------------------------------------------------------------
+
+# 상속증여세 누진세율 구간표
+INHERITANCE_TAX_TABLE = ProgressiveTable(
+    limits=(100000000, 500000000, 1000000000, 3000000000, float('inf')),
+    rates=(0.1, 0.2, 0.3, 0.4, 0.5),
+    labels=("1억원 이하", "1억원~5억원", "5억원~10억원", "10억원~30억원", "30억원 초과")
+)
+
+# 양도소득세 구간표 (기본공제 후 과세표준 기준, 지방소득세 별도)
+TRANSFER_TAX_TABLE = ProgressiveTable(
+    limits=(300000000, float('inf')),
+    rates=(0.20, 0.25),
+    labels=("3억원 이하", "3억원 초과")
+)
+TRANSFER_BASIC_DEDUCTION = 2500000  # 양도소득 기본공제
+LOCAL_TAX_RATE = 0.1  # 지방소득세 (소득세의 10%)
+
+# 청산소득 법인세 구간표 (일반법인 / 가족법인)
+CORPORATE_TAX_TABLE = ProgressiveTable(
+    limits=(200000000, float('inf')),
+    rates=(0.09, 0.19),
+    labels=("2억원 이하", "2억원 초과")
+)
+FAMILY_CORPORATE_TAX_TABLE = ProgressiveTable(
+    limits=(float('inf'),),
+    rates=(0.19,),
+    labels=("가족법인",)
+)
+PAR_VALUE = 5000  # 자기자본총액 계산용 액면가 (5,000원으로 가정)
+
+# 잔여재산 분배 종합소득세 (최고세율 45%, 누진공제 6,540만원)
+INDIVIDUAL_TOP_RATE = 0.45
+INDIVIDUAL_PROGRESSIVE_DEDUCTION = 65400000
+
+
+def inheritance_tax(value):
+    """상속증여세 세액만 계산합니다 (계산 과정 없음)."""
+    return INHERITANCE_TAX_TABLE.tax(value)
+
+
+def inheritance_tax_array(values):
+    """금액 배열 전체의 상속증여세를 한 번에 계산합니다 (NumPy 필요)."""
+    return INHERITANCE_TAX_TABLE.tax_array(values)
+
+
+def corporate_tax(corporate_income, is_family_corp=False):
+    """청산소득 법인세 (청산소득이 음수이면 최저세율을 그대로 곱한 값)"""
+    table = FAMILY_CORPORATE_TAX_TABLE if is_family_corp else CORPORATE_TAX_TABLE
+    if corporate_income > 0:
+        return table.tax(corporate_income)
+    return corporate_income * table.rates[0]
+
+
+def individual_tax(distribution):
+    """잔여재산 분배액에 대한 종합소득세 (0 미만이면 0)"""
+    return max(distribution * INDIVIDUAL_TOP_RATE - INDIVIDUAL_PROGRESSIVE_DEDUCTION, 0)
+
+
+# 상속증여세 계산 함수 (누진세율 적용, 구간별 계산 과정 포함)
+def calculate_inheritance_tax(value):
+    tax = INHERITANCE_TAX_TABLE.tax(value)
+    calculation_steps = [("bracket",) + bracket for bracket in INHERITANCE_TAX_TABLE.breakdown(value)]
+
+    # 실효세율 계산
+    effective_rate = (tax / value) * 100 if value > 0 else 0
+
+    return tax, calculation_steps, effective_rate
+
+
+# 양도소득세 계산 함수
+def calculate_transfer_tax(transfer_value, acquisition_value):
+    # 양도차익 계산
+    transfer_profit = transfer_value - acquisition_value
+
+    # 기본공제 적용
+    taxable_gain = max(0, transfer_profit - TRANSFER_BASIC_DEDUCTION)
+
+    calculation_steps = [
+        ("transfer_profit", transfer_value, acquisition_value, transfer_profit),
+        ("deduction", TRANSFER_BASIC_DEDUCTION),
+        ("taxable", taxable_gain),
+    ]
+
+    # 3억 이하: 20%, 3억 초과: 25% (지방소득세 포함 22%, 27.5%)
+    tax = TRANSFER_TAX_TABLE.tax(taxable_gain)
+    brackets = TRANSFER_TAX_TABLE.breakdown(taxable_gain)
+    if len(brackets) <= 1:
+        calculation_steps.append(("flat_tax", taxable_gain, TRANSFER_TAX_TABLE.rates[0], tax))
+    else:
+        calculation_steps.extend(("bracket",) + bracket for bracket in brackets)
+        calculation_steps.append(("income_tax", tax))
+
+    # 지방소득세 계산 (소득세의 10%)
+    local_tax = tax * LOCAL_TAX_RATE
+    calculation_steps.append(("local_tax", tax, LOCAL_TAX_RATE, local_tax))
+
+    # 총 세액 (소득세 + 지방소득세)
+    total_tax = tax + local_tax
+    calculation_steps.append(("transfer_total", tax, local_tax, total_tax))
+
+    # 실효세율 계산
+    effective_rate = (total_tax / transfer_profit) * 100 if transfer_profit > 0 else 0
+
+    return total_tax, calculation_steps, effective_rate, transfer_profit
+
+
+# 청산소득세 계산 함수 - 법인세율 9%, 19% 적용
+def calculate_liquidation_tax(owned_value, acquisition_value, total_value, total_shares, owned_shares, is_family_corp=False):
+    calculation_steps = []
+
+    # 1단계: 법인 단계 - 청산소득에 대한 법인세 계산
+    # 회사의 자기자본총액 계산 (액면가 × 총 주식수)
+    capital = PAR_VALUE * total_shares
+
+    # 잔여재산가액 (회사 총가치)
+    company_value = total_value
+
+    # 청산소득금액 계산
+    corporate_income = company_value - capital
+    calculation_steps.append(("liquidation_income", company_value, capital, corporate_income))
+
+    # 법인세 계산
+    corp_tax = corporate_tax(corporate_income, is_family_corp)
+    if is_family_corp:
+        # 가족법인은 19% 고정 세율 적용
+        calculation_steps.append(("corporate_family", corporate_income, corp_tax))
+    elif corporate_income <= CORPORATE_TAX_TABLE.uppers[0]:
+        calculation_steps.append(("corporate_low", corporate_income, corp_tax))
+    else:
+        # 2억원까지는 9%, 나머지는 19% 적용
+        calculation_steps.append(("corporate", corporate_income - CORPORATE_TAX_TABLE.uppers[0], corp_tax))
+
+    # 2단계: 주주 단계 - 잔여재산 분배에 대한 종합소득세
+    # 법인세 납부 후 잔여재산
+    after_tax_corporate = corporate_income - corp_tax
+    calculation_steps.append(("after_corporate_tax", corporate_income, corp_tax, after_tax_corporate))
+
+    # 대표자 몫(지분율 적용)
+    ownership_ratio = owned_shares / total_shares
+    individual_distribution = after_tax_corporate * ownership_ratio
+    calculation_steps.append(("owner_share", after_tax_corporate, ownership_ratio, individual_distribution))
+
+    # 종합소득세 계산(최고세율 45% 적용, 누진공제 6,540만원)
+    indiv_tax = individual_tax(individual_distribution)
+    calculation_steps.append(("individual_tax", individual_distribution, indiv_tax))
+
+    # 총 세액 (법인세 + 종합소득세)
+    total_tax = corp_tax + indiv_tax
+    calculation_steps.append(("liquidation_total", corp_tax, indiv_tax, total_tax))
+
+    # 실효세율 계산
+    effective_rate = (total_tax / owned_value) * 100 if owned_value > 0 else 0
+
+    return corp_tax, indiv_tax, total_tax, calculation_steps, effective_rate, corporate_income, individual_distribution
+
+
+def transfer_tax_array(transfer_values, acquisition_values):
+    """양도가액 배열의 양도소득세(지방소득세 포함)를 한 번에 계산합니다 (NumPy 필요)."""
+    import numpy as np
+    transfer_profit = np.asarray(transfer_values, dtype=np.float64) - np.asarray(acquisition_values, dtype=np.float64)
+    taxable_gain = np.maximum(0, transfer_profit - TRANSFER_BASIC_DEDUCTION)
+    return TRANSFER_TAX_TABLE.tax_array(taxable_gain) * (1 + LOCAL_TAX_RATE)
+
+
+def liquidation_tax_array(total_values, total_shares, owned_shares, is_family_corp=False):
+    """
+    회사 총가치 배열의 청산소득세(법인세 + 종합소득세)를 한 번에 계산합니다 (NumPy 필요).
+
+    Returns:
+    tuple: (법인세, 종합소득세, 총 세액) 배열
+    """
+    import numpy as np
+    table = FAMILY_CORPORATE_TAX_TABLE if is_family_corp else CORPORATE_TAX_TABLE
+    total_shares = np.asarray(total_shares, dtype=np.float64)
+    corporate_income = np.asarray(total_values, dtype=np.float64) - PAR_VALUE * total_shares
+    corp_tax = np.where(corporate_income > 0, table.tax_array(corporate_income), corporate_income * table.rates[0])
+    individual_distribution = (corporate_income - corp_tax) * (np.asarray(owned_shares, dtype=np.float64) / total_shares)
+    indiv_tax = np.maximum(individual_distribution * INDIVIDUAL_TOP_RATE - INDIVIDUAL_PROGRESSIVE_DEDUCTION, 0)
+    return corp_tax, indiv_tax, corp_tax + indiv_tax
+
+
+# 세금 계산 함수
+def calculate_tax_details(value, owned_shares, share_price, total_shares, is_family_corp=False):
+    if not value:
+        return None
+
+    owned_value = value["ownedValue"]
+    total_value = value["totalValue"]
+
+    # 상속증여세
+    inheritance_tax, inheritance_steps, inheritance_rate = calculate_inheritance_tax(owned_value)
+
+    # 양도소득세
+    acquisition_value = owned_shares * share_price
+    transfer_tax, transfer_steps, transfer_rate, transfer_profit = calculate_transfer_tax(owned_value, acquisition_value)
+
+    # 청산소득세
+    corp_tax, indiv_tax, total_liquidation_tax, liquidation_steps, liquidation_rate, corporate_income, individual_distribution = calculate_liquidation_tax(
+        owned_value, acquisition_value, total_value, total_shares, owned_shares, is_family_corp
+    )
+
+    return {
+        "inheritanceTax": inheritance_tax,
+        "transferTax": transfer_tax,
+        "liquidationTax": total_liquidation_tax,
+        "inheritanceSteps": inheritance_steps,
+        "transferSteps": transfer_steps,
+        "liquidationSteps": liquidation_steps,
+        "inheritanceRate": inheritance_rate,
+        "transferRate": transfer_rate,
+        "liquidationRate": liquidation_rate,
+        "acquisitionValue": acquisition_value,
+        "transferProfit": transfer_profit,
+        "corporateIncome": corporate_income,
+        "corporateTax": corp_tax,
+        "individualTax": indiv_tax,
+        "individualDistribution": individual_distribution
+    }
@@ -0,0 +1,212 @@
+"""
+페이지 실행 단계별 시간 측정
+
+Streamlit은 입력이 바뀔 때마다 페이지 스크립트 전체를 다시 실행합니다. RerunTimer는 한 번의
+실행을 CSS 적용, 입력값 처리, 계산, 차트 생성, 보고서 생성 단계로 나눠 시간을 잽니다.
+단계는 switch()로 바꾸며, 어느 단계에도 속하지 않는 시간은 "other"로 모입니다.
+Streamlit에 의존하지 않으므로 명령줄 도구나 부하 시험에서도 그대로 쓸 수 있습니다.
+
+측정 결과는 페이지별로 프로세스 전체에서 모으고(PAGE_TIMINGS), 로거 "valuation.timing"에
+JSON 한 줄로 남깁니다. VALUATION_TIMING_LOG 환경 변수에 파일 경로를 주면 그 파일에도 씁니다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# 단계 이름 -> 표시명
+PHASE_LABELS = {
+    "css": "CSS 적용",
+    "inputs": "입력값 처리",
+    "calculation": "계산",
+    "charts": "차트 생성",
+    "reports": "보고서 생성",
+    "other": "기타",
+}
+OTHER = "other"
+
+# 페이지 식별자 -> 표시명
+PAGE_LABELS = {
+    "valuation": "비상장주식 평가",
+    "valuation_portfolio": "포트폴리오 일괄 평가",
+    "result": "주식가치 결과",
+    "current_tax": "현시점 세금계산",
+    "future_value": "미래 주식가치",
+    "future_tax": "미래 세금계산",
+    "history": "평가 이력",
+}
+
+# 페이지별로 보관하는 최근 실행 기록 수
+HISTORY_SIZE = 500
+
+logger = logging.getLogger("valuation.timing")
+
+
+def percentile(values, q):
+    """정렬하지 않은 값 목록의 q 분위수 (선형 보간, 값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class RerunTimer:
+    """
+    페이지 1회 실행의 단계별 시간
+
+    Parameters:
+    page (str): 페이지 식별자
+    session (str): 세션 식별자
+    """
+
+    def __init__(self, page, session=None, clock=time.perf_counter):
+        self.page = page
+        self.session = session
+        self.clock = clock
+        self.started_at = datetime.now()
+        self.start = self.last = clock()
+        self.current = OTHER
+        self.phases = {}
+
+    def _close(self):
+        now = self.clock()
+        self.phases[self.current] = self.phases.get(self.current, 0.0) + now - self.last
+        self.last = now
+
+    def switch(self, name):
+        """지금까지의 시간을 현재 단계에 더하고 name 단계로 바꿉니다. 이전 단계 이름을 돌려줍니다."""
+        self._close()
+        previous, self.current = self.current, name
+        return previous
+
+    @contextmanager
+    def phase(self, name):
+        """with 블록 동안 name 단계로 측정하고 끝나면 이전 단계로 돌아갑니다."""
+        previous = self.switch(name)
+        try:
+            yield self
+        finally:
+            self.switch(previous)
+
+    def finish(self, interrupted=False, stopped=False):
+        """
+        측정을 끝내고 실행 기록을 돌려줍니다.
+
+        Parameters:
+        interrupted (bool): st.stop(), st.rerun() 등으로 끝까지 실행되지 않은 경우.
+            마지막 switch() 시점까지만 계산합니다.
+        stopped (bool): 페이지를 다 그리지 않고 일찍 st.stop()하는 경우. 지금까지의 시간을
+            계산하되 끝까지 실행된 기록과 섞이지 않도록 interrupted로 기록합니다.
+
+        Returns:
+        dict: page, session, startedAt, total(초), phases(단계 -> 초), interrupted
+        """
+        if not interrupted:
+            self._close()
+        phases = {name: seconds for name, seconds in self.phases.items() if seconds > 0}
+        return {
+            "page": self.page,
+            "session": self.session,
+            "startedAt": self.started_at.isoformat(timespec="milliseconds"),
+            "total": self.last - self.start,
+            "phases": phases,
+            "interrupted": interrupted or stopped,
+        }
+
+
+def summarize(records):
+    """
+    실행 기록 목록의 요약. 중간에 끝난(interrupted) 실행은 시간이 짧아 분위수를 왜곡하므로
+    끝까지 실행된 기록만 집계합니다.
+
+    Returns:
+    dict: count, mean, p50, p95, max(전체 시간, 초), phases(단계 -> 평균 초)
+    """
+    records = [record for record in records if not record.get("interrupted")]
+    totals = [record["total"] for record in records]
+    if not totals:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None, "phases": {}}
+    phases = {}
+    for record in records:
+        for name, seconds in record["phases"].items():
+            phases[name] = phases.get(name, 0.0) + seconds
+    return {
+        "count": len(totals),
+        "mean": sum(totals) / len(totals),
+        "p50": percentile(totals, 0.5),
+        "p95": percentile(totals, 0.95),
+        "max": max(totals),
+        "phases": {name: seconds / len(totals) for name, seconds in phases.items()},
+    }
+
+
+class PageTimings:
+    """페이지별 최근 실행 기록 (모든 세션 공유, 스레드 안전)"""
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.setdefault(record["page"], deque(maxlen=self.size)).append(record)
+
+    def records(self, page):
+        with self._lock:
+            return list(self._records.get(page, ()))
+
+    def pages(self):
+        with self._lock:
+            return sorted(self._records)
+
+    def summary(self):
+        """페이지 -> summarize() 결과"""
+        return {page: summarize(self.records(page)) for page in self.pages()}
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+PAGE_TIMINGS = PageTimings()
+
+_log_lock = threading.Lock()
+_log_configured = False
+
+
+def configure_log(path):
+    """실행 기록을 path 파일에 JSON 한 줄씩 덧붙이도록 로거를 설정합니다."""
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+def log_rerun(record):
+    """실행 기록을 로거 "valuation.timing"에 JSON으로 남깁니다."""
+    global _log_configured
+    if not _log_configured:
+        with _log_lock:
+            if not _log_configured:
+                path = os.environ.get("VALUATION_TIMING_LOG")
+                if path:
+                    configure_log(path)
+                _log_configured = True
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def record_rerun(record):
+    """실행 기록을 페이지별 기록에 더하고 로그로 남깁니다."""
+    PAGE_TIMINGS.add(record)
+    log_rerun(record)
+    return record
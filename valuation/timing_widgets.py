@@ -0,0 +1,134 @@
+"""
+Streamlit 페이지 실행 시간 측정
+
+페이지 스크립트 맨 앞에서 start_rerun(페이지)을, 단계가 바뀌는 곳에서 set_phase(단계)를,
+맨 끝에서 finish_rerun()을 호출합니다. st.stop()이나 st.rerun()으로 끝까지 실행되지 않은
+경우에는 다음 실행의 start_rerun()이 마지막 단계 전환 시점까지로 기록을 마감합니다.
+
+주소에 ?debug=timing을 붙이거나 VALUATION_DEBUG_TIMING=1 환경 변수를 주면
+사이드바에 이번 실행, 이 세션, 서버 전체의 단계별 시간을 표시합니다.
+실행 기록은 valuation.metrics 지표에도 반영됩니다 (VALUATION_METRICS_PORT로 /metrics 제공).
+"""
+import os
+from contextlib import nullcontext
+
+import streamlit as st
+
+from valuation import metrics
+from valuation.timing import PAGE_LABELS, PAGE_TIMINGS, PHASE_LABELS, RerunTimer, logger, record_rerun, summarize
+
+# 세션별로 보관하는 최근 실행 기록 수
+SESSION_HISTORY_SIZE = 50
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx is not None else None
+
+
+@st.cache_resource
+def _metrics_exporter():
+    # 서버 프로세스마다 한 번만 시작 (포트를 쓸 수 없으면 지표 서버 없이 계속)
+    try:
+        return metrics.exporter_from_env()
+    except (OSError, ValueError) as e:
+        logger.warning("지표 서버를 시작하지 못했습니다: %s", e)
+        return None
+
+
+def _record(timer, interrupted=False, stopped=False):
+    record = record_rerun(timer.finish(interrupted, stopped))
+    metrics.observe_rerun(record)
+    history = st.session_state.setdefault("_rerun_timings", [])
+    history.append(record)
+    del history[:-SESSION_HISTORY_SIZE]
+    return record
+
+
+def start_rerun(page):
+    """
+    이번 페이지 실행의 시간 측정을 시작합니다.
+
+    Parameters:
+    page (str): 페이지 식별자 (PAGE_LABELS 키)
+    """
+    _metrics_exporter()
+    pending = st.session_state.pop("_rerun_timer", None)
+    if pending is not None:
+        _record(pending, interrupted=True)
+    timer = RerunTimer(page, _session_id())
+    st.session_state._rerun_timer = timer
+    return timer
+
+
+def set_phase(name):
+    """지금부터의 시간을 name 단계로 측정합니다 (측정 중이 아니면 무시)."""
+    timer = st.session_state.get("_rerun_timer")
+    if timer is not None:
+        timer.switch(name)
+
+
+def phase(name):
+    """with 블록 동안 name 단계로 측정합니다."""
+    timer = st.session_state.get("_rerun_timer")
+    return timer.phase(name) if timer is not None else nullcontext()
+
+
+def debug_enabled():
+    """사이드바 시간 표시 여부 (?debug=timing 또는 VALUATION_DEBUG_TIMING=1)"""
+    if os.environ.get("VALUATION_DEBUG_TIMING", "").lower() in ("1", "true", "yes"):
+        return True
+    return "timing" in st.query_params.get_all("debug")
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _phase_rows(phases):
+    return [{"단계": PHASE_LABELS.get(name, name), "시간(ms)": _ms(seconds)}
+            for name, seconds in sorted(phases.items(), key=lambda item: -item[1])]
+
+
+def timing_sidebar(record):
+    """사이드바에 이번 실행, 이 세션, 서버 전체의 실행 시간을 표시합니다."""
+    with st.sidebar.expander("⏱ 실행 시간", expanded=True):
+        st.caption(f"이번 실행: {_ms(record['total'])}ms")
+        st.dataframe(_phase_rows(record["phases"]), hide_index=True, use_container_width=True)
+
+        session = [item for item in st.session_state.get("_rerun_timings", []) if item["page"] == record["page"]]
+        stats = summarize(session)
+        st.caption(f"이 세션 {stats['count']}회: 평균 {_ms(stats['mean'])}ms, p95 {_ms(stats['p95'])}ms")
+        st.dataframe(_phase_rows(stats["phases"]), hide_index=True, use_container_width=True)
+
+        st.caption("서버 전체 (페이지별)")
+        st.dataframe([
+            {"페이지": PAGE_LABELS.get(page, page), "실행 수": stats["count"], "평균(ms)": _ms(stats["mean"]),
+             "p95(ms)": _ms(stats["p95"]), "최대(ms)": _ms(stats["max"])}
+            for page, stats in PAGE_TIMINGS.summary().items()
+        ], hide_index=True, use_container_width=True)
+
+
+def finish_rerun(stopped=False, page=None):
+    """
+    이번 실행의 측정을 마치고 기록합니다. 디버그 표시가 켜져 있으면 사이드바에 표시합니다.
+    페이지 스크립트의 마지막(poll_jobs(), st.stop() 호출 전)에 호출하세요.
+
+    Parameters:
+    stopped (bool): 페이지를 다 그리지 않고 바로 st.stop()하는 경우 True. 실행 시간 분위수와
+        히스토그램에서 빼고 중간에 끝난 실행으로 셉니다.
+    page (str): 같은 스크립트의 다른 화면을 따로 집계할 때의 페이지 식별자 (PAGE_LABELS 키)
+    """
+    timer = st.session_state.pop("_rerun_timer", None)
+    if timer is None:
+        return None
+    if page is not None:
+        timer.page = page
+    record = _record(timer, stopped=stopped)
+    if debug_enabled():
+        timing_sidebar(record)
+    return record